@@ -7,6 +7,7 @@ This module contains specialized agents for autonomous CBT protocol generation:
 - Safety Guardian: Risk validation and harm detection
 - Clinical Critic: Quality assessment and empathy evaluation
 - Supervisor: Orchestration and routing logic
+- Intent Triage: Routes crisis and medication-advice intents to fixed responses
 """
 
 from .base_agent import BaseAgent
@@ -14,6 +15,7 @@ from .drafter import CBTDrafterAgent
 from .safety_guardian import SafetyGuardianAgent
 from .clinical_critic import ClinicalCriticAgent
 from .supervisor import SupervisorAgent
+from .triage import TriageAgent
 
 __all__ = [
     "BaseAgent",
@@ -21,4 +23,5 @@ __all__ = [
     "SafetyGuardianAgent",
     "ClinicalCriticAgent",
     "SupervisorAgent",
+    "TriageAgent",
 ]
@@ -2,13 +2,16 @@
 Base agent class providing common functionality for all agents.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 from pydantic import BaseModel
 
 from config import settings
 from utils.logger import logger
+from models.llm_client import count_tokens
+from models.prompts import PromptVariant, select_system_prompt
 
 
 class AgentResponse(BaseModel):
@@ -35,6 +38,10 @@ class BaseAgent(ABC):
     - Error handling
     """
     
+    # Key into models.prompts.SYSTEM_PROMPT_VARIANTS for agents whose
+    # system prompt has a compact revision variant
+    prompt_key: Optional[str] = None
+    
     def __init__(
         self,
         name: str,
@@ -84,6 +91,106 @@ class BaseAgent(ABC):
         """
         pass
     
+    def get_prompt_variant(self, state: Any) -> PromptVariant:
+        """
+        Get the system prompt variant for the state's iteration.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            Selected variant (see models.prompts.select_system_prompt)
+        """
+        return select_system_prompt(self.prompt_key, state.iteration_count)
+    
+    def _prompt_metadata(self, state: Any, messages: list) -> Dict[str, Any]:
+        """
+        Input token accounting for a call built from get_prompt_variant(state).
+        
+        Args:
+            state: Current protocol state
+            messages: Messages sent, system prompt first
+            
+        Returns:
+            Metadata with the prompt variant and input tokens
+        """
+        variant = self.get_prompt_variant(state)
+        return {
+            "prompt_variant": variant.version,
+            "prompt_tokens": variant.tokens + sum(count_tokens(str(message.content)) for message in messages[1:])
+        }
+    
+    async def aprocess(self, state: Any) -> AgentResponse:
+        """
+        Async variant of process().
+        
+        Agents that call an LLM override this with a native ainvoke
+        implementation; the default runs process() in a worker thread.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            AgentResponse with results
+        """
+        return await asyncio.to_thread(self.process, state)
+    
+    def _invoke_llm(self, messages: list, max_tokens: Optional[int] = None) -> str:
+        """
+        Call the shared LLM client with this agent's sampling parameters.
+        
+        Args:
+            messages: LangChain messages to send
+            max_tokens: Output limit for this call (default: the agent's)
+            
+        Returns:
+            Response text
+        """
+        response = self.llm.invoke(
+            messages,
+            temperature=self.temperature,
+            max_tokens=max_tokens or self.max_tokens,
+            agent=self.name
+        )
+        return response.content
+    
+    async def _ainvoke_llm(self, messages: list, max_tokens: Optional[int] = None) -> str:
+        """
+        Async variant of _invoke_llm().
+        
+        Args:
+            messages: LangChain messages to send
+            max_tokens: Output limit for this call (default: the agent's)
+            
+        Returns:
+            Response text
+        """
+        response = await self.llm.ainvoke(
+            messages,
+            temperature=self.temperature,
+            max_tokens=max_tokens or self.max_tokens,
+            agent=self.name
+        )
+        return response.content
+    
+    async def _astream_llm(self, messages: list) -> AsyncIterator[str]:
+        """
+        Stream the shared LLM client's response with this agent's parameters.
+        
+        Args:
+            messages: LangChain messages to send
+            
+        Yields:
+            Response text chunks
+        """
+        async for chunk in self.llm.astream(
+            messages,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            agent=self.name
+        ):
+            yield chunk
+    
     def _log_action(self, action: str, details: Optional[Dict[str, Any]] = None):
         """
         Log agent action for monitoring and debugging.
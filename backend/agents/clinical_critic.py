@@ -2,19 +2,29 @@
 Clinical Critic Agent - Evaluates therapeutic quality and empathy.
 """
 
+import difflib
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 
 from config import settings
 from utils.logger import logger
-from models.prompts import CLINICAL_CRITIC_SYSTEM_PROMPT, get_critic_user_prompt
+from utils.helpers import split_sections
+from models.llm_client import get_shared_llm_client, count_tokens
+from models.prompts import CLINICAL_CRITIC_SYSTEM_PROMPT, SCORE_TAG, get_critic_user_prompt, get_critic_revision_user_prompt
 from .base_agent import BaseAgent, AgentResponse
 
 
+@dataclass
+class IncrementalReview:
+    """A re-review of a revision against the previous critic feedback."""
+    previous: Any  # CriticFeedback the review updates
+    changed_titles: List[str]
+    messages: list
+
+
 class ClinicalCriticAgent(BaseAgent):
     """
     Clinical Critic Agent responsible for quality assessment.
@@ -27,6 +37,8 @@ class ClinicalCriticAgent(BaseAgent):
     - Accessibility and clarity review
     """
     
+    prompt_key = "clinical_critic"
+    
     def __init__(self):
         super().__init__(
             name="Clinical_Critic",
@@ -35,21 +47,8 @@ class ClinicalCriticAgent(BaseAgent):
             max_tokens=1500
         )
         
-        # Initialize LLM client
-        if settings.primary_llm_provider == "openai":
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_key=settings.openai_api_key
-            )
-        else:
-            self.llm = ChatAnthropic(
-                model=settings.anthropic_model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_key=settings.anthropic_api_key
-            )
+        # Shared LLM client (retries, backoff and circuit breaking)
+        self.llm = get_shared_llm_client()
         
         self.logger.info("Clinical Critic initialized")
     
@@ -73,57 +72,196 @@ class ClinicalCriticAgent(BaseAgent):
         })
         
         try:
-            # Create user prompt using centralized function
-            user_prompt = get_critic_user_prompt(
-                user_intent=state.user_intent,
-                draft=state.current_draft
-            )
-            
-            # Perform quality assessment
-            messages = [
-                SystemMessage(content=self.get_system_prompt()),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
-            quality_assessment = response.content
-            
-            # Parse assessment
-            parsed_assessment = self._parse_assessment(quality_assessment)
-            
-            # Extract suggestions
-            suggestions = self._extract_suggestions(parsed_assessment)
-            
-            # Determine if revisions needed
-            flags = self._determine_flags(parsed_assessment)
+            review = self._plan_incremental_review(state)
+            messages = review.messages if review else self._build_messages(state)
+            content = self._invoke_llm(messages)
+            return self._build_response(state, content, messages, review)
             
-            # Create response
-            agent_response = self._create_response(
-                content=quality_assessment,
-                reasoning=f"Clinical quality review completed. Overall score: {parsed_assessment.get('overall_score', 'N/A')}/10",
-                confidence=parsed_assessment.get("confidence", 0.85),
-                suggestions=suggestions,
-                flags=flags,
-                metadata={
-                    "overall_score": parsed_assessment.get("overall_score", 0),
-                    "empathy_score": parsed_assessment.get("empathy_score", 0),
-                    "recommendation": parsed_assessment.get("recommendation", "REVIEW"),
-                    "individual_scores": parsed_assessment.get("individual_scores", {}),
-                    "iteration": state.iteration_count
-                }
-            )
-            
-            self._log_action("Clinical review completed", {
-                "overall_score": parsed_assessment.get("overall_score"),
-                "recommendation": parsed_assessment.get("recommendation")
-            })
+        except Exception as e:
+            self.logger.error(f"Error in clinical review: {str(e)}")
+            raise
+    
+    async def aprocess(self, state: Any) -> AgentResponse:
+        """
+        Async variant of process() backed by the provider's native ainvoke.
+        
+        Args:
+            state: Current protocol state
             
-            return agent_response
+        Returns:
+            AgentResponse with quality assessment
+        """
+        self._log_action("Starting clinical quality review", {
+            "draft_length": len(state.current_draft) if state.current_draft else 0,
+            "iteration": state.iteration_count
+        })
+        
+        try:
+            review = self._plan_incremental_review(state)
+            messages = review.messages if review else self._build_messages(state)
+            content = await self._ainvoke_llm(messages)
+            return self._build_response(state, content, messages, review)
             
         except Exception as e:
             self.logger.error(f"Error in clinical review: {str(e)}")
             raise
     
+    def _build_messages(self, state: Any) -> list:
+        """Build the LLM messages for a quality review of the current draft."""
+        # Create user prompt using centralized function
+        user_prompt = get_critic_user_prompt(
+            user_intent=state.user_intent,
+            draft=state.current_draft
+        )
+        
+        return [
+            SystemMessage(content=self.get_prompt_variant(state).text),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _plan_incremental_review(self, state: Any) -> Optional[IncrementalReview]:
+        """
+        Decide whether this review can score only what changed.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            Incremental review of the current draft, or None for a full review
+        """
+        if not settings.critic_incremental_review or state.full_critic_reviews or state.human_feedback:
+            return None
+        
+        previous = state.get_latest_critic_feedback()
+        if previous is None or not previous.draft_version or previous.draft_version > len(state.draft_versions):
+            return None
+        
+        # Periodic full review, so carried-forward scores cannot drift forever
+        incremental_run = 0
+        for feedback in reversed(state.critic_feedbacks):
+            if feedback.review_scope != "incremental":
+                break
+            incremental_run += 1
+        if incremental_run + 1 >= settings.critic_full_review_interval:
+            return None
+        
+        previous_draft = state.draft_versions[previous.draft_version - 1].content
+        draft = state.current_draft
+        if previous_draft == draft:
+            return None
+        
+        diff = "\n".join(list(difflib.unified_diff(
+            previous_draft.splitlines(), draft.splitlines(), n=1, lineterm=""
+        ))[2:])
+        if count_tokens(diff) > settings.critic_diff_max_fraction * count_tokens(draft):
+            return None
+        
+        previous_chunks = {chunk for _, chunk in split_sections(previous_draft)}
+        changed_titles = [title for title, chunk in split_sections(draft) if chunk not in previous_chunks]
+        
+        user_prompt = get_critic_revision_user_prompt(
+            user_intent=state.user_intent,
+            previous_scores=previous.individual_scores,
+            previous_overall=previous.overall_score,
+            previous_improvements=[
+                improvement for improvement in previous.improvements
+                if not SCORE_TAG.match(improvement)  # score tags, not feedback
+            ],
+            changed_titles=changed_titles or ["(removed sections only)"],
+            diff=diff
+        )
+        
+        return IncrementalReview(
+            previous=previous,
+            changed_titles=changed_titles,
+            messages=[
+                SystemMessage(content=self.get_prompt_variant(state).text),
+                HumanMessage(content=user_prompt)
+            ]
+        )
+    
+    def _carry_forward(self, parsed_assessment: Dict[str, Any], previous: Any) -> List[str]:
+        """
+        Fill what an incremental review did not re-score from the previous review.
+        
+        Args:
+            parsed_assessment: Parsed incremental assessment, updated in place
+            previous: CriticFeedback of the previous review
+            
+        Returns:
+            Criteria whose scores were carried forward
+        """
+        rescored = parsed_assessment["individual_scores"]
+        carried = [criterion for criterion in previous.individual_scores if criterion not in rescored]
+        parsed_assessment["individual_scores"] = {**previous.individual_scores, **rescored}
+        
+        if not parsed_assessment["overall_score"]:
+            parsed_assessment["overall_score"] = previous.overall_score
+        if not parsed_assessment["empathy_score"]:
+            parsed_assessment["empathy_score"] = previous.empathy_score
+        if parsed_assessment["recommendation"] == "REVIEW":
+            parsed_assessment["recommendation"] = previous.recommendation
+        
+        return carried
+    
+    def _build_response(
+        self,
+        state: Any,
+        quality_assessment: str,
+        messages: Optional[list] = None,
+        review: Optional[IncrementalReview] = None
+    ) -> AgentResponse:
+        """
+        Parse a raw quality assessment into a structured agent response.
+        
+        Args:
+            state: Current protocol state
+            quality_assessment: Raw LLM assessment
+            messages: Messages the assessment was generated from
+            review: Set when the assessment is an incremental re-review
+            
+        Returns:
+            AgentResponse with quality assessment
+        """
+        # Parse assessment
+        parsed_assessment = self._parse_assessment(quality_assessment)
+        carried_forward = self._carry_forward(parsed_assessment, review.previous) if review else []
+        
+        # Extract suggestions
+        suggestions = self._extract_suggestions(parsed_assessment)
+        
+        # Determine if revisions needed
+        flags = self._determine_flags(parsed_assessment)
+        
+        # Create response
+        agent_response = self._create_response(
+            content=quality_assessment,
+            reasoning=f"Clinical quality review completed. Overall score: {parsed_assessment.get('overall_score', 'N/A')}/10",
+            confidence=parsed_assessment.get("confidence", 0.85),
+            suggestions=suggestions,
+            flags=flags,
+            metadata={
+                "overall_score": parsed_assessment.get("overall_score", 0),
+                "empathy_score": parsed_assessment.get("empathy_score", 0),
+                "recommendation": parsed_assessment.get("recommendation", "REVIEW"),
+                "individual_scores": parsed_assessment.get("individual_scores", {}),
+                "improvements": parsed_assessment.get("improvements", []),
+                "iteration": state.iteration_count,
+                "review_scope": "incremental" if review else "full",
+                "changed_sections": review.changed_titles if review else None,
+                "carried_forward": carried_forward,
+                **(self._prompt_metadata(state, messages) if messages else {})
+            }
+        )
+        
+        self._log_action("Clinical review completed", {
+            "overall_score": parsed_assessment.get("overall_score"),
+            "recommendation": parsed_assessment.get("recommendation"),
+            "review_scope": "incremental" if review else "full"
+        })
+        
+        return agent_response
+    
     def _parse_assessment(self, assessment: str) -> Dict[str, Any]:
         """Parse the quality assessment into structured format."""
         import re
@@ -156,7 +294,7 @@ class ClinicalCriticAgent(BaseAgent):
                 pass
         
         # Extract individual scores
-        criteria = ["clinical accuracy", "empathy & tone", "empathy", "clarity", "therapeutic alliance", "completeness", "engagement"]
+        criteria = ["clinical accuracy", "empathy & tone", "empathy", "clarity & accessibility", "clarity", "therapeutic alliance", "completeness", "engagement"]
         for criterion in criteria:
             criterion_match = re.search(rf'{criterion}[:\s]+(\d+(?:\.\d+)?)', assessment.lower())
             if criterion_match:
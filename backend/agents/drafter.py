@@ -2,19 +2,46 @@
 CBT Drafter Agent - Primary content generator for CBT protocols.
 """
 
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 
 from config import settings
 from utils.logger import logger
-from models.prompts import DRAFTER_SYSTEM_PROMPT, get_drafter_user_prompt
+from utils.helpers import split_sections, split_section_blocks, apply_section_patches
+from models.llm_client import get_shared_llm_client, count_tokens
+from models.prompts import DRAFTER_SYSTEM_PROMPT, get_drafter_user_prompt, get_drafter_patch_user_prompt
 from .base_agent import BaseAgent, AgentResponse
 
 
+# Feedback that summarizes a rating or score rather than pointing at a passage
+SUMMARY_TAG = re.compile(r"^(?:SAFETY_RATING|QUALITY_REVISION_NEEDED|LOW_QUALITY|LOW_EMPATHY|POOR_\w+):")
+
+# Title words too generic to tie feedback to one section
+GENERIC_TITLE_WORDS = frozenset({
+    "and", "for", "the", "with", "your", "cbt", "protocol", "session", "exercise",
+    "exercises", "steps", "step", "techniques", "technique", "considerations", "introduction", "untitled"
+})
+
+# Output limit for a patch: this many times the tokens of the sections
+# being rewritten, and never less than PATCH_MIN_TOKENS
+PATCH_TOKEN_HEADROOM = 2.0
+PATCH_MIN_TOKENS = 300
+
+
+@dataclass
+class PatchPlan:
+    """Which sections of the current draft a revision rewrites."""
+    sections: List[Tuple[str, str]]  # split_sections(current_draft)
+    targets: List[int]  # indexes into sections, in document order
+    messages: list = field(default_factory=list)
+    max_tokens: int = 0
+
+
 class CBTDrafterAgent(BaseAgent):
     """
     CBT Drafter Agent responsible for generating therapeutic exercise content.
@@ -27,6 +54,8 @@ class CBTDrafterAgent(BaseAgent):
     - Safety considerations
     """
     
+    prompt_key = "drafter"
+    
     def __init__(self):
         super().__init__(
             name="CBT_Drafter",
@@ -35,21 +64,8 @@ class CBTDrafterAgent(BaseAgent):
             max_tokens=3000
         )
         
-        # Initialize LLM client
-        if settings.primary_llm_provider == "openai":
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_key=settings.openai_api_key
-            )
-        else:
-            self.llm = ChatAnthropic(
-                model=settings.anthropic_model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_key=settings.anthropic_api_key
-            )
+        # Shared LLM client (retries, backoff and circuit breaking)
+        self.llm = get_shared_llm_client()
         
         self.logger.info(f"CBT Drafter initialized with {settings.primary_llm_provider}")
     
@@ -73,53 +89,261 @@ class CBTDrafterAgent(BaseAgent):
         })
         
         try:
-            # Build context from previous iterations
-            feedback_context = state.get_context_for_revision()
-            
-            # Create user prompt using centralized function
-            user_prompt = get_drafter_user_prompt(
-                user_intent=state.user_intent,
-                current_draft=state.current_draft if state.iteration_count > 0 else None,
-                feedback_context=feedback_context if feedback_context else None,
-                iteration=state.iteration_count
-            )
-            
-            # Generate content
-            messages = [
-                SystemMessage(content=self.get_system_prompt()),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
-            draft_content = response.content
+            plan = self._plan_patch(state)
+            if plan is not None:
+                content = self._invoke_llm(plan.messages, max_tokens=plan.max_tokens)
+                return self._build_patch_response(state, plan, content)
             
-            # Evaluate quality of generated content
-            confidence = self._evaluate_draft_quality(draft_content)
+            messages = self._build_messages(state)
+            content = self._invoke_llm(messages)
+            return self._build_response(state, content, messages)
             
-            # Create structured response
-            agent_response = self._create_response(
-                content=draft_content,
-                reasoning=f"Generated CBT protocol for: {state.user_intent}. Iteration {state.iteration_count + 1}.",
-                confidence=confidence,
-                suggestions=[],
-                metadata={
-                    "word_count": len(draft_content.split()),
-                    "has_structure": self._check_structure(draft_content),
-                    "iteration": state.iteration_count + 1
-                }
-            )
+        except Exception as e:
+            self.logger.error(f"Error in draft generation: {str(e)}")
+            raise
+    
+    async def aprocess(
+        self,
+        state: Any,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> AgentResponse:
+        """
+        Async variant of process() backed by the provider's native ainvoke.
+        
+        Args:
+            state: Current protocol state
+            on_delta: If given, the draft is streamed and each text chunk is
+                passed to it as it arrives (a patched revision is passed as
+                one chunk holding the whole patched draft)
             
-            self._log_action("Draft generation completed", {
-                "confidence": confidence,
-                "word_count": len(draft_content.split())
-            })
+        Returns:
+            AgentResponse with generated protocol draft
+        """
+        self._log_action("Starting draft generation", {
+            "user_intent": state.user_intent,
+            "iteration": state.iteration_count
+        })
+        
+        try:
+            plan = self._plan_patch(state)
+            if plan is not None:
+                content = await self._ainvoke_llm(plan.messages, max_tokens=plan.max_tokens)
+                response = self._build_patch_response(state, plan, content)
+                if on_delta is not None:
+                    on_delta(response.content)
+                return response
             
-            return agent_response
+            messages = self._build_messages(state)
+            if on_delta is None:
+                content = await self._ainvoke_llm(messages)
+            else:
+                chunks = []
+                async for chunk in self._astream_llm(messages):
+                    chunks.append(chunk)
+                    on_delta(chunk)
+                content = "".join(chunks)
+            return self._build_response(state, content, messages)
             
         except Exception as e:
             self.logger.error(f"Error in draft generation: {str(e)}")
             raise
     
+    def _build_messages(self, state: Any) -> list:
+        """
+        Build the LLM messages for the current iteration.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            List of system and user messages
+        """
+        # Build context from previous iterations
+        feedback_context = state.get_context_for_revision()
+        
+        # Create user prompt using centralized function
+        user_prompt = get_drafter_user_prompt(
+            user_intent=state.user_intent,
+            current_draft=state.current_draft if state.iteration_count > 0 else None,
+            feedback_context=feedback_context if feedback_context else None,
+            iteration=state.iteration_count
+        )
+        
+        return [
+            SystemMessage(content=self.get_prompt_variant(state).text),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _plan_patch(self, state: Any) -> Optional[PatchPlan]:
+        """
+        Decide whether a revision can rewrite only some sections.
+        
+        Every safety flag and critic improvement raised on the current draft
+        has to point at a section: lexicon flags by their offsets, other
+        feedback by naming a section's title. Rating and score summaries are
+        ignored, and reviewer feedback always gets a full rewrite.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            Plan for a patch revision, or None to regenerate the whole draft
+        """
+        if not settings.drafter_patch_revisions or state.iteration_count == 0 or state.human_feedback:
+            return None
+        
+        sections = split_sections(state.current_draft or "")
+        if len(sections) < 2:
+            return None
+        
+        starts = []
+        offset = 0
+        for _, chunk in sections:
+            starts.append(offset)
+            offset += len(chunk)
+        
+        feedback = []
+        targets = set()
+        for flag in state.safety_flags:
+            if flag.iteration != state.iteration_count:
+                continue
+            if flag.span_start is not None:
+                targets.add(bisect_right(starts, flag.span_start) - 1)
+            else:
+                feedback.append(flag.issue)
+        
+        latest_critic = state.get_latest_critic_feedback()
+        if latest_critic and latest_critic.iteration == state.iteration_count:
+            feedback.extend(latest_critic.improvements)
+        
+        for item in feedback:
+            if SUMMARY_TAG.match(item):
+                continue
+            named = self._sections_named(item, sections)
+            if not named:
+                return None
+            targets.update(named)
+        
+        if not targets or len(targets) > settings.drafter_patch_max_fraction * len(sections):
+            return None
+        
+        plan = PatchPlan(sections=sections, targets=sorted(targets))
+        feedback_context = state.get_context_for_revision()
+        user_prompt = get_drafter_patch_user_prompt(
+            user_intent=state.user_intent,
+            sections=[sections[index] for index in plan.targets],
+            other_titles=[title for index, (title, _) in enumerate(sections) if index not in targets],
+            feedback_context=feedback_context if feedback_context else None
+        )
+        plan.messages = [
+            SystemMessage(content=self.get_prompt_variant(state).text),
+            HumanMessage(content=user_prompt)
+        ]
+        
+        target_tokens = count_tokens("".join(sections[index][1] for index in plan.targets))
+        plan.max_tokens = min(self.max_tokens, max(PATCH_MIN_TOKENS, int(target_tokens * PATCH_TOKEN_HEADROOM)))
+        
+        return plan
+    
+    def _sections_named(self, text: str, sections: List[Tuple[str, str]]) -> List[int]:
+        """Indexes of the sections with a body whose distinctive title words appear in text."""
+        words = set(re.findall(r"[a-z]+", text.lower()))
+        named = []
+        for index, (title, chunk) in enumerate(sections):
+            if not chunk.strip().partition("\n")[2].strip():
+                continue  # heading only, e.g. the protocol title
+            keywords = [
+                word for word in re.findall(r"[a-z]+", title.lower())
+                if len(word) > 3 and word not in GENERIC_TITLE_WORDS
+            ]
+            # Prefix match so "hierarchy" also finds "hierarchies"
+            if any(
+                word.startswith(keyword[:max(4, len(keyword) - 2)])
+                for keyword in keywords for word in words
+            ):
+                named.append(index)
+        return named
+    
+    def _build_patch_response(self, state: Any, plan: PatchPlan, patch_content: str) -> AgentResponse:
+        """
+        Wrap rewritten sections in an agent response.
+        
+        Args:
+            state: Current protocol state
+            plan: Plan the revision was run from
+            patch_content: Raw LLM output with one block per rewritten section
+            
+        Returns:
+            AgentResponse whose content is the patched draft and whose
+            metadata["patches"] maps section indexes to their new text
+        """
+        blocks = split_section_blocks(patch_content)
+        if not blocks:
+            # The model ignored the section format and most likely rewrote
+            # the whole protocol
+            self.logger.warning("Patch revision returned no section blocks, using it as a full draft")
+            return self._build_response(state, patch_content, plan.messages)
+        
+        patches: Dict[int, str] = {}
+        for number, index in enumerate(plan.targets, start=1):
+            text = blocks.get(number)
+            if not text:
+                continue
+            heading = plan.sections[index][1].lstrip("\n").split("\n", 1)[0]
+            if heading.startswith("#") and not text.startswith("#"):
+                text = f"{heading}\n{text}"
+            patches[index] = text
+        
+        draft_content = apply_section_patches(state.current_draft, patches)
+        response = self._build_response(state, draft_content, plan.messages)
+        response.reasoning = (
+            f"Revised {len(patches)} of {len(plan.sections)} sections "
+            f"({', '.join(plan.sections[index][0] for index in patches)}) for: {state.user_intent}. "
+            f"Iteration {state.iteration_count + 1}."
+        )
+        response.metadata.update({
+            "patches": patches,
+            "patch_tokens": count_tokens(patch_content)
+        })
+        
+        return response
+    
+    def _build_response(self, state: Any, draft_content: str, messages: Optional[list] = None) -> AgentResponse:
+        """
+        Wrap generated draft content in a structured agent response.
+        
+        Args:
+            state: Current protocol state
+            draft_content: Raw draft returned by the LLM
+            messages: Messages the draft was generated from
+            
+        Returns:
+            AgentResponse with generated protocol draft
+        """
+        # Evaluate quality of generated content
+        confidence = self._evaluate_draft_quality(draft_content)
+        
+        # Create structured response
+        agent_response = self._create_response(
+            content=draft_content,
+            reasoning=f"Generated CBT protocol for: {state.user_intent}. Iteration {state.iteration_count + 1}.",
+            confidence=confidence,
+            suggestions=[],
+            metadata={
+                "word_count": len(draft_content.split()),
+                "has_structure": self._check_structure(draft_content),
+                "iteration": state.iteration_count + 1,
+                **(self._prompt_metadata(state, messages) if messages else {})
+            }
+        )
+        
+        self._log_action("Draft generation completed", {
+            "confidence": confidence,
+            "word_count": len(draft_content.split())
+        })
+        
+        return agent_response
+    
     def _evaluate_draft_quality(self, draft: str) -> float:
         """
         Evaluate the quality of generated draft.
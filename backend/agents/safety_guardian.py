@@ -2,17 +2,46 @@
 Safety Guardian Agent - Validates content for safety and liability risks.
 """
 
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional, Tuple
 
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
 
 from config import settings
 from utils.logger import logger
-from models.prompts import SAFETY_GUARDIAN_SYSTEM_PROMPT, get_safety_user_prompt
+from utils.helpers import split_sections, split_section_blocks, hash_text
+from models.llm_client import get_shared_llm_client, count_tokens
+from state.protocol_state import SafetySeverity
+from models.prompts import (
+    SAFETY_GUARDIAN_SYSTEM_PROMPT,
+    get_safety_user_prompt,
+    get_safety_sections_user_prompt,
+    get_prompt_version
+)
 from .base_agent import BaseAgent, AgentResponse
+from .safety_lexicon import LexiconMatch, MATCH_CONFIDENCE, get_risk_lexicon
+
+
+# Safety ratings from least to most severe
+RATING_ORDER = ["SAFE", "NEEDS_REVIEW", "NEEDS_REVISION", "UNSAFE"]
+
+# Assessment lines that describe an issue: a severity word and an issue word
+ISSUE_LINE = re.compile(r"(?=.*(?:high|medium|low))(?=.*(?:issue|concern|risk|problem))", re.IGNORECASE)
+
+
+@dataclass
+class SectionReviewPlan:
+    """Which sections of a draft need an LLM review and which are cached."""
+    sections: List[Tuple[str, str, str]]  # (title, chunk, cache key) in document order
+    cached: Dict[str, Dict[str, Any]]  # cache key -> verdict
+    to_review: List[Tuple[str, str, str]] = field(default_factory=list)
+    messages: Optional[list] = None
+    prompt_tokens: int = 0
+    full_prompt_tokens: int = 0
 
 
 class SafetyGuardianAgent(BaseAgent):
@@ -27,6 +56,8 @@ class SafetyGuardianAgent(BaseAgent):
     - Contraindications detection
     """
     
+    prompt_key = "safety_guardian"
+    
     def __init__(self):
         super().__init__(
             name="Safety_Guardian",
@@ -35,21 +66,12 @@ class SafetyGuardianAgent(BaseAgent):
             max_tokens=1500
         )
         
-        # Initialize LLM client
-        if settings.primary_llm_provider == "openai":
-            self.llm = ChatOpenAI(
-                model=settings.openai_model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_key=settings.openai_api_key
-            )
-        else:
-            self.llm = ChatAnthropic(
-                model=settings.anthropic_model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                api_key=settings.anthropic_api_key
-            )
+        # Shared LLM client (retries, backoff and circuit breaking)
+        self.llm = get_shared_llm_client()
+        
+        # Parsed verdicts of sections already reviewed, by content hash
+        self._section_verdicts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._section_verdicts_lock = threading.Lock()
         
         self.logger.info("Safety Guardian initialized")
     
@@ -73,52 +95,325 @@ class SafetyGuardianAgent(BaseAgent):
         })
         
         try:
-            # Create user prompt using centralized function
-            user_prompt = get_safety_user_prompt(
-                user_intent=state.user_intent,
-                draft=state.current_draft
-            )
-            
-            # Analyze draft for safety issues
-            messages = [
-                SystemMessage(content=self.get_system_prompt()),
-                HumanMessage(content=user_prompt)
-            ]
+            matches = self._prescreen(state)
+            if settings.safety_lexicon_short_circuit and any(m.severity == SafetySeverity.HIGH for m in matches):
+                return self._build_lexicon_response(state, matches)
             
-            response = self.llm.invoke(messages)
-            safety_assessment = response.content
+            if not settings.safety_section_review:
+                messages = self._build_messages(state)
+                content = self._invoke_llm(messages)
+                response = self._build_response(state, content, messages)
+            else:
+                plan = self._plan_section_review(state)
+                content = self._invoke_llm(plan.messages) if plan.messages else ""
+                response = self._build_section_response(state, plan, content)
             
-            # Parse assessment
-            parsed_assessment = self._parse_assessment(safety_assessment)
+            return self._attach_lexicon_matches(response, matches)
             
-            # Determine flags
-            flags = self._extract_flags(parsed_assessment)
+        except Exception as e:
+            self.logger.error(f"Error in safety validation: {str(e)}")
+            raise
+    
+    async def aprocess(self, state: Any) -> AgentResponse:
+        """
+        Async variant of process() backed by the provider's native ainvoke.
+        
+        Args:
+            state: Current protocol state
             
-            # Create response
-            agent_response = self._create_response(
-                content=safety_assessment,
-                reasoning=f"Conducted safety review of draft. Found {len(flags)} concerns.",
-                confidence=parsed_assessment.get("confidence", 0.8),
-                flags=flags,
-                suggestions=parsed_assessment.get("recommendations", []),
-                metadata={
-                    "safety_rating": parsed_assessment.get("rating", "NEEDS_REVIEW"),
-                    "high_severity_issues": sum(1 for f in flags if "HIGH" in f),
-                    "iteration": state.iteration_count
-                }
-            )
+        Returns:
+            AgentResponse with safety assessment
+        """
+        self._log_action("Starting safety validation", {
+            "draft_length": len(state.current_draft) if state.current_draft else 0,
+            "iteration": state.iteration_count
+        })
+        
+        try:
+            matches = self._prescreen(state)
+            if settings.safety_lexicon_short_circuit and any(m.severity == SafetySeverity.HIGH for m in matches):
+                return self._build_lexicon_response(state, matches)
             
-            self._log_action("Safety validation completed", {
-                "rating": parsed_assessment.get("rating"),
-                "flags_count": len(flags)
-            })
+            if not settings.safety_section_review:
+                messages = self._build_messages(state)
+                content = await self._ainvoke_llm(messages)
+                response = self._build_response(state, content, messages)
+            else:
+                plan = self._plan_section_review(state)
+                content = await self._ainvoke_llm(plan.messages) if plan.messages else ""
+                response = self._build_section_response(state, plan, content)
             
-            return agent_response
+            return self._attach_lexicon_matches(response, matches)
             
         except Exception as e:
             self.logger.error(f"Error in safety validation: {str(e)}")
             raise
     
+    def _prescreen(self, state: Any) -> List[LexiconMatch]:
+        """Scan the draft with the deterministic risk lexicon."""
+        if not settings.safety_lexicon_enabled:
+            return []
+        
+        matches = get_risk_lexicon().scan(state.current_draft or "")
+        if matches:
+            self._log_action("Lexicon pre-screen matched", {
+                "matches": len(matches),
+                "categories": sorted({m.category for m in matches})
+            })
+        return matches
+    
+    def _build_lexicon_response(self, state: Any, matches: List[LexiconMatch]) -> AgentResponse:
+        """
+        Reject a draft on HIGH-severity lexicon hits without calling the LLM.
+        
+        Args:
+            state: Current protocol state
+            matches: Pre-screen matches (at least one HIGH)
+            
+        Returns:
+            AgentResponse rating the draft UNSAFE
+        """
+        suggestions = list(dict.fromkeys(m.recommendation for m in matches))
+        content = "\n".join(
+            [f"Lexicon pre-screen found {len(matches)} risk pattern(s):"] +
+            [f"- [{m.severity.value.upper()}] {m.description}: \"{m.text}\" (chars {m.start}-{m.end})" for m in matches] +
+            ["", "OVERALL SAFETY RATING: UNSAFE"]
+        )
+        
+        agent_response = self._create_response(
+            content=content,
+            reasoning=f"Deterministic pre-screen matched {len(matches)} risk patterns; LLM review skipped.",
+            confidence=MATCH_CONFIDENCE,
+            flags=[],
+            suggestions=suggestions,
+            metadata={
+                "safety_rating": "UNSAFE",
+                "high_severity_issues": 0,
+                "iteration": state.iteration_count,
+                "short_circuited": True,
+                "prompt_tokens": 0
+            }
+        )
+        
+        self._log_action("Safety validation short-circuited by lexicon", {
+            "matches": len(matches)
+        })
+        
+        return self._attach_lexicon_matches(agent_response, matches)
+    
+    def _attach_lexicon_matches(self, response: AgentResponse, matches: List[LexiconMatch]) -> AgentResponse:
+        """Record pre-screen matches in a response's metadata."""
+        response.metadata["lexicon_matches"] = [m.to_dict() for m in matches]
+        response.metadata["high_severity_issues"] = response.metadata.get("high_severity_issues", 0) + sum(
+            1 for m in matches if m.severity == SafetySeverity.HIGH
+        )
+        return response
+    
+    def _build_messages(self, state: Any) -> list:
+        """Build the LLM messages for a safety review of the current draft."""
+        # Create user prompt using centralized function
+        user_prompt = get_safety_user_prompt(
+            user_intent=state.user_intent,
+            draft=state.current_draft
+        )
+        
+        return [
+            SystemMessage(content=self.get_prompt_variant(state).text),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _plan_section_review(self, state: Any) -> SectionReviewPlan:
+        """
+        Split the draft into sections and look up cached verdicts.
+        
+        Sections are keyed by a hash of their content together with the
+        intent, model and prompt version, so an edit to a section (or a
+        prompt change) always triggers a fresh review of it.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            Plan with the messages for the uncached sections (None if all
+            sections are cached)
+        """
+        draft = state.current_draft or ""
+        key_prefix = f"{get_prompt_version()}\n{self.llm.model}\n{state.user_intent}\n"
+        
+        sections = [
+            (title, chunk, hash_text(key_prefix + chunk.strip()))
+            for title, chunk in split_sections(draft)
+        ]
+        with self._section_verdicts_lock:
+            cached = {}
+            for _, _, key in sections:
+                if key in self._section_verdicts:
+                    self._section_verdicts.move_to_end(key)
+                    cached[key] = self._section_verdicts[key]
+        
+        plan = SectionReviewPlan(sections=sections, cached=cached)
+        plan.to_review = [section for section in sections if section[2] not in cached]
+        
+        variant = self.get_prompt_variant(state)
+        full_prompt = get_safety_user_prompt(user_intent=state.user_intent, draft=draft)
+        plan.full_prompt_tokens = variant.tokens + count_tokens(full_prompt)
+        
+        if plan.to_review:
+            user_prompt = get_safety_sections_user_prompt(
+                user_intent=state.user_intent,
+                sections=[(title, chunk) for title, chunk, _ in plan.to_review],
+                unchanged_titles=[title for title, _, key in sections if key in cached]
+            )
+            plan.messages = [
+                SystemMessage(content=variant.text),
+                HumanMessage(content=user_prompt)
+            ]
+            plan.prompt_tokens = variant.tokens + count_tokens(user_prompt)
+        
+        return plan
+    
+    def _build_section_response(self, state: Any, plan: SectionReviewPlan, assessment: str) -> AgentResponse:
+        """
+        Merge cached and fresh per-section verdicts into one agent response.
+        
+        Args:
+            state: Current protocol state
+            plan: Plan the review was run from
+            assessment: LLM output for the reviewed sections ("" if none)
+            
+        Returns:
+            AgentResponse with the merged safety assessment
+        """
+        verdicts = dict(plan.cached)
+        extra = []
+        
+        if plan.to_review:
+            blocks = self._split_section_verdicts(assessment)
+            if not blocks:
+                # The model ignored the section format: use its verdict as a
+                # whole for this review, but cache nothing
+                extra.append({**self._parse_assessment(assessment), "text": assessment})
+            
+            new_verdicts = {}
+            for number, (_, _, key) in enumerate(plan.to_review, start=1):
+                if blocks and number in blocks:
+                    new_verdicts[key] = {**self._parse_assessment(blocks[number]), "text": blocks[number]}
+                elif blocks:
+                    extra.append({**self._parse_assessment(""), "text": ""})
+            
+            verdicts.update(new_verdicts)
+            self._remember_verdicts(new_verdicts)
+        
+        ordered = [verdicts[key] for _, _, key in plan.sections if key in verdicts] + extra
+        parsed = self._merge_verdicts(ordered)
+        flags = self._extract_flags(parsed)
+        
+        content = "\n\n".join(
+            f"=== SECTION: {title} ===\n{verdicts[key]['text'].strip()}"
+            for title, _, key in plan.sections if key in verdicts
+        )
+        if extra:
+            content = "\n\n".join([content] + [verdict["text"] for verdict in extra]).strip()
+        
+        agent_response = self._create_response(
+            content=content,
+            reasoning=(
+                f"Conducted safety review of draft ({len(plan.to_review)} of {len(plan.sections)} "
+                f"sections reviewed, rest unchanged). Found {len(flags)} concerns."
+            ),
+            confidence=parsed.get("confidence", 0.8),
+            flags=flags,
+            suggestions=parsed.get("recommendations", []),
+            metadata={
+                "safety_rating": parsed.get("rating", "NEEDS_REVIEW"),
+                "high_severity_issues": sum(1 for f in flags if "HIGH" in f),
+                "iteration": state.iteration_count,
+                "sections_total": len(plan.sections),
+                "sections_reviewed": len(plan.to_review),
+                "sections_cached": len(plan.sections) - len(plan.to_review),
+                "prompt_tokens": plan.prompt_tokens,
+                "full_prompt_tokens": plan.full_prompt_tokens,
+                "prompt_variant": self.get_prompt_variant(state).version
+            }
+        )
+        
+        self._log_action("Safety validation completed", {
+            "rating": parsed.get("rating"),
+            "flags_count": len(flags),
+            "sections_reviewed": len(plan.to_review),
+            "prompt_tokens": plan.prompt_tokens,
+            "full_prompt_tokens": plan.full_prompt_tokens
+        })
+        
+        return agent_response
+    
+    def _split_section_verdicts(self, assessment: str) -> Dict[int, str]:
+        """Split a sectioned review into verdict text by section number."""
+        return split_section_blocks(assessment)
+    
+    def _remember_verdicts(self, verdicts: Dict[str, Dict[str, Any]]):
+        """Add section verdicts to the cache, evicting the least recently used."""
+        with self._section_verdicts_lock:
+            for key, verdict in verdicts.items():
+                self._section_verdicts[key] = verdict
+                self._section_verdicts.move_to_end(key)
+            while len(self._section_verdicts) > settings.safety_section_cache_size:
+                self._section_verdicts.popitem(last=False)
+    
+    def _merge_verdicts(self, verdicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-section verdicts: worst rating, all issues, lowest confidence."""
+        merged = {
+            "rating": "SAFE",
+            "confidence": 0.8,
+            "issues": [],
+            "recommendations": []
+        }
+        if not verdicts:
+            return merged
+        
+        merged["rating"] = max(
+            (verdict.get("rating", "NEEDS_REVIEW") for verdict in verdicts),
+            key=lambda rating: RATING_ORDER.index(rating) if rating in RATING_ORDER else 1
+        )
+        merged["confidence"] = min(verdict.get("confidence", 0.7) for verdict in verdicts)
+        for verdict in verdicts:
+            for name in ("issues", "recommendations"):
+                for item in verdict.get(name, []):
+                    if item not in merged[name]:
+                        merged[name].append(item)
+        
+        return merged
+    
+    def _build_response(self, state: Any, safety_assessment: str, messages: Optional[list] = None) -> AgentResponse:
+        """Parse a raw safety assessment into a structured agent response."""
+        # Parse assessment
+        parsed_assessment = self._parse_assessment(safety_assessment)
+        
+        # Determine flags
+        flags = self._extract_flags(parsed_assessment)
+        
+        # Create response
+        agent_response = self._create_response(
+            content=safety_assessment,
+            reasoning=f"Conducted safety review of draft. Found {len(flags)} concerns.",
+            confidence=parsed_assessment.get("confidence", 0.8),
+            flags=flags,
+            suggestions=parsed_assessment.get("recommendations", []),
+            metadata={
+                "safety_rating": parsed_assessment.get("rating", "NEEDS_REVIEW"),
+                "high_severity_issues": sum(1 for f in flags if "HIGH" in f),
+                "iteration": state.iteration_count,
+                **(self._prompt_metadata(state, messages) if messages else {})
+            }
+        )
+        
+        self._log_action("Safety validation completed", {
+            "rating": parsed_assessment.get("rating"),
+            "flags_count": len(flags)
+        })
+        
+        return agent_response
+    
     def _parse_assessment(self, assessment: str) -> Dict[str, Any]:
         """Parse the safety assessment into structured format."""
         parsed = {
@@ -142,10 +437,8 @@ class SafetyGuardianAgent(BaseAgent):
         # Extract issues (look for HIGH/MEDIUM/LOW markers)
         lines = assessment.split("\n")
         for line in lines:
-            line_lower = line.lower()
-            if any(severity in line_lower for severity in ["high", "medium", "low"]):
-                if any(keyword in line_lower for keyword in ["issue", "concern", "risk", "problem"]):
-                    parsed["issues"].append(line.strip())
+            if ISSUE_LINE.match(line):
+                parsed["issues"].append(line.strip())
         
         # Extract recommendations
         in_recommendations = False
@@ -158,7 +451,6 @@ class SafetyGuardianAgent(BaseAgent):
         
         # Extract confidence if mentioned
         if "confidence" in assessment_lower:
-            import re
             confidence_match = re.search(r'confidence[:\s]+(0?\.\d+|\d+(?:\.\d+)?)', assessment_lower)
             if confidence_match:
                 try:
@@ -0,0 +1,195 @@
+"""
+Deterministic risk lexicon pre-screen for protocol drafts.
+
+Every lexicon rule is compiled into one combined regular expression, so a
+draft is scanned in a single pass regardless of how many rules there are.
+Rules target harmful instructions (dosing advice, self-harm methods,
+outcome guarantees) rather than mere mentions: a draft that says "if you
+have thoughts of suicide, call 988" is doing the right thing.
+"""
+
+import json
+import re
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from state.protocol_state import SafetySeverity
+from utils.logger import logger
+
+
+# Confidence recorded for lexicon hits (the pattern matched, but context
+# such as quotation or negation is not checked)
+MATCH_CONFIDENCE = 0.95
+
+# Default clinical risk lexicon: category -> severity, description,
+# recommendation and regex patterns (matched case-insensitively)
+DEFAULT_RISK_LEXICON: Dict[str, Dict[str, Any]] = {
+    "medication_dosing": {
+        "severity": "high",
+        "description": "Medication dosing or discontinuation advice",
+        "recommendation": "Remove medication instructions; refer medication questions to a prescriber",
+        "patterns": [
+            r"\b(?:take|taking|increase|decrease|reduce|double|halve)\b[^.\n]{0,40}?\b\d+(?:\.\d+)?\s?(?:mg|milligrams?|mcg|ml|pills?|tablets?|capsules?)\b",
+            r"\b(?:stop|quit)\s+taking\s+(?:your|any|the)\s+(?:medications?|meds|antidepressants?|pills)\b",
+            r"\bcome\s+off\s+(?:your\s+)?(?:medications?|meds|antidepressants?)\b",
+        ],
+    },
+    "self_harm_method": {
+        "severity": "high",
+        "description": "Self-harm or suicide method detail",
+        "recommendation": "Remove method detail; include crisis resources instead",
+        "patterns": [
+            r"\blethal\s+(?:dose|amount|quantity)\b",
+            r"\bhow\s+to\s+(?:kill|hurt|harm|cut)\s+(?:yourself|oneself)\b",
+            r"\b(?:ways|methods)\s+(?:to|of)\s+(?:suicide|self[-\s]?harm|killing\s+yourself)\b",
+        ],
+    },
+    "self_harm_normalizing": {
+        "severity": "high",
+        "description": "Language that normalizes or encourages self-harm",
+        "recommendation": "Replace with non-judgemental language that points to safer coping and support",
+        "patterns": [
+            r"\b(?:it'?s|it\s+is)\s+(?:ok|okay|fine|normal)\s+to\s+(?:hurt|harm|cut)\s+yourself\b",
+            r"\bself[-\s]?harm\s+(?:is|can\s+be)\s+(?:a\s+)?(?:healthy|helpful|effective|acceptable)\b",
+        ],
+    },
+    "replacing_care": {
+        "severity": "medium",
+        "description": "Implies the protocol replaces professional care",
+        "recommendation": "State that the exercise complements, not replaces, professional treatment",
+        "patterns": [
+            r"\b(?:no\s+need|don'?t\s+need)\s+(?:to\s+see|for)\s+(?:a|your)\s+(?:doctor|therapist|psychiatrist|clinician)\b",
+            r"\binstead\s+of\s+(?:seeing|visiting|calling)\s+(?:a|your)\s+(?:doctor|therapist|psychiatrist|clinician)\b",
+        ],
+    },
+    "diagnosis": {
+        "severity": "medium",
+        "description": "Diagnostic language addressed to the reader",
+        "recommendation": "Avoid diagnosing; describe experiences instead of labelling the reader",
+        "patterns": [
+            r"\byou\s+(?:have|suffer\s+from)\s+(?:clinical\s+)?(?:depression|bipolar(?:\s+disorder)?|ptsd|ocd|schizophrenia|borderline\s+personality\s+disorder)\b",
+        ],
+    },
+    "overpromising": {
+        "severity": "low",
+        "description": "Guarantees a therapeutic outcome",
+        "recommendation": "Describe likely benefits without guaranteeing outcomes",
+        "patterns": [
+            r"\b(?:guaranteed?|100%)\s+(?:to\s+)?(?:cure|fix|eliminate|work)\b",
+            r"\bwill\s+(?:cure|eliminate)\s+your\b",
+        ],
+    },
+}
+
+
+@dataclass
+class LexiconMatch:
+    """One lexicon hit in a draft."""
+    category: str
+    severity: SafetySeverity
+    description: str
+    recommendation: str
+    text: str
+    start: int
+    end: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for agent response metadata."""
+        data = asdict(self)
+        data["severity"] = self.severity.value
+        data["confidence"] = MATCH_CONFIDENCE
+        return data
+
+
+class RiskLexicon:
+    """
+    Compiled multi-pattern matcher over a risk lexicon.
+    
+    Each rule becomes a named group of a single alternation, so finditer
+    makes one left-to-right pass over the text and the group name of each
+    match identifies its category. Rules match from the start of a word:
+    the word-start check is hoisted in front of the alternation, so the
+    engine only tries the alternatives at word starts instead of at every
+    character.
+    """
+    
+    def __init__(self, lexicon: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Compile the lexicon.
+        
+        Args:
+            lexicon: Category -> rule mapping (defaults to DEFAULT_RISK_LEXICON)
+        """
+        self.lexicon = lexicon or DEFAULT_RISK_LEXICON
+        self._groups: Dict[str, str] = {}
+        
+        alternatives = []
+        for category, rule in self.lexicon.items():
+            for pattern in rule["patterns"]:
+                group = f"g{len(self._groups)}"
+                self._groups[group] = category
+                if pattern.startswith(r"\b"):
+                    pattern = pattern[2:]
+                alternatives.append(f"(?P<{group}>{pattern})")
+        
+        self.pattern = re.compile(r"(?=[^\W_])\b(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+    
+    def scan(self, text: str) -> List[LexiconMatch]:
+        """
+        Find every lexicon hit in a text.
+        
+        Args:
+            text: Draft content
+            
+        Returns:
+            Matches in document order, with character offsets
+        """
+        matches = []
+        for match in self.pattern.finditer(text or ""):
+            category = self._groups[match.lastgroup]
+            rule = self.lexicon[category]
+            matches.append(LexiconMatch(
+                category=category,
+                severity=SafetySeverity(rule["severity"]),
+                description=rule["description"],
+                recommendation=rule["recommendation"],
+                text=match.group(0),
+                start=match.start(),
+                end=match.end()
+            ))
+        return matches
+
+
+def load_lexicon(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the lexicon, applying overrides from a JSON file if configured.
+    
+    The file has the same shape as DEFAULT_RISK_LEXICON; its categories
+    replace or extend the defaults.
+    
+    Args:
+        path: JSON file (defaults to settings.safety_lexicon_path)
+        
+    Returns:
+        Category -> rule mapping
+    """
+    lexicon = dict(DEFAULT_RISK_LEXICON)
+    path = path or settings.safety_lexicon_path
+    if path:
+        with open(path, encoding="utf-8") as f:
+            lexicon.update(json.load(f))
+        logger.info(f"Loaded safety lexicon overrides from {path}")
+    return lexicon
+
+
+# Global lexicon instance
+_risk_lexicon: Optional[RiskLexicon] = None
+
+
+def get_risk_lexicon() -> RiskLexicon:
+    """Get or create the compiled risk lexicon."""
+    global _risk_lexicon
+    if _risk_lexicon is None:
+        _risk_lexicon = RiskLexicon(load_lexicon())
+    return _risk_lexicon
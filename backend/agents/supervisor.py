@@ -3,11 +3,13 @@ Supervisor Agent - Orchestrates workflow and makes routing decisions.
 """
 
 from datetime import datetime
-from typing import Any, Literal
+from typing import Any, Literal, Optional
 
 from config import settings
 from utils.logger import logger
+from utils.helpers import calculate_similarity
 from models.prompts import SUPERVISOR_SYSTEM_PROMPT
+from state.protocol_state import SafetySeverity
 from .base_agent import BaseAgent, AgentResponse
 
 
@@ -51,7 +53,7 @@ class SupervisorAgent(BaseAgent):
     def decide_next_action(
         self, 
         state: Any
-    ) -> Literal["run_drafter", "run_safety", "run_critic", "halt_for_human", "finalize", "max_iterations_reached"]:
+    ) -> Literal["run_drafter", "run_review", "run_safety", "run_critic", "halt_for_human", "finalize", "max_iterations_reached"]:
         """
         Decide the next action in the workflow based on current state.
         
@@ -88,31 +90,42 @@ class SupervisorAgent(BaseAgent):
             self._record_decision(state, "run_drafter", "Generate missing draft")
             return "run_drafter"
         
+        # Check which reviews the current draft still needs
+        needs_safety = not self._has_recent_safety_check(state)
+        needs_quality = not self._has_recent_quality_check(state)
+        
+        # Safety-blocked drafts go straight back to the drafter; reviewing
+        # the quality of a draft that will be rewritten is wasted
+        block_rule = None if needs_safety else self.safety_block_reason(state)
+        if block_rule:
+            if needs_quality:
+                state.metadata.critic_calls_avoided += 1
+            self._log_action("Critical safety issues - requesting revision", {
+                "rule": block_rule,
+                "critic_skipped": needs_quality
+            })
+            self._record_decision(state, "run_drafter", f"Address critical safety concerns ({block_rule})")
+            return "run_drafter"
+        
+        # Both reviews only read the draft, so they can run side by side;
+        # under safety_first the critic waits for the safety verdict
+        if needs_safety and needs_quality and settings.review_policy != "safety_first":
+            self._log_action("Safety and quality review needed")
+            self._record_decision(state, "run_review", "Parallel safety validation and quality review required")
+            return "run_review"
+        
         # Check if safety validation is needed
-        if not self._has_recent_safety_check(state):
+        if needs_safety:
             self._log_action("Safety check needed")
             self._record_decision(state, "run_safety", "Safety validation required")
             return "run_safety"
         
         # Check if quality review is needed
-        if not self._has_recent_quality_check(state):
+        if needs_quality:
             self._log_action("Quality check needed")
             self._record_decision(state, "run_critic", "Quality review required")
             return "run_critic"
         
-        # Check for blocking safety issues
-        safety_flags = state.scratchpad.get("safety_flags", [])
-        if safety_flags:
-            latest_flags = [f for f in safety_flags if isinstance(f, dict)]
-            if latest_flags:
-                latest_flag = latest_flags[-1]
-                # Only revise on HIGH severity or UNSAFE rating
-                flag_str = str(latest_flag)
-                if "UNSAFE" in flag_str or "HIGH" in flag_str:
-                    self._log_action("Critical safety issues - requesting revision")
-                    self._record_decision(state, "run_drafter", "Address critical safety concerns")
-                    return "run_drafter"
-        
         # Check for quality issues requiring revision - IMPROVED LOGIC
         critic_feedback = state.scratchpad.get("critic_feedback", [])
         if critic_feedback:
@@ -131,6 +144,8 @@ class SupervisorAgent(BaseAgent):
                 
                 # Only request revision for MAJOR issues
                 if "MAJOR" in recommendation:
+                    if self._halt_on_diminishing_returns(state, overall_score, self.max_iterations):
+                        return "halt_for_human"
                     self._log_action("Major quality issues - requesting revision")
                     self._record_decision(state, "run_drafter", "Address major quality concerns")
                     return "run_drafter"
@@ -141,6 +156,8 @@ class SupervisorAgent(BaseAgent):
                 # 3. We haven't already done too many revisions (prevent loops)
                 elif overall_score < self.quality_threshold:
                     if state.iteration_count < self.max_iterations - 1:
+                        if self._halt_on_diminishing_returns(state, overall_score, self.max_iterations - 1):
+                            return "halt_for_human"
                         self._log_action("Score below threshold - requesting revision", {
                             "score": overall_score,
                             "threshold": self.quality_threshold
@@ -186,6 +203,94 @@ class SupervisorAgent(BaseAgent):
         self._record_decision(state, "halt_for_human", "Ready for human review")
         return "halt_for_human"
     
+    def diminishing_returns_reason(self, state: Any) -> Optional[str]:
+        """
+        Check whether another quality revision is unlikely to help.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            Why revising should stop (score plateau or converged drafts), or None
+        """
+        if not settings.early_stopping_enabled:
+            return None
+        
+        # Score trajectory over the last few reviews
+        window = settings.plateau_window
+        scores = [
+            f.get("overall_score", 0) for f in state.scratchpad.get("critic_feedback", [])
+            if isinstance(f, dict)
+        ]
+        if window >= 2 and len(scores) >= window and scores[-1] - scores[-window] < settings.plateau_min_gain:
+            return "score plateau (" + " -> ".join(f"{score:g}" for score in scores[-window:]) + ")"
+        
+        # The drafter is barely changing the draft any more
+        if len(state.draft_versions) >= 2:
+            similarity = calculate_similarity(state.draft_versions[-2].content, state.draft_versions[-1].content)
+            if similarity >= settings.convergence_similarity:
+                return f"drafts converged (similarity {similarity:.2f})"
+        
+        return None
+    
+    def _halt_on_diminishing_returns(self, state: Any, overall_score: float, last_iteration: int) -> bool:
+        """
+        Record a halt for human review if further revisions are unlikely to help.
+        
+        Args:
+            state: Current protocol state
+            overall_score: Latest critic score
+            last_iteration: Iteration the loop would otherwise have revised up to
+            
+        Returns:
+            True if the supervisor should halt instead of revising
+        """
+        reason = self.diminishing_returns_reason(state)
+        if reason is None:
+            return False
+        
+        saved = max(0, last_iteration - state.iteration_count)
+        state.metadata.iterations_saved += saved
+        
+        self._log_action("Diminishing returns - halting for human review", {
+            "score": overall_score,
+            "reason": reason,
+            "iterations_saved": saved
+        })
+        self._record_decision(
+            state,
+            "halt_for_human",
+            f"Stopping revisions at score {overall_score}: {reason}, {saved} iterations saved"
+        )
+        return True
+    
+    def safety_block_reason(self, state: Any) -> Optional[str]:
+        """
+        Check the current draft's safety result against the short-circuit rules.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            Name of the first rule that blocks the draft, or None
+        """
+        if not self._has_recent_safety_check(state):
+            return None
+        
+        rules = settings.review_short_circuit_rules
+        rating = str(state.scratchpad["safety_checks"][-1].get("rating", "")).upper()
+        
+        if "unsafe_rating" in rules and rating == "UNSAFE":
+            return "unsafe_rating"
+        if "needs_revision_rating" in rules and rating == "NEEDS_REVISION":
+            return "needs_revision_rating"
+        if "high_severity" in rules and any(
+            flag.severity == SafetySeverity.HIGH and flag.iteration == state.iteration_count
+            for flag in state.safety_flags
+        ):
+            return "high_severity"
+        return None
+    
     def _has_recent_safety_check(self, state: Any) -> bool:
         """
         Check if safety validation has been performed for current draft.
@@ -0,0 +1,193 @@
+"""
+Intent Triage Agent - Routes intents that must not get generated content.
+"""
+
+import re
+from typing import Any, Optional, Tuple
+
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from config import settings
+from models.llm_client import get_llm_client
+from models.prompts import TRIAGE_SYSTEM_PROMPT, TRIAGE_TEMPLATES, get_triage_user_prompt
+from .base_agent import BaseAgent, AgentResponse
+
+
+# Medications named often enough in requests to recognize by name
+MEDICATION_NAMES = (
+    r"medications?|meds|antidepressants?|pills|ssris?|snris?|benzos?|benzodiazepines?|"
+    r"sertraline|fluoxetine|escitalopram|citalopram|paroxetine|venlafaxine|duloxetine|"
+    r"bupropion|mirtazapine|lithium|quetiapine|aripiprazole|lorazepam|alprazolam|"
+    r"clonazepam|diazepam|zoloft|prozac|lexapro|paxil|effexor|cymbalta|wellbutrin|"
+    r"seroquel|abilify|xanax|klonopin|ativan|valium"
+)
+
+# Unambiguous intents, checked in order (crisis wins over medication)
+ROUTE_PATTERNS = {
+    "crisis": re.compile(
+        r"\bi\s*(?:'m|am)\s+(?:feeling\s+|so\s+|really\s+)?suicidal\b"
+        r"|\bi\s+(?:really\s+)?(?:want|wanna|plan|intend|am\s+going|'m\s+going)\s+(?:to\s+)?"
+        r"(?:kill\s+myself|end\s+(?:my\s+life|it\s+all)|die|commit\s+suicide|hurt\s+myself|take\s+my\s+(?:own\s+)?life)\b"
+        r"|\bi\s+(?:don'?t|do\s+not)\s+want\s+to\s+(?:live|be\s+alive|wake\s+up)\b"
+        r"|\bi(?:'ve|\s+have)\s+been\s+(?:cutting|hurting|harming)\s+myself\b"
+        r"|\bi(?:'d|\s+would)\s+be\s+better\s+off\s+dead\b",
+        re.IGNORECASE
+    ),
+    "medication": re.compile(
+        r"\bhow\s+(?:much|many)\b[^.?!]{0,30}\b(?:mg|" + MEDICATION_NAMES + r")\b[^.?!]{0,20}\b(?:take|use)\b"
+        r"|\bwhat\s+(?:dose|dosage)\s+of\b"
+        r"|\b(?:should|can|do)\s+i\s+(?:stop|quit|taper|increase|decrease|double|halve|come\s+off|switch)\b"
+        r"[^.?!]{0,30}\b(?:" + MEDICATION_NAMES + r")\b"
+        r"|\b(?:taper(?:ing)?|wean(?:ing)?)\s+(?:off\s+|schedule\s+for\s+)?(?:my\s+)?(?:" + MEDICATION_NAMES + r")\b",
+        re.IGNORECASE
+    ),
+}
+
+# Topics that may or may not be one of the routes above ("safety planning
+# for clients with suicidal ideation" is a legitimate protocol request)
+AMBIGUOUS_PATTERN = re.compile(
+    r"\b(?:suicid\w*|self[-\s]?harm\w*|overdos\w*|kill\s+myself|end\s+my\s+life|want\s+to\s+die"
+    r"|doses?|dosage|mg|" + MEDICATION_NAMES + r")\b",
+    re.IGNORECASE
+)
+
+PROCEED = "proceed"
+
+
+class TriageAgent(BaseAgent):
+    """
+    Triage Agent responsible for routing intents before any drafting.
+    
+    Intents describing active suicidal ideation or asking for medication
+    advice are answered with a fixed, pre-approved template instead of a
+    generated protocol. A local pattern classifier decides clear cases; an
+    optional small model (settings.triage_model) decides ambiguous ones.
+    """
+    
+    def __init__(self):
+        super().__init__(
+            name="Intent_Triage",
+            role="Intent Triage and Crisis Routing",
+            temperature=0.0,
+            max_tokens=5
+        )
+        
+        # Created on first ambiguous intent, and only if a model is configured
+        self.llm = None
+        
+        self.logger.info(f"Intent Triage initialized (model: {settings.triage_model or 'local rules only'})")
+    
+    def get_system_prompt(self) -> str:
+        """Get the system prompt for the triage classifier."""
+        return TRIAGE_SYSTEM_PROMPT
+    
+    def process(self, state: Any) -> AgentResponse:
+        """
+        Classify the user intent.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            AgentResponse with the route in metadata and, for triaged
+            intents, the template as content
+        """
+        route, method, matched = self.classify_locally(state.user_intent)
+        
+        if route is None:
+            route, method = PROCEED, "local"
+            if self._use_model():
+                try:
+                    route, method = self._parse_label(self._invoke_llm(self._build_messages(state))), "model"
+                except Exception as e:
+                    # Fail open: the draft still goes through the safety review
+                    self.logger.warning(f"Triage model call failed, proceeding to drafting: {str(e)}")
+        
+        return self._build_response(route, method, matched)
+    
+    async def aprocess(self, state: Any) -> AgentResponse:
+        """
+        Async variant of process() backed by the provider's native ainvoke.
+        
+        Args:
+            state: Current protocol state
+            
+        Returns:
+            AgentResponse with the route in metadata
+        """
+        route, method, matched = self.classify_locally(state.user_intent)
+        
+        if route is None:
+            route, method = PROCEED, "local"
+            if self._use_model():
+                try:
+                    route, method = self._parse_label(await self._ainvoke_llm(self._build_messages(state))), "model"
+                except Exception as e:
+                    # Fail open: the draft still goes through the safety review
+                    self.logger.warning(f"Triage model call failed, proceeding to drafting: {str(e)}")
+        
+        return self._build_response(route, method, matched)
+    
+    def classify_locally(self, intent: str) -> Tuple[Optional[str], str, Optional[str]]:
+        """
+        Classify an intent with the local patterns.
+        
+        Args:
+            intent: User intent
+            
+        Returns:
+            (route, method, matched text); route is None when the intent is
+            ambiguous and should go to the model
+        """
+        for route, pattern in ROUTE_PATTERNS.items():
+            match = pattern.search(intent)
+            if match:
+                return route, "local", match.group(0)
+        
+        match = AMBIGUOUS_PATTERN.search(intent)
+        if match:
+            return None, "local", match.group(0)
+        
+        return PROCEED, "local", None
+    
+    def _use_model(self) -> bool:
+        """Whether ambiguous intents go to the small model."""
+        if not settings.triage_model:
+            return False
+        if self.llm is None:
+            self.llm = get_llm_client(model=settings.triage_model, temperature=0.0, max_tokens=self.max_tokens)
+        return True
+    
+    def _build_messages(self, state: Any) -> list:
+        """Build the LLM messages for classifying the intent."""
+        return [
+            SystemMessage(content=self.get_system_prompt()),
+            HumanMessage(content=get_triage_user_prompt(state.user_intent))
+        ]
+    
+    def _parse_label(self, label: str) -> str:
+        """Map the model's label to a route (anything unrecognized proceeds)."""
+        label = label.strip().upper()
+        if label.startswith("CRISIS"):
+            return "crisis"
+        if label.startswith("MEDICATION"):
+            return "medication"
+        return PROCEED
+    
+    def _build_response(self, route: str, method: str, matched: Optional[str]) -> AgentResponse:
+        """Package a triage decision as an agent response."""
+        self._log_action("Intent triaged", {"route": route, "method": method})
+        
+        return self._create_response(
+            content=TRIAGE_TEMPLATES.get(route, ""),
+            reasoning=(
+                f"Intent routed to the pre-approved '{route}' response ({method} classifier)"
+                if route != PROCEED else f"Intent cleared for drafting ({method} classifier)"
+            ),
+            confidence=0.9 if method == "local" else 0.8,
+            metadata={
+                "route": route,
+                "method": method,
+                "matched": matched
+            }
+        )
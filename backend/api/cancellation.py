@@ -0,0 +1,211 @@
+"""
+Cancellation of protocol generation runs.
+
+Queued and running jobs are cancelled through the job queue, which frees
+the worker as soon as the run's task has unwound; cancelling the task
+also cancels the agent's in-flight provider request. Runs outside the
+queue (job queue disabled, /resume, /generate-stream) register their task
+here with run_cancellable or stream_cancellable; a thread that is
+mid-run but has no registered task cannot be cancelled (409).
+
+The thread's checkpoint is then marked CANCELLED and written as the
+finalize node's output, so the thread is complete: it is not recovered,
+resumed or reported as in progress afterwards.
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Dict, Iterable, Set, TypeVar
+
+from fastapi import HTTPException
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from config import settings
+from graph.registry import get_compiled_workflow
+from state.protocol_state import ProtocolState, ApprovalStatus
+from utils.logger import logger
+
+from .job_queue import JobStatus, get_job_queue
+
+
+T = TypeVar("T")
+
+FINISHED_STATUSES = (ApprovalStatus.APPROVED, ApprovalStatus.EDITED, ApprovalStatus.CANCELLED)
+
+
+class WorkflowCancelledError(Exception):
+    """Raised by run_cancellable when cancel_workflow stopped the run."""
+
+
+# Thread id -> task of a run started outside the job queue
+_runs: Dict[str, asyncio.Task] = {}
+_cancel_requested: Set[str] = set()
+# Detached cancel_in_background tasks, referenced until done
+_background: Set[asyncio.Task] = set()
+
+
+async def run_cancellable(thread_id: str, awaitable: Awaitable[T]) -> T:
+    """
+    Run a thread's workflow in its own task so cancel_workflow can stop it.
+    
+    Args:
+        thread_id: Thread being run
+        awaitable: The workflow invocation
+        
+    Returns:
+        The invocation's result
+        
+    Raises:
+        WorkflowCancelledError: If the run was cancelled through cancel_workflow
+    """
+    task = asyncio.ensure_future(awaitable)
+    _runs[thread_id] = task
+    try:
+        return await task
+    except asyncio.CancelledError:
+        # Cancelled by request, rather than the caller itself being cancelled
+        if thread_id in _cancel_requested:
+            raise WorkflowCancelledError(f"Workflow for thread {thread_id} was cancelled")
+        raise
+    finally:
+        _runs.pop(thread_id, None)
+        _cancel_requested.discard(thread_id)
+
+
+_END = object()
+
+
+async def stream_cancellable(thread_id: str, stream: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    Iterate a thread's workflow stream in its own task so cancel_workflow can stop it.
+    
+    Args:
+        thread_id: Thread being run
+        stream: The workflow's event stream
+        
+    Yields:
+        The stream's items
+        
+    Raises:
+        WorkflowCancelledError: If the run was cancelled through cancel_workflow
+    """
+    items: asyncio.Queue = asyncio.Queue()
+    
+    async def pump():
+        try:
+            async for item in stream:
+                items.put_nowait(item)
+        finally:
+            items.put_nowait(_END)
+    
+    task = asyncio.ensure_future(pump())
+    _runs[thread_id] = task
+    try:
+        while (item := await items.get()) is not _END:
+            yield item
+        # Re-raises the stream's error or cancellation
+        await task
+    except asyncio.CancelledError:
+        if thread_id in _cancel_requested:
+            raise WorkflowCancelledError(f"Workflow for thread {thread_id} was cancelled")
+        raise
+    finally:
+        # Stops the run when the consumer goes away
+        task.cancel()
+        _runs.pop(thread_id, None)
+        _cancel_requested.discard(thread_id)
+
+
+async def _cancel_run(thread_id: str) -> bool:
+    """Cancel a run registered by run_cancellable and wait for it to unwind."""
+    task = _runs.get(thread_id)
+    if task is None or task.done():
+        return False
+    _cancel_requested.add(thread_id)
+    task.cancel()
+    await asyncio.wait({task})
+    return True
+
+
+async def cancel_workflow(
+    thread_id: str,
+    checkpointer: BaseCheckpointSaver,
+    reason: str = "Cancelled by request"
+) -> ProtocolState:
+    """
+    Stop a thread's run (queued, running or halted for review) and record it as cancelled.
+    
+    Args:
+        thread_id: Thread to cancel
+        checkpointer: Checkpointer the thread's state is stored in
+        reason: Recorded in the thread's errors and the job's error
+        
+    Returns:
+        The cancelled state, as checkpointed
+        
+    Raises:
+        HTTPException: 404 if the thread is unknown, 409 if it has already
+            finished or is running where it cannot be stopped
+    """
+    job = await get_job_queue().cancel(thread_id, reason) if settings.job_queue_enabled else None
+    stopped = (job is not None and job.status == JobStatus.CANCELLED) or await _cancel_run(thread_id)
+    
+    config = {"configurable": {"thread_id": thread_id}}
+    checkpoint = await checkpointer.aget(config)
+    snapshot = None
+    if checkpoint and checkpoint["channel_values"]:
+        state = ProtocolState(**checkpoint["channel_values"])
+        snapshot = await get_compiled_workflow(checkpointer, state.source).aget_state(config)
+    elif job is not None:
+        # Cancelled before its first checkpoint
+        state = job.initial_state()
+    else:
+        raise HTTPException(status_code=404, detail=f"Thread {thread_id} not found")
+    
+    if not stopped and (state.is_finalized or state.approval_status in FINISHED_STATUSES):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Workflow has already finished. Current status: {state.approval_status}"
+        )
+    stored_job = get_job_queue().get(thread_id) if settings.job_queue_enabled else None
+    abandoned = stored_job is not None and stored_job.status == JobStatus.FAILED
+    if not stopped and snapshot is not None and snapshot.next and not abandoned:
+        # Mid-run with no task here to stop; a CANCELLED checkpoint would be overwritten
+        raise HTTPException(
+            status_code=409,
+            detail=f"Workflow is running and cannot be cancelled. Current status: {state.approval_status}"
+        )
+    
+    state.cancel(reason)
+    # Written as the finalize node's output, so nothing runs after it
+    compiled_workflow = get_compiled_workflow(checkpointer, state.source)
+    await compiled_workflow.aupdate_state(config, state, as_node="finalize")
+    
+    logger.info(f"Cancelled thread {thread_id} at iteration {state.iteration_count} ({'run stopped' if stopped else 'not running'})")
+    return state
+
+
+def cancel_in_background(thread_ids: Iterable[str], checkpointer: BaseCheckpointSaver, reason: str):
+    """
+    Cancel threads from a task of their own.
+    
+    For cleanup code that is itself being cancelled (a streaming response
+    whose client went away), where an awaited cancel would be cut short.
+    
+    Args:
+        thread_ids: Threads to cancel (finished ones are skipped)
+        checkpointer: Checkpointer the threads' state is stored in
+        reason: Recorded as for cancel_workflow
+    """
+    thread_ids = list(thread_ids)
+    
+    async def cancel_all():
+        for thread_id in thread_ids:
+            try:
+                await cancel_workflow(thread_id, checkpointer, reason)
+            except HTTPException:
+                # Finished in the meantime
+                pass
+    
+    task = asyncio.create_task(cancel_all())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
@@ -5,77 +5,40 @@ FastAPI dependencies for dependency injection.
 from typing import Optional, Any, Tuple
 from fastapi import HTTPException, Header
 
-from graph.workflow import create_protocol_workflow
+from graph.workflow import WorkflowVariant
+from graph.registry import get_compiled_workflow
 from state.protocol_state import ProtocolState
-from database import get_checkpointer, get_async_checkpointer
+from database import get_checkpointer, get_shared_async_checkpointer
 from utils.logger import logger
 
-# Global workflow instance for sync operations (read-only)
-_sync_workflow: Optional[Any] = None
-
 
 def get_sync_workflow() -> Any:
     """
     Get compiled workflow for synchronous operations (like get_state).
     
-    Uses synchronous SqliteSaver.
+    Uses synchronous SqliteSaver; the compiled graph comes from the
+    shared workflow registry.
     
     Returns:
         Compiled workflow with sync checkpointer
     """
-    global _sync_workflow
-    
-    if _sync_workflow is None:
-        logger.info("Compiling synchronous workflow for state retrieval")
-        
-        checkpointer = get_checkpointer()
-        workflow_graph = create_protocol_workflow()
-        _sync_workflow = workflow_graph.compile(checkpointer=checkpointer)
-        
-        logger.info("Synchronous workflow compiled and cached")
-    
-    return _sync_workflow
+    return get_compiled_workflow(get_checkpointer())
 
 
-async def get_async_workflow():
+async def get_async_workflow(variant: WorkflowVariant = "web"):
     """
     Get compiled workflow for async operations (like ainvoke).
     
-    Creates a new compiled workflow with AsyncSqliteSaver each time.
-    
-    Returns:
-        Compiled workflow with async checkpointer
-    """
-    logger.info("Compiling workflow with async checkpointer")
-    
-    workflow_graph = create_protocol_workflow()
+    Uses the shared async checkpointer created at startup.
     
-    # Get async checkpointer context manager
-    checkpointer_cm = get_async_checkpointer()
-    
-    # Enter the async context and compile
-    async with checkpointer_cm as checkpointer:
-        compiled_workflow = workflow_graph.compile(checkpointer=checkpointer)
-        return compiled_workflow, checkpointer_cm
-
-
-async def get_workflow_with_async_checkpointer():
-    """
-    Get workflow graph and async checkpointer context manager for streaming.
-    
-    This returns the uncompiled workflow graph and the async checkpointer
-    context manager. The caller must enter the async context and compile
-    the workflow with the checkpointer.
+    Args:
+        variant: Workflow variant ("web" or "mcp")
     
     Returns:
-        Tuple of (workflow_graph, async_checkpointer_context_manager)
+        Compiled workflow with async checkpointer
     """
-    logger.info("Creating workflow with async checkpointer for streaming")
-    
-    workflow_graph = create_protocol_workflow()
-    checkpointer_cm = get_async_checkpointer()
-    
-    return workflow_graph, checkpointer_cm
+    checkpointer = await get_shared_async_checkpointer()
+    return get_compiled_workflow(checkpointer, variant)
 
 
 def get_current_state(thread_id: str) -> ProtocolState:
@@ -34,7 +34,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     
     return JSONResponse(
         status_code=exc.status_code,
-        content=error_response.model_dump(mode='json')  # Use Pydantic JSON serialization
+        content=error_response.model_dump(mode='json'),  # Use Pydantic JSON serialization
+        headers=getattr(exc, "headers", None)  # e.g. Retry-After on 503
     )
 
 
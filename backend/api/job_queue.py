@@ -0,0 +1,619 @@
+"""
+Persistent job queue for protocol generation.
+
+POST /api/generate enqueues a job and returns its thread_id at once; a
+bounded pool of asyncio workers runs the graph. Jobs are stored in a
+SQLite file, so queued jobs (and jobs a shutdown interrupted) run after a
+restart. Admission control turns new jobs away with 503 + Retry-After
+when the queue is too deep or the estimated wait too long.
+
+Jobs belong to a scheduling class (interactive web requests, MCP
+automation, batch). Free workers go to the class with the lowest virtual
+time, which advances by 1/weight per dispatch (start-time fair queueing),
+and round-robin between API keys within it. A class never holds more than
+its share of the workers, and a job waiting past the aging limit is run
+next whatever its class.
+
+cancel() drops a queued job, or cancels a running job's task (and with it
+the in-flight provider request), freeing its worker for the next job.
+"""
+
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from config import settings
+from models.llm_client import SchedulerMetrics
+from state.protocol_state import ProtocolState
+from utils.helpers import hash_text
+from utils.logger import logger
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a generation job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+ANONYMOUS_CLIENT = "anonymous"
+
+COLUMNS = (
+    "thread_id", "source", "payload", "status", "enqueued_at", "started_at",
+    "finished_at", "error", "attempts", "priority_class", "client_key"
+)
+
+
+def client_key_for(api_key: Optional[str]) -> str:
+    """Fair-queueing key for an API key (hashed, so raw keys are never stored)."""
+    return hash_text(api_key)[:16] if api_key else ANONYMOUS_CLIENT
+
+
+@dataclass
+class Job:
+    """A queued workflow run and the fields its initial state is built from."""
+    thread_id: str
+    source: str
+    payload: Dict[str, Any]
+    status: JobStatus = JobStatus.QUEUED
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    priority_class: str = "interactive"
+    client_key: str = ANONYMOUS_CLIENT
+    
+    def initial_state(self) -> ProtocolState:
+        """Initial workflow state for this job's thread."""
+        return ProtocolState(thread_id=self.thread_id, source=self.source, **self.payload)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly view for the jobs endpoints."""
+        return {
+            "thread_id": self.thread_id,
+            "source": self.source,
+            "status": self.status.value,
+            "priority_class": self.priority_class,
+            "user_intent": self.payload.get("user_intent"),
+            "enqueued_at": self.enqueued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "attempts": self.attempts,
+        }
+
+
+class QueueFullError(Exception):
+    """Raised when admission control turns a job away."""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+JobRunner = Callable[[Job], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    Generation jobs served by a fixed pool of asyncio workers.
+    
+    SQLite is the durable record of every job; the per-class, per-key
+    queues and the active jobs are kept in memory and rebuilt from it by
+    start().
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_wait: Optional[float] = None
+    ):
+        """
+        Initialize the queue (defaults come from settings).
+        
+        Args:
+            path: SQLite file the jobs are stored in
+            workers: Number of workflows run at once
+            max_depth: Queued jobs at which new jobs are rejected
+            max_wait: Estimated wait (seconds) at which new jobs are rejected
+        """
+        self.path = path or settings.job_queue_path
+        self.workers = workers or settings.job_queue_workers
+        self.max_depth = max_depth or settings.job_queue_max_depth
+        self.max_wait = settings.job_queue_max_wait if max_wait is None else max_wait
+        
+        self.weights = dict(settings.job_queue_class_weights)
+        self.shares = {name: settings.job_queue_class_shares.get(name, 1.0) for name in self.weights}
+        
+        self._jobs: Dict[str, Job] = {}
+        # Class -> API key -> queued thread ids; key order is the round-robin order
+        self._queues: Dict[str, "OrderedDict[str, Deque[str]]"] = {name: OrderedDict() for name in self.weights}
+        self._queued = 0
+        self._running = 0
+        self._class_running = {name: 0 for name in self.weights}
+        self._vtime = {name: 0.0 for name in self.weights}
+        self._virtual_clock = 0.0
+        self.class_metrics = {name: SchedulerMetrics() for name in self.weights}
+        self._ready: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        # Thread id -> task running that job's runner
+        self._run_tasks: Dict[str, asyncio.Task] = {}
+        self._runner: Optional[JobRunner] = None
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._mean_run_seconds = settings.job_queue_default_run_seconds
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0, "recovered": 0, "aged": 0}
+        
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "thread_id TEXT PRIMARY KEY, source TEXT NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, enqueued_at REAL NOT NULL, started_at REAL, "
+            "finished_at REAL, error TEXT, attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Queue files from before scheduling classes
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "priority_class" not in existing:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN priority_class TEXT NOT NULL DEFAULT 'interactive'")
+            self._conn.execute(f"ALTER TABLE jobs ADD COLUMN client_key TEXT NOT NULL DEFAULT '{ANONYMOUS_CLIENT}'")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at)")
+        self._conn.commit()
+    
+    # Persistence
+    
+    def _save(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                (
+                    job.thread_id, job.source, json.dumps(job.payload), job.status.value,
+                    job.enqueued_at, job.started_at, job.finished_at, job.error, job.attempts,
+                    job.priority_class, job.client_key
+                )
+            )
+            self._conn.commit()
+    
+    @staticmethod
+    def _from_row(row: tuple) -> Job:
+        fields = dict(zip(COLUMNS, row))
+        fields["payload"] = json.loads(fields["payload"])
+        fields["status"] = JobStatus(fields["status"])
+        return Job(**fields)
+    
+    def _recover(self) -> int:
+        """Load unfinished jobs in submission order; returns how many were requeued."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - settings.job_queue_retention,)
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY enqueued_at",
+                tuple(status.value for status in ACTIVE_STATUSES)
+            ).fetchall()
+            durations = self._conn.execute(
+                "SELECT finished_at - started_at FROM jobs WHERE status = ? "
+                "ORDER BY finished_at DESC LIMIT 20",
+                (JobStatus.COMPLETED.value,)
+            ).fetchall()
+        
+        if durations:
+            self._mean_run_seconds = sum(duration for duration, in durations) / len(durations)
+        
+        recovered = 0
+        for row in rows:
+            job = self._from_row(row)
+            if job.status == JobStatus.RUNNING:
+                # Interrupted by a shutdown: run it again unless it keeps dying
+                if job.attempts >= settings.job_queue_max_attempts:
+                    job.status, job.finished_at = JobStatus.FAILED, time.time()
+                    job.error = f"Interrupted {job.attempts} times"
+                    self._save(job)
+                    continue
+                job.status = JobStatus.QUEUED
+                self._save(job)
+            if job.priority_class not in self.weights:
+                job.priority_class = min(self.weights, key=self.weights.get)
+            self._enqueue(job)
+            recovered += 1
+        
+        self.stats["recovered"] += recovered
+        return recovered
+    
+    # Lifecycle
+    
+    async def start(self, runner: JobRunner) -> int:
+        """
+        Requeue unfinished jobs and start the workers.
+        
+        Args:
+            runner: Coroutine function that runs one job's workflow
+            
+        Returns:
+            Number of jobs recovered from the queue file
+        """
+        self._runner = runner
+        self._ready = asyncio.Condition()
+        recovered = self._recover()
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        logger.info(f"Job queue started: {self.workers} workers, {recovered} jobs recovered")
+        return recovered
+    
+    async def stop(self):
+        """Stop the workers; running jobs stay RUNNING and are requeued by the next start()."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for futures in self._waiters.values():
+            for future in futures:
+                future.cancel()
+        self._waiters = {}
+        with self._lock:
+            self._conn.close()
+    
+    # Admission and submission
+    
+    def estimated_wait(self, ahead: Optional[int] = None) -> float:
+        """
+        Seconds a job would wait for a worker.
+        
+        Args:
+            ahead: Jobs ahead of it (default: every queued job)
+            
+        Returns:
+            Estimate from the mean run time of recent jobs
+        """
+        ahead = self._queued if ahead is None else ahead
+        busy = self._running + ahead - self.workers + 1
+        return max(0, busy) / self.workers * self._mean_run_seconds
+    
+    def retry_after(self) -> int:
+        """Seconds until a worker is expected to free up."""
+        return max(1, math.ceil(self._mean_run_seconds / self.workers))
+    
+    def check_admission(self):
+        """
+        Raise if a new job should be turned away.
+        
+        Raises:
+            QueueFullError: Queue depth or estimated wait over its limit
+        """
+        if self._queued >= self.max_depth:
+            reason = f"Job queue is full ({self._queued} queued)"
+        elif self.estimated_wait() > self.max_wait:
+            reason = f"Estimated wait of {self.estimated_wait():.0f}s exceeds {self.max_wait:.0f}s"
+        else:
+            return
+        self.stats["rejected"] += 1
+        raise QueueFullError(reason, self.retry_after())
+    
+    def class_for(self, source: str) -> str:
+        """Scheduling class of a request source."""
+        return settings.job_queue_source_classes.get(source, min(self.weights, key=self.weights.get))
+    
+    async def submit(
+        self,
+        state: ProtocolState,
+        client_key: str = ANONYMOUS_CLIENT,
+        priority_class: Optional[str] = None
+    ) -> Job:
+        """
+        Enqueue a workflow run for a new thread.
+        
+        Args:
+            state: Initial state of the thread
+            client_key: Fair-queueing key (see client_key_for)
+            priority_class: Scheduling class (default: from the state's source)
+            
+        Returns:
+            The queued job
+            
+        Raises:
+            ValueError: If the class is unknown
+            QueueFullError: If admission control rejects the job
+        """
+        priority_class = priority_class or self.class_for(state.source)
+        if priority_class not in self.weights:
+            raise ValueError(f"Unknown scheduling class: {priority_class}")
+        self.check_admission()
+        
+        job = Job(
+            thread_id=state.thread_id,
+            source=state.source,
+            payload={
+                "user_intent": state.user_intent,
+                "max_iterations": state.max_iterations,
+                "full_critic_reviews": state.full_critic_reviews,
+            },
+            priority_class=priority_class,
+            client_key=client_key
+        )
+        self._save(job)
+        
+        async with self._ready:
+            self._enqueue(job)
+            self._ready.notify_all()
+        
+        self.stats["submitted"] += 1
+        logger.info(f"Queued job {job.thread_id} ({job.priority_class}), {self._queued} queued")
+        return job
+    
+    async def wait(self, thread_id: str) -> Optional[Job]:
+        """
+        Wait until a thread's job has finished.
+        
+        Args:
+            thread_id: Thread of the job
+            
+        Returns:
+            The finished job (None if there is no job for the thread)
+        """
+        if thread_id not in self._jobs:
+            return self.get(thread_id)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(thread_id, []).append(future)
+        return await future
+    
+    async def cancel(self, thread_id: str, reason: str = "Cancelled") -> Optional[Job]:
+        """
+        Cancel a thread's queued or running job.
+        
+        A queued job is removed from its queue. A running job's task is
+        cancelled and this returns once it has unwound and its worker is free.
+        
+        Args:
+            thread_id: Thread of the job
+            reason: Stored as the job's error
+            
+        Returns:
+            The cancelled job (None if the thread has no active job)
+        """
+        job = self._jobs.get(thread_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return None
+        
+        async with self._ready:
+            # A worker may have selected the job while we waited for the lock
+            queued = self._is_queued(job)
+            if queued:
+                self._dequeue(job)
+        if queued:
+            job.status, job.error = JobStatus.CANCELLED, reason
+            self.stats["cancelled"] += 1
+            self._finish(job)
+            logger.info(f"Cancelled queued job {thread_id}")
+            return job
+        
+        task = self._run_tasks.get(thread_id)
+        if task is None:
+            # Finished while we waited for the lock
+            return None
+        finished = self.wait(thread_id)
+        if task.cancel():
+            job.error = reason
+        job = await finished
+        logger.info(f"Cancel of running job {thread_id}: {job.status.value} after {job.finished_at - job.started_at:.1f}s")
+        return job
+    
+    # Inspection
+    
+    def get(self, thread_id: str) -> Optional[Job]:
+        """Active job for a thread, else its stored record (None if unknown)."""
+        job = self._jobs.get(thread_id)
+        if job is not None:
+            return job
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE thread_id = ?", (thread_id,)).fetchone()
+        return self._from_row(row) if row else None
+    
+    def position(self, thread_id: str) -> Optional[int]:
+        """1-based position of a queued job among its class's queued jobs (None if it is not queued)."""
+        job = self._jobs.get(thread_id)
+        if job is None or job.status != JobStatus.QUEUED:
+            return None
+        return 1 + sum(
+            1 for queue in self._queues[job.priority_class].values() for other in queue
+            if self._jobs[other].enqueued_at < job.enqueued_at
+        )
+    
+    def describe(self, job: Job) -> Dict[str, Any]:
+        """Job fields plus its queue position and estimated wait."""
+        position = self.position(job.thread_id)
+        return {
+            **job.to_dict(),
+            "queue_position": position,
+            "estimated_wait_seconds": round(self.estimated_wait(position - 1), 1) if position else None,
+        }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, worker usage, counters and per-class queue waits (seconds)."""
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queued,
+            "max_depth": self.max_depth,
+            "estimated_wait_seconds": round(self.estimated_wait(), 1),
+            "mean_run_seconds": round(self._mean_run_seconds, 1),
+            **self.stats,
+            "classes": {
+                name: {
+                    "weight": self.weights[name],
+                    "max_workers": self._class_limit(name),
+                    "running": self._class_running[name],
+                    "queued": sum(len(queue) for queue in self._queues[name].values()),
+                    "clients": len(self._queues[name]),
+                    "wait": self.class_metrics[name].get_stats(),
+                }
+                for name in self.weights
+            },
+        }
+    
+    # Scheduling
+    
+    def _class_limit(self, name: str) -> int:
+        """Workers a class may hold at once."""
+        return max(1, math.floor(self.shares[name] * self.workers))
+    
+    def _enqueue(self, job: Job):
+        """Add a queued job to its class and key queues."""
+        queues = self._queues[job.priority_class]
+        if not queues:
+            # A class returning from idle does not get credit for the idle time
+            self._vtime[job.priority_class] = max(self._vtime[job.priority_class], self._virtual_clock)
+        queues.setdefault(job.client_key, deque()).append(job.thread_id)
+        self._jobs[job.thread_id] = job
+        self._queued += 1
+        
+        metrics = self.class_metrics[job.priority_class]
+        metrics.queued += 1
+        metrics.max_queue_depth = max(metrics.max_queue_depth, sum(len(queue) for queue in queues.values()))
+    
+    def _is_queued(self, job: Job) -> bool:
+        """Whether a job is still in its key queue (not yet selected by a worker)."""
+        return job.thread_id in self._queues[job.priority_class].get(job.client_key, ())
+    
+    def _dequeue(self, job: Job):
+        """Remove a queued job from its key queue."""
+        queues = self._queues[job.priority_class]
+        queues[job.client_key].remove(job.thread_id)
+        if not queues[job.client_key]:
+            del queues[job.client_key]
+        self._queued -= 1
+    
+    def _select(self) -> Optional[Job]:
+        """Dequeue the next job to run, or None if no class may start one."""
+        eligible = [
+            name for name, queues in self._queues.items()
+            if queues and self._class_running[name] < self._class_limit(name)
+        ]
+        if not eligible:
+            return None
+        
+        # Anti-starvation: the oldest job past the aging limit goes first
+        now = time.time()
+        heads = {
+            name: min(self._queues[name].items(), key=lambda item: self._jobs[item[1][0]].enqueued_at)
+            for name in eligible
+        }
+        aged = [name for name in eligible if now - self._jobs[heads[name][1][0]].enqueued_at >= settings.job_queue_aging_seconds]
+        if aged:
+            name = min(aged, key=lambda n: self._jobs[heads[n][1][0]].enqueued_at)
+            key = heads[name][0]
+            self.stats["aged"] += 1
+        else:
+            name = min(eligible, key=lambda n: (self._vtime[n], -self.weights[n]))
+            key = next(iter(self._queues[name]))
+        
+        queues = self._queues[name]
+        job = self._jobs[queues[key].popleft()]
+        # Round-robin: the key goes to the back of its class's order
+        if queues[key]:
+            queues.move_to_end(key)
+        else:
+            del queues[key]
+        
+        self._virtual_clock = self._vtime[name]
+        self._vtime[name] += 1.0 / self.weights[name]
+        self._queued -= 1
+        self._class_running[name] += 1
+        self._running += 1
+        self.class_metrics[name].record_wait(now - job.enqueued_at)
+        return job
+    
+    # Workers
+    
+    async def _next_job(self) -> Job:
+        async with self._ready:
+            job = None
+            while job is None:
+                job = self._select()
+                if job is None:
+                    await self._ready.wait()
+            return job
+    
+    async def _worker(self, index: int):
+        while True:
+            job = await self._next_job()
+            job.status, job.started_at = JobStatus.RUNNING, time.time()
+            job.attempts += 1
+            self._save(job)
+            
+            # Own task, so cancel() can stop the job without stopping the worker
+            task = asyncio.create_task(self._runner(job))
+            self._run_tasks[job.thread_id] = task
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                # Shutdown: the job stays RUNNING and is requeued on restart
+                task.cancel()
+                raise
+            finally:
+                self._run_tasks.pop(job.thread_id, None)
+                # Wake workers a class share was holding back
+                async with self._ready:
+                    self._running -= 1
+                    self._class_running[job.priority_class] -= 1
+                    self._ready.notify_all()
+            
+            if task.cancelled():
+                job.status = JobStatus.CANCELLED
+                self.stats["cancelled"] += 1
+            elif task.exception() is not None:
+                e = task.exception()
+                logger.error(f"Job {job.thread_id} failed: {str(e)}", exc_info=e)
+                job.status, job.error = JobStatus.FAILED, str(e)
+                self.stats["failed"] += 1
+            else:
+                job.status = JobStatus.COMPLETED
+                self.stats["completed"] += 1
+                # Exponential moving average for the wait estimate
+                self._mean_run_seconds += 0.2 * (time.time() - job.started_at - self._mean_run_seconds)
+            
+            self._finish(job)
+    
+    def _finish(self, job: Job):
+        """Record a job's end and resolve its waiters."""
+        job.finished_at = time.time()
+        self._save(job)
+        self._jobs.pop(job.thread_id, None)
+        for future in self._waiters.pop(job.thread_id, []):
+            if not future.done():
+                future.set_result(job)
+
+
+# Global queue instance
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get or create the global generation job queue."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
+
+
+async def stop_job_queue():
+    """Stop the global queue's workers and drop it (a later get_job_queue() reopens the file)."""
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue = None
@@ -0,0 +1,227 @@
+"""
+Cache of finalized protocols keyed by normalized user intent.
+
+Requests that differ only in case, whitespace, punctuation or filler words
+("Create an exposure hierarchy for agoraphobia." vs "exposure hierarchy for agoraphobia")
+are served a copy of an already finalized protocol instead of running the
+draft/safety/critic loop again. Keys include the prompt version, so a
+prompt change invalidates every entry, and the request source, so a web
+request is only served protocols a human reviewer approved or edited.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import settings
+from models.prompts import get_prompt_version
+from state.protocol_state import ProtocolState, ApprovalStatus
+from utils.helpers import hash_text
+from utils.logger import logger
+
+
+# Filler words that do not change what protocol is being asked for
+STOP_WORDS = frozenset({"please", "a", "an", "the", "create", "generate"})
+
+
+def normalize_intent(intent: str) -> str:
+    """
+    Normalize a user intent for cache lookups.
+    
+    Args:
+        intent: Raw user intent
+        
+    Returns:
+        Lowercased intent without punctuation, extra whitespace or stop words
+    """
+    text = unicodedata.normalize("NFKC", intent).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(word for word in text.split() if word not in STOP_WORDS)
+
+
+@dataclass
+class CachedProtocol:
+    """A finalized protocol and where it came from."""
+    key: str
+    normalized_intent: str
+    source: str
+    prompt_version: str
+    source_thread_id: str
+    values: Dict[str, Any]
+    cached_at: float
+    hits: int = 0
+
+
+class ProtocolCache:
+    """
+    In-memory LRU of finalized protocols with a TTL.
+    
+    Only APPROVED or EDITED (finalized) states are stored; a hit is a copy
+    of the stored state that the caller checkpoints under a new thread.
+    """
+    
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Initialize the cache (defaults come from settings).
+        
+        Args:
+            ttl: Seconds an entry stays valid
+            max_entries: Maximum number of cached protocols
+        """
+        self.ttl = settings.protocol_cache_ttl if ttl is None else ttl
+        self.max_entries = max_entries or settings.protocol_cache_max_entries
+        self._entries: "OrderedDict[str, CachedProtocol]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+    
+    @staticmethod
+    def make_key(intent: str, source: str) -> str:
+        """Cache key for an intent from a source under the current prompt version."""
+        return hash_text(f"{get_prompt_version()}\n{source}\n{normalize_intent(intent)}")
+    
+    def get(self, intent: str, source: str) -> Optional[CachedProtocol]:
+        """
+        Look up a finalized protocol for an intent.
+        
+        Args:
+            intent: Raw user intent
+            source: Request source; only protocols finalized by the same
+                path (human review for web, auto-finalize for mcp) match
+            
+        Returns:
+            Cached protocol, or None on a miss
+        """
+        key = self.make_key(intent, source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.cached_at > self.ttl:
+                del self._entries[key]
+                entry = None
+            
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.stats["hits"] += 1
+            return entry
+    
+    def put(self, state: ProtocolState) -> bool:
+        """
+        Store a protocol if it is finalized.
+        
+        Args:
+            state: Final workflow state
+            
+        Returns:
+            True if the state was cached
+        """
+        if not state.is_finalized or state.approval_status not in (ApprovalStatus.APPROVED, ApprovalStatus.EDITED):
+            return False
+        
+        entry = CachedProtocol(
+            key=self.make_key(state.user_intent, state.source),
+            normalized_intent=normalize_intent(state.user_intent),
+            source=state.source,
+            prompt_version=get_prompt_version(),
+            source_thread_id=state.thread_id,
+            values=state.model_dump(),
+            cached_at=time.time()
+        )
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats["stores"] += 1
+        
+        logger.info(f"Cached finalized protocol from thread {state.thread_id}: '{entry.normalized_intent}'")
+        return True
+    
+    def invalidate(self, intent: Optional[str] = None) -> int:
+        """
+        Drop one intent's entries (from every source), or every entry.
+        
+        Args:
+            intent: Raw user intent (None clears the whole cache)
+            
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if intent is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                normalized = normalize_intent(intent)
+                keys = [key for key, entry in self._entries.items() if entry.normalized_intent == normalized]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            self.stats["invalidations"] += removed
+        return removed
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current size."""
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "prompt_version": get_prompt_version()}
+
+
+def build_cached_state(
+    entry: CachedProtocol,
+    thread_id: str,
+    user_intent: str,
+    source: str
+) -> ProtocolState:
+    """
+    Copy a cached protocol into a new thread's state.
+    
+    The copy keeps the request's own wording of the intent and records
+    which thread the protocol was originally produced by.
+    
+    Args:
+        entry: Cache entry to copy
+        thread_id: New thread identifier
+        user_intent: Intent as sent with this request
+        source: Request source
+        
+    Returns:
+        Finalized state for the new thread
+    """
+    state = ProtocolState(**entry.values)
+    now = datetime.now()
+    
+    state.thread_id = thread_id
+    state.user_intent = user_intent
+    state.source = source
+    state.created_at = now
+    state.last_modified = now
+    state.current_agent = None
+    state.scratchpad["provenance"] = [{
+        "timestamp": now.isoformat(),
+        "iteration": state.iteration_count,
+        "agent": "protocol_cache",
+        "cached_from_thread_id": entry.source_thread_id,
+        "normalized_intent": entry.normalized_intent,
+        "prompt_version": entry.prompt_version,
+        "cached_at": datetime.fromtimestamp(entry.cached_at).isoformat()
+    }]
+    return state
+
+
+# Global cache instance
+_protocol_cache: Optional[ProtocolCache] = None
+
+
+def get_protocol_cache() -> ProtocolCache:
+    """Get or create the global finalized-protocol cache."""
+    global _protocol_cache
+    if _protocol_cache is None:
+        _protocol_cache = ProtocolCache()
+    return _protocol_cache
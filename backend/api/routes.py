@@ -3,32 +3,46 @@ Main API routes for the Cerina Protocol Foundry.
 """
 
 from datetime import datetime
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Set
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Header
 from fastapi.responses import StreamingResponse
 import json
+import time
 import asyncio
 from sse_starlette.sse import EventSourceResponse
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from state.protocol_state import ProtocolState, ApprovalStatus
 from state.schemas import (
     GenerationRequest,
     GenerationResponse,
+    BatchGenerationRequest,
+    BatchGenerationResponse,
+    BatchItemResult,
     StateResponse,
     ResumeRequest,
     HealthResponse,
     DetailedStateResponse,
     ErrorResponse
 )
-from graph.workflow import create_protocol_workflow, get_workflow_stats
-from graph.streaming import stream_workflow_events
-from database import get_checkpointer, get_async_checkpointer
+from graph.workflow import get_workflow_stats
+from graph.registry import get_compiled_workflow
+from graph.streaming import stream_workflow_events, node_agents
+from graph.pacing import EventPacer
+from database import get_checkpointer, get_shared_async_checkpointer
+from models.llm_client import get_llm_scheduler, get_llm_response_cache, get_circuit_breaker_stats
 from utils.logger import logger
 from config import settings
 
 from .dependencies import get_current_state, verify_api_key
+from .websocket import send_workflow_update
+from .protocol_cache import CachedProtocol, get_protocol_cache, build_cached_state
+from .job_queue import Job, QueueFullError, ACTIVE_STATUSES, get_job_queue, client_key_for
+from .cancellation import (
+    WorkflowCancelledError, cancel_workflow, cancel_in_background, run_cancellable, stream_cancellable
+)
 
 
 router = APIRouter(prefix="/api", tags=["protocol"])
@@ -58,20 +72,116 @@ async def health_check():
         )
 
 
+@router.get("/metrics/llm")
+async def llm_metrics(api_key_valid: bool = Depends(verify_api_key)):
+    """LLM scheduler, response cache and circuit breaker metrics."""
+    return {
+        "scheduler": get_llm_scheduler().get_stats(),
+        "response_cache": get_llm_response_cache().get_stats(),
+        "circuit_breakers": get_circuit_breaker_stats(),
+    }
+
+
 # Protocol Generation
 
+async def _serve_cached_protocol(
+    entry: CachedProtocol,
+    thread_id: str,
+    request: GenerationRequest,
+    source: str,
+    checkpointer: BaseCheckpointSaver
+) -> GenerationResponse:
+    """Checkpoint a copy of a cached finalized protocol under a new thread."""
+    state = build_cached_state(entry, thread_id, request.user_intent, source)
+    
+    # Written as the finalize node's output, so the thread is complete
+    compiled_workflow = get_compiled_workflow(checkpointer, source)
+    await compiled_workflow.aupdate_state(
+        {"configurable": {"thread_id": thread_id}}, state, as_node="finalize"
+    )
+    
+    logger.info(f"Served thread {thread_id} from protocol cache (source thread {entry.source_thread_id})")
+    
+    return GenerationResponse(
+        thread_id=thread_id,
+        status=str(state.approval_status),
+        message=f"Protocol served from cache (finalized in thread {entry.source_thread_id}).",
+        user_intent=request.user_intent,
+        created_at=state.created_at,
+        cached_from_thread_id=entry.source_thread_id
+    )
+
+
+async def _run_workflow(initial_state: ProtocolState, checkpointer: BaseCheckpointSaver) -> ProtocolState:
+    """
+    Run a new thread's workflow until it halts (web) or finalizes (MCP).
+    
+    A thread that already has checkpoints (a job interrupted by a restart)
+    continues from the last one instead of starting over. The run can be
+    stopped with cancel_workflow.
+    
+    Args:
+        initial_state: Initial state of the thread
+        checkpointer: Checkpointer the workflow is compiled with
+        
+    Returns:
+        Final workflow state
+        
+    Raises:
+        WorkflowCancelledError: If the run was cancelled (outside the job queue)
+    """
+    config = {
+        "configurable": {"thread_id": initial_state.thread_id},
+        "recursion_limit": 50
+    }
+    compiled_workflow = get_compiled_workflow(checkpointer, initial_state.source)
+    
+    snapshot = await compiled_workflow.aget_state(config)
+    if snapshot.values and not snapshot.next:
+        return ProtocolState(**snapshot.values)
+    
+    # It will run until it hits "halt" (Web) or "finalize" (MCP)
+    result = await run_cancellable(
+        initial_state.thread_id,
+        compiled_workflow.ainvoke(None if snapshot.values else initial_state, config)
+    )
+    final_state = ProtocolState(**result) if isinstance(result, dict) else result
+    
+    # Finalized protocols (MCP) become reusable for equivalent intents
+    if settings.protocol_cache_enabled:
+        get_protocol_cache().put(final_state)
+    
+    return final_state
+
+
+async def run_generation_job(job: Job):
+    """Job queue runner: run a queued thread's workflow with the shared checkpointer."""
+    logger.info(f"Starting workflow for queued thread: {job.thread_id}")
+    final_state = await _run_workflow(job.initial_state(), await get_shared_async_checkpointer())
+    logger.info(f"Final state: {final_state.approval_status}, Iteration: {final_state.iteration_count}")
+
+
 @router.post("/generate", response_model=GenerationResponse)
 async def generate_protocol(
     request: GenerationRequest,
     background_tasks: BackgroundTasks,
-    api_key_valid: bool = Depends(verify_api_key)
+    api_key_valid: bool = Depends(verify_api_key),
+    checkpointer: BaseCheckpointSaver = Depends(get_shared_async_checkpointer),
+    x_api_key: Optional[str] = Header(None)
 ):
     """
     Initiate a new protocol generation workflow.
     
     This creates a new thread and starts the agent workflow.
+    - With the job queue enabled, the run is queued and the thread_id is
+      returned immediately (503 + Retry-After when the queue is full);
+      progress is available from /jobs/{thread_id} and /state/{thread_id}.
+      Web requests are scheduled ahead of MCP ones, fairly between API keys
     - For web requests: Workflow halts for human review
     - For MCP requests: Workflow bypasses halt and returns final protocol
+    - If an equivalent intent from the same source was already finalized
+      (and use_cache is set), a copy of that protocol is returned under a
+      new thread
     """
     logger.info(f"Received generation request: {request.user_intent}")
     
@@ -83,6 +193,11 @@ async def generate_protocol(
         # Generate unique thread ID
         thread_id = str(uuid4())
         
+        if request.use_cache and settings.protocol_cache_enabled:
+            cached = get_protocol_cache().get(request.user_intent, source)
+            if cached is not None:
+                return await _serve_cached_protocol(cached, thread_id, request, source, checkpointer)
+        
         # Determine if we should bypass halt (for logging purposes)
         bypass_halt = (source == "mcp")
         logger.info(f"Bypass halt mode: {bypass_halt}")
@@ -93,39 +208,30 @@ async def generate_protocol(
             thread_id=thread_id,
             user_intent=request.user_intent,
             max_iterations=request.max_iterations or settings.max_agent_iterations,
-            source=source  # <--- PASSING SOURCE CORRECTLY
+            source=source,  # <--- PASSING SOURCE CORRECTLY
+            full_critic_reviews=request.full_critic_reviews
         )
         
-        # Configuration for LangGraph with increased recursion limit
-        config = {
-            "configurable": {
-                "thread_id": thread_id
-            },
-            "recursion_limit": 50
-        }
+        if settings.job_queue_enabled:
+            job_queue = get_job_queue()
+            job = await job_queue.submit(initial_state, client_key=client_key_for(x_api_key))
+            position = job_queue.position(thread_id)
+            return GenerationResponse(
+                thread_id=thread_id,
+                status=job.status.value,
+                message="Protocol generation queued. Poll /api/jobs/{thread_id} or /api/state/{thread_id} for progress.",
+                user_intent=request.user_intent,
+                created_at=initial_state.created_at,
+                queue_position=position,
+                estimated_wait_seconds=round(job_queue.estimated_wait(position - 1), 1) if position else 0.0
+            )
         
         logger.info(f"Starting workflow for thread: {thread_id}")
         
-        workflow_graph = create_protocol_workflow()
-        
-        async with get_async_checkpointer() as checkpointer:
-            compiled_workflow = workflow_graph.compile(checkpointer=checkpointer)
-            
-            # Start the graph
-            # It will run until it hits "halt" (Web) or "finalize" (MCP)
-            result = await compiled_workflow.ainvoke(initial_state, config)
-        
-        # LangGraph returns a dictionary, convert back to object wrapper if needed
-        if isinstance(result, dict):
-            # We construct a temporary object to access fields easily for logging
-            # (Note: Pydantic models expect keyword args)
-            final_status = result.get("approval_status")
-            iteration_count = result.get("iteration_count")
-            created_at = result.get("created_at")
-        else:
-            final_status = result.approval_status
-            iteration_count = result.iteration_count
-            created_at = result.created_at
+        final_state = await _run_workflow(initial_state, checkpointer)
+        final_status = final_state.approval_status
+        iteration_count = final_state.iteration_count
+        created_at = final_state.created_at
         
         logger.info(f"Workflow completed/halted for thread: {thread_id}")
         logger.info(f"Final state: {final_status}, Iteration: {iteration_count}")
@@ -143,7 +249,22 @@ async def generate_protocol(
             user_intent=request.user_intent,
             created_at=created_at or datetime.now()
         )
-        
+    
+    except WorkflowCancelledError:
+        return GenerationResponse(
+            thread_id=thread_id,
+            status=ApprovalStatus.CANCELLED.value,
+            message="Protocol generation was cancelled.",
+            user_intent=request.user_intent,
+            created_at=initial_state.created_at
+        )
+    except QueueFullError as e:
+        logger.warning(f"Rejected generation request: {e.reason}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"{e.reason}. Retry later.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error during protocol generation: {str(e)}")
         logger.exception(e)
@@ -153,8 +274,162 @@ async def generate_protocol(
         )
 
 
+async def _run_batch_item(
+    index: int,
+    request: GenerationRequest,
+    client_key: str,
+    checkpointer: BaseCheckpointSaver,
+    batch_start: float,
+    submitted: Set[str]
+) -> BatchItemResult:
+    """
+    Generate one protocol of a batch and summarize the outcome.
+    
+    With the job queue enabled the run is queued in the "batch" class
+    (waiting out Retry-After when the queue is full) and its thread id is
+    kept in `submitted` until the job finishes; otherwise it runs here.
+    Failures are reported in the result rather than raised.
+    """
+    thread_id = str(uuid4())
+    source = request.source or "web"
+    result = BatchItemResult(index=index, thread_id=thread_id, user_intent=request.user_intent, status="completed")
+    
+    try:
+        cached = None
+        if request.use_cache and settings.protocol_cache_enabled:
+            cached = get_protocol_cache().get(request.user_intent, source)
+        
+        if cached is not None:
+            await _serve_cached_protocol(cached, thread_id, request, source, checkpointer)
+            result.cached_from_thread_id = cached.source_thread_id
+        else:
+            initial_state = ProtocolState(
+                thread_id=thread_id,
+                user_intent=request.user_intent,
+                max_iterations=request.max_iterations or settings.max_agent_iterations,
+                source=source,
+                full_critic_reviews=request.full_critic_reviews
+            )
+            if settings.job_queue_enabled:
+                job_queue = get_job_queue()
+                while True:
+                    try:
+                        await job_queue.submit(initial_state, client_key=client_key, priority_class="batch")
+                        break
+                    except QueueFullError as e:
+                        await asyncio.sleep(e.retry_after)
+                submitted.add(thread_id)
+                job = await job_queue.wait(thread_id)
+                submitted.discard(thread_id)
+                if job.error:
+                    raise RuntimeError(job.error)
+            else:
+                await _run_workflow(initial_state, checkpointer)
+        
+        snapshot = await get_compiled_workflow(checkpointer, source).aget_state(
+            {"configurable": {"thread_id": thread_id}}
+        )
+        final_state = ProtocolState(**snapshot.values)
+        result.approval_status = getattr(final_state.approval_status, "value", final_state.approval_status)
+        result.iteration_count = final_state.iteration_count
+        result.draft = final_state.final_approved_draft or final_state.current_draft
+        
+    except Exception as e:
+        logger.error(f"Batch item {index} ({thread_id}) failed: {str(e)}")
+        result.status, result.error = "failed", str(e)
+    
+    result.elapsed_seconds = round(time.perf_counter() - batch_start, 3)
+    return result
+
+
+@router.post("/generate/batch")
+async def generate_protocol_batch(
+    request: BatchGenerationRequest,
+    api_key_valid: bool = Depends(verify_api_key),
+    checkpointer: BaseCheckpointSaver = Depends(get_shared_async_checkpointer),
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Generate many protocols concurrently, streaming results as NDJSON.
+    
+    At most `parallelism` protocols of the batch run at once (capped by
+    settings.batch_max_parallelism). Each protocol's BatchItemResult line is
+    written as soon as it finishes, in completion order; the last line is a
+    BatchGenerationResponse summary.
+    """
+    if len(request.requests) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(request.requests)} exceeds the limit of {settings.batch_max_items} requests"
+        )
+    
+    parallelism = min(request.parallelism or settings.batch_default_parallelism, settings.batch_max_parallelism)
+    client_key = client_key_for(x_api_key)
+    logger.info(f"Received batch of {len(request.requests)} requests (parallelism {parallelism})")
+    
+    async def result_lines():
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(parallelism)
+        # Queued jobs of this batch that have not finished yet
+        submitted: Set[str] = set()
+        
+        async def bounded(index: int, item: GenerationRequest) -> BatchItemResult:
+            async with semaphore:
+                return await _run_batch_item(index, item, client_key, checkpointer, start, submitted)
+        
+        tasks = [asyncio.create_task(bounded(index, item)) for index, item in enumerate(request.requests)]
+        successful = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                successful += result.status == "completed"
+                yield result.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop the items that have not finished
+            for task in tasks:
+                task.cancel()
+            # and the jobs they queued, which would otherwise run on unread
+            if submitted:
+                cancel_in_background(submitted, checkpointer, reason="Batch client disconnected")
+        
+        summary = BatchGenerationResponse(
+            total=len(tasks),
+            successful=successful,
+            failed=len(tasks) - successful,
+            elapsed_seconds=round(time.perf_counter() - start, 3)
+        )
+        yield summary.model_dump_json() + "\n"
+    
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+
 # State Management
 
+def _current_or_queued_state(thread_id: str) -> ProtocolState:
+    """
+    Checkpointed state of a thread, or its initial state while its job is queued.
+    
+    Threads whose job is still active report IN_PROGRESS rather than the
+    initial PENDING status, so pollers keep waiting.
+    
+    Raises:
+        HTTPException: If the thread has neither checkpoints nor a queued job
+    """
+    job = get_job_queue().get(thread_id) if settings.job_queue_enabled else None
+    active = job is not None and job.status in ACTIVE_STATUSES
+    
+    try:
+        state = get_current_state(thread_id)
+    except HTTPException as e:
+        if e.status_code != 404 or not active:
+            raise
+        state = job.initial_state()
+    
+    if active and state.approval_status == ApprovalStatus.PENDING:
+        state.approval_status = ApprovalStatus.IN_PROGRESS
+    return state
+
+
 @router.get("/state/{thread_id}", response_model=StateResponse)
 async def get_state(
     thread_id: str,
@@ -164,7 +439,7 @@ async def get_state(
     logger.info(f"Retrieving state for thread: {thread_id}")
     
     try:
-        state = get_current_state(thread_id)
+        state = _current_or_queued_state(thread_id)
         
         return StateResponse(
             thread_id=state.thread_id,
@@ -253,7 +528,8 @@ async def get_detailed_state(
 async def resume_workflow(
     thread_id: str,
     request: ResumeRequest,
-    api_key_valid: bool = Depends(verify_api_key)
+    api_key_valid: bool = Depends(verify_api_key),
+    checkpointer: BaseCheckpointSaver = Depends(get_shared_async_checkpointer)
 ):
     """Resume a halted workflow after human review."""
     logger.info(f"Resuming workflow for thread: {thread_id} with action: {request.action}")
@@ -289,19 +565,24 @@ async def resume_workflow(
             raise HTTPException(status_code=400, detail="Invalid action")
             
         # Resume workflow
-        workflow_graph = create_protocol_workflow()
         config = {
             "configurable": {"thread_id": thread_id},
             "recursion_limit": 50
         }
         
-        async with get_async_checkpointer() as checkpointer:
-            compiled_workflow = workflow_graph.compile(checkpointer=checkpointer)
-            result = await compiled_workflow.ainvoke(state, config)
-            
+        compiled_workflow = get_compiled_workflow(checkpointer, state.source)
+        try:
+            # A reject runs the draft/review loop again, so this can be cancelled too
+            await run_cancellable(thread_id, compiled_workflow.ainvoke(state, config))
+        except WorkflowCancelledError:
+            raise HTTPException(status_code=409, detail="Workflow was cancelled while resuming")
+        
         # Refetch state to return response
         final_state = get_current_state(thread_id)
         
+        if settings.protocol_cache_enabled:
+            get_protocol_cache().put(final_state)
+        
         return StateResponse(
             thread_id=final_state.thread_id,
             user_intent=final_state.user_intent,
@@ -340,12 +621,74 @@ async def get_workflow_statistics(thread_id: str, api_key_valid: bool = Depends(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/workflow/{thread_id}/cancel")
+async def cancel_workflow_run(
+    thread_id: str,
+    api_key_valid: bool = Depends(verify_api_key),
+    checkpointer: BaseCheckpointSaver = Depends(get_shared_async_checkpointer)
+):
+    """
+    Cancel a thread's workflow.
+    
+    A queued job is dropped; a running one is stopped mid-node (its
+    in-flight LLM request is cancelled) and its worker freed. A thread
+    halted for review is closed. The thread is checkpointed as cancelled.
+    """
+    try:
+        state = await cancel_workflow(thread_id, checkpointer)
+        await send_workflow_update(thread_id, "cancelled", {"thread_id": thread_id, "iteration_count": state.iteration_count})
+        return {
+            "message": "Workflow cancelled",
+            "thread_id": thread_id,
+            "approval_status": state.approval_status,
+            "iteration_count": state.iteration_count,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling workflow: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to cancel: {str(e)}")
+
 @router.delete("/workflow/{thread_id}")
-async def delete_workflow(thread_id: str, api_key_valid: bool = Depends(verify_api_key)):
+async def delete_workflow(
+    thread_id: str,
+    api_key_valid: bool = Depends(verify_api_key),
+    checkpointer: BaseCheckpointSaver = Depends(get_shared_async_checkpointer)
+):
     try:
-        return {"message": "Workflow deleted", "thread_id": thread_id}
+        # A deleted thread must not keep running
+        await cancel_workflow(thread_id, checkpointer, reason="Workflow deleted")
+    except HTTPException:
+        # Unknown or already finished: nothing to stop
+        pass
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Workflow deleted", "thread_id": thread_id}
+
+@router.get("/cache/protocols")
+async def protocol_cache_stats(api_key_valid: bool = Depends(verify_api_key)):
+    """Finalized-protocol cache hit/miss counters and size."""
+    return get_protocol_cache().get_stats()
+
+@router.delete("/cache/protocols")
+async def invalidate_protocol_cache(intent: Optional[str] = None, api_key_valid: bool = Depends(verify_api_key)):
+    """Invalidate the cached protocol for one intent, or all cached protocols."""
+    removed = get_protocol_cache().invalidate(intent)
+    return {"invalidated": removed, "intent": intent}
+
+@router.get("/jobs/stats")
+async def job_queue_stats(api_key_valid: bool = Depends(verify_api_key)):
+    """Generation job queue depth, worker usage, counters and queue-wait percentiles per class."""
+    return get_job_queue().get_stats()
+
+@router.get("/jobs/{thread_id}")
+async def get_job(thread_id: str, api_key_valid: bool = Depends(verify_api_key)):
+    """Status of a thread's generation job, with its queue position while queued."""
+    job_queue = get_job_queue()
+    job = job_queue.get(thread_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No generation job for thread {thread_id}")
+    return job_queue.describe(job)
 
 @router.get("/draft/{thread_id}")
 async def get_current_draft(thread_id: str, api_key_valid: bool = Depends(verify_api_key)):
@@ -377,7 +720,8 @@ async def get_draft_versions(thread_id: str, api_key_valid: bool = Depends(verif
 @router.post("/generate-stream")
 async def generate_protocol_stream(
     request: GenerationRequest,
-    api_key_valid: bool = Depends(verify_api_key)
+    api_key_valid: bool = Depends(verify_api_key),
+    checkpointer: BaseCheckpointSaver = Depends(get_shared_async_checkpointer)
 ):
     """
     Stream protocol generation with real-time updates (for Web UI).
@@ -388,6 +732,9 @@ async def generate_protocol_stream(
     thread_id = str(uuid4())
     
     async def event_generator():
+        # UI pacing lives here, not in the graph nodes
+        pacer = EventPacer()
+        
         try:
             # Send 'started' event immediately
             logger.info(f"[SSE] Sending 'started' event for thread {thread_id}")
@@ -407,7 +754,8 @@ async def generate_protocol_stream(
                 thread_id=thread_id,
                 user_intent=request.user_intent,
                 max_iterations=request.max_iterations or settings.max_agent_iterations,
-                source="web"
+                source="web",
+                full_critic_reviews=request.full_critic_reviews
             )
             
             # Configuration
@@ -418,92 +766,111 @@ async def generate_protocol_stream(
             
             logger.info(f"[SSE] Running workflow for thread: {thread_id}")
             
-            # Create and compile workflow
-            workflow_graph = create_protocol_workflow()
+            # Last values seen on the stream, used when an update omits
+            # iteration and status fields
+            last_iteration = 0
+            last_status = 'in_progress'
             
-            async with get_async_checkpointer() as checkpointer:
-                compiled_workflow = workflow_graph.compile(checkpointer=checkpointer)
+            # Shared compiled workflow
+            compiled_workflow = get_compiled_workflow(checkpointer, "web")
+            
+            # Stream node updates plus the drafter's token deltas
+            async for mode, event in stream_cancellable(thread_id, compiled_workflow.astream(
+                initial_state, config, stream_mode=["updates", "custom"]
+            )):
+                if mode == "custom":
+                    if event.get("type") == "draft_delta":
+                        # Not paced: deltas are already batched by the drafter node
+                        delta = {**event, 'thread_id': thread_id, 'timestamp': datetime.now().isoformat()}
+                        yield f"event: draft_delta\n"
+                        yield f"data: {json.dumps(delta)}\n\n"
+                        await send_workflow_update(thread_id, "draft_delta", delta)
+                    continue
+                
+                logger.info(f"[SSE] Workflow event: {list(event.keys())}")
                 
-                # Stream workflow execution
-                async for event in compiled_workflow.astream(initial_state, config):
-                    logger.info(f"[SSE] Workflow event: {list(event.keys())}")
+                # Extract state from event
+                for node_name, state_update in event.items():
+                    # Skip internal nodes
+                    if node_name.startswith('__'):
+                        logger.info(f"[SSE] Skipping internal node: {node_name}")
+                        continue
+                    
+                    logger.info(f"[SSE] Node={node_name}, StateType={type(state_update).__name__}")
                     
-                    # Extract state from event
-                    for node_name, state_update in event.items():
-                        # Skip internal nodes
-                        if node_name.startswith('__'):
-                            logger.info(f"[SSE] Skipping internal node: {node_name}")
+                    try:
+                        # ⭐ EXTRACT QUALITY SCORE SAFELY
+                        def get_quality_score(state_obj):
+                            """Extract quality score from various state formats"""
+                            try:
+                                # Try to get metadata
+                                metadata = None
+                                if isinstance(state_obj, dict):
+                                    metadata = state_obj.get("metadata", {})
+                                elif hasattr(state_obj, 'metadata'):
+                                    metadata = state_obj.metadata
+                                
+                                # Extract quality score from metadata
+                                if metadata:
+                                    # If metadata is a dict
+                                    if isinstance(metadata, dict):
+                                        return metadata.get("overall_quality_score", 0)
+                                    # If metadata is a Pydantic object
+                                    elif hasattr(metadata, 'overall_quality_score'):
+                                        return getattr(metadata, 'overall_quality_score', 0)
+                                    # If metadata has dict-like access
+                                    elif hasattr(metadata, '__dict__'):
+                                        return metadata.__dict__.get('overall_quality_score', 0)
+                                
+                                # Fallback: check if quality_score exists at root level
+                                if isinstance(state_obj, dict):
+                                    return state_obj.get("quality_score", 0)
+                                elif hasattr(state_obj, 'quality_score'):
+                                    return getattr(state_obj, 'quality_score', 0)
+                                
+                                return 0
+                            except Exception as e:
+                                logger.warning(f"Could not extract quality score: {e}")
+                                return 0
+                        
+                        # Extract values based on state type
+                        if isinstance(state_update, dict):
+                            current_iteration = state_update.get('iteration_count', last_iteration)
+                            approval_status = state_update.get('approval_status', last_status)
+                            quality_score = get_quality_score(state_update)
+                            safety_flags = state_update.get('safety_flags', [])
+                        elif isinstance(state_update, ProtocolState):
+                            current_iteration = state_update.iteration_count
+                            approval_status = state_update.approval_status
+                            quality_score = get_quality_score(state_update)
+                            safety_flags = state_update.safety_flags
+                        else:
+                            logger.warning(f"[SSE] Unexpected state type: {type(state_update)}, skipping")
                             continue
                         
-                        logger.info(f"[SSE] Node={node_name}, StateType={type(state_update).__name__}")
+                        # Map node names to agent names
+                        agent_map = {
+                            'initialize': 'supervisor',
+                            'triage': 'supervisor',
+                            'drafter': 'drafter',
+                            'safety_guardian': 'safety_guardian', 
+                            'clinical_critic': 'clinical_critic',
+                            'supervisor': 'supervisor',
+                            'halt': 'halt',
+                        }
                         
-                        try:
-                            # ⭐ EXTRACT QUALITY SCORE SAFELY
-                            def get_quality_score(state_obj):
-                                """Extract quality score from various state formats"""
-                                try:
-                                    # Try to get metadata
-                                    metadata = None
-                                    if isinstance(state_obj, dict):
-                                        metadata = state_obj.get("metadata", {})
-                                    elif hasattr(state_obj, 'metadata'):
-                                        metadata = state_obj.metadata
-                                    
-                                    # Extract quality score from metadata
-                                    if metadata:
-                                        # If metadata is a dict
-                                        if isinstance(metadata, dict):
-                                            return metadata.get("overall_quality_score", 0)
-                                        # If metadata is a Pydantic object
-                                        elif hasattr(metadata, 'overall_quality_score'):
-                                            return getattr(metadata, 'overall_quality_score', 0)
-                                        # If metadata has dict-like access
-                                        elif hasattr(metadata, '__dict__'):
-                                            return metadata.__dict__.get('overall_quality_score', 0)
-                                    
-                                    # Fallback: check if quality_score exists at root level
-                                    if isinstance(state_obj, dict):
-                                        return state_obj.get("quality_score", 0)
-                                    elif hasattr(state_obj, 'quality_score'):
-                                        return getattr(state_obj, 'quality_score', 0)
-                                    
-                                    return 0
-                                except Exception as e:
-                                    logger.warning(f"Could not extract quality score: {e}")
-                                    return 0
-                            
-                            # Extract values based on state type
-                            if isinstance(state_update, dict):
-                                current_iteration = state_update.get('iteration_count', 0)
-                                approval_status = state_update.get('approval_status', 'in_progress')
-                                quality_score = get_quality_score(state_update)
-                                safety_flags = state_update.get('safety_flags', [])
-                            elif isinstance(state_update, ProtocolState):
-                                current_iteration = state_update.iteration_count
-                                approval_status = state_update.approval_status
-                                quality_score = get_quality_score(state_update)
-                                safety_flags = state_update.safety_flags
-                            else:
-                                logger.warning(f"[SSE] Unexpected state type: {type(state_update)}, skipping")
-                                continue
-                            
-                            # Map node names to agent names
-                            agent_map = {
-                                'initialize': 'supervisor',
-                                'drafter': 'drafter',
-                                'safety_guardian': 'safety_guardian', 
-                                'clinical_critic': 'clinical_critic',
-                                'supervisor': 'supervisor',
-                                'halt': 'halt',
-                            }
-                            
-                            mapped_agent = agent_map.get(node_name, node_name)
-                            
-                            # Convert approval status to string
-                            if hasattr(approval_status, 'value'):
-                                approval_status = approval_status.value
-                            else:
-                                approval_status = str(approval_status)
+                        # Convert approval status to string
+                        if hasattr(approval_status, 'value'):
+                            approval_status = approval_status.value
+                        else:
+                            approval_status = str(approval_status)
+                        
+                        last_iteration = current_iteration
+                        last_status = approval_status
+                        
+                        # The review node reports one update per reviewing agent
+                        for agent_name in node_agents(node_name, state_update):
+                            mapped_agent = agent_map.get(agent_name, agent_name)
                             
                             logger.info(f"[SSE] Sending update: node={node_name}, agent={mapped_agent}, iter={current_iteration}, status={approval_status}, quality={quality_score}")
                             
@@ -520,51 +887,63 @@ async def generate_protocol_stream(
                                 'timestamp': datetime.now().isoformat()
                             })
                             
+                            await pacer.wait()
                             yield f"event: update\n"
                             yield f"data: {update_data}\n\n"
+                        
+                        logger.info(f"[SSE] Update sent successfully")
+                        
+                        # Check if workflow halted
+                        if approval_status in ["pending_human_review", "approved", "rejected"]:
+                            logger.info(f"[SSE] Workflow completed with status: {approval_status}")
+                            
+                            # Build completion data
+                            complete_data = json.dumps({
+                                'type': 'complete',
+                                'thread_id': thread_id,
+                                'approval_status': approval_status,
+                                'iteration_count': current_iteration,
+                                'message': 'Workflow halted for human review',
+                                'timestamp': datetime.now().isoformat()
+                            })
                             
-                            logger.info(f"[SSE] Update sent successfully")
+                            yield f"event: complete\n"
+                            yield f"data: {complete_data}\n\n"
                             
-                            # Check if workflow halted
-                            if approval_status in ["pending_human_review", "approved", "rejected"]:
-                                logger.info(f"[SSE] Workflow completed with status: {approval_status}")
-                                
-                                # Build completion data
-                                complete_data = json.dumps({
-                                    'type': 'complete',
-                                    'thread_id': thread_id,
-                                    'approval_status': approval_status,
-                                    'iteration_count': current_iteration,
-                                    'message': 'Workflow halted for human review',
-                                    'timestamp': datetime.now().isoformat()
-                                })
-                                
-                                yield f"event: complete\n"
-                                yield f"data: {complete_data}\n\n"
-                                
-                                logger.info(f"[SSE] Stream completed for thread: {thread_id}")
-                                return
-                                
-                        except Exception as node_error:
-                            logger.error(f"[SSE] Error processing node {node_name}: {node_error}")
-                            logger.exception(node_error)
-                            continue
+                            logger.info(f"[SSE] Stream completed for thread: {thread_id}")
+                            return
+                            
+                    except Exception as node_error:
+                        logger.error(f"[SSE] Error processing node {node_name}: {node_error}")
+                        logger.exception(node_error)
+                        continue
 
 
-                # If we exit the loop without halting
-                logger.info(f"[SSE] Workflow completed normally for thread: {thread_id}")
-                
-                final_data = json.dumps({
-                    'type': 'complete',
-                    'thread_id': thread_id,
-                    'approval_status': 'completed',
-                    'message': 'Workflow completed',
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-                yield f"event: complete\n"
-                yield f"data: {final_data}\n\n"
-                
+            # If we exit the loop without halting
+            logger.info(f"[SSE] Workflow completed normally for thread: {thread_id}")
+            
+            final_data = json.dumps({
+                'type': 'complete',
+                'thread_id': thread_id,
+                'approval_status': 'completed',
+                'message': 'Workflow completed',
+                'timestamp': datetime.now().isoformat()
+            })
+            
+            yield f"event: complete\n"
+            yield f"data: {final_data}\n\n"
+            
+        except WorkflowCancelledError:
+            logger.info(f"[SSE] Workflow cancelled for thread: {thread_id}")
+            cancelled_data = json.dumps({
+                'type': 'cancelled',
+                'thread_id': thread_id,
+                'approval_status': ApprovalStatus.CANCELLED.value,
+                'timestamp': datetime.now().isoformat()
+            })
+            yield f"event: cancelled\n"
+            yield f"data: {cancelled_data}\n\n"
+            
         except Exception as e:
             logger.error(f"[SSE] Error in stream: {e}")
             logger.exception(e)
@@ -6,13 +6,15 @@ import json
 from typing import Dict, Any
 from datetime import datetime
 
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.websockets import WebSocketState
 
 from utils.logger import logger
 from graph.workflow import compile_workflow_async
 from state.protocol_state import ProtocolState
-from database import get_checkpointer
+from database import get_checkpointer, get_shared_async_checkpointer
+
+from .cancellation import cancel_workflow
 
 
 class ConnectionManager:
@@ -38,7 +40,11 @@ class ConnectionManager:
         if thread_id in self.active_connections:
             websocket = self.active_connections[thread_id]
             if websocket.client_state == WebSocketState.CONNECTED:
-                await websocket.send_json(message)
+                try:
+                    await websocket.send_json(message)
+                except Exception as e:
+                    # A dropped socket must not break the stream feeding it
+                    logger.error(f"Error sending to {thread_id}: {str(e)}")
     
     async def broadcast(self, message: Dict[str, Any]):
         """Broadcast a message to all connections."""
@@ -62,6 +68,7 @@ async def websocket_endpoint(websocket: WebSocket, thread_id: str):
     - Real-time workflow updates
     - Bidirectional messaging
     - Live state synchronization
+    - Cancelling the thread's run ({"type": "cancel"})
     
     Args:
         websocket: WebSocket connection
@@ -161,6 +168,27 @@ async def handle_websocket_message(
                 "message": str(e)
             })
     
+    elif msg_type == "cancel":
+        # Stop the thread's run and free its worker
+        try:
+            state = await cancel_workflow(
+                thread_id,
+                await get_shared_async_checkpointer(),
+                reason=message.get("reason") or "Cancelled over WebSocket"
+            )
+            await websocket.send_json({
+                "type": "cancelled",
+                "thread_id": thread_id,
+                "iteration_count": state.iteration_count,
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        except HTTPException as e:
+            await websocket.send_json({
+                "type": "error",
+                "message": e.detail
+            })
+    
     elif msg_type == "subscribe_updates":
         # Subscribe to real-time updates
         await websocket.send_json({
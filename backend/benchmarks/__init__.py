@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for the Cerina Protocol Foundry.
+
+Each module is a standalone script run from the backend directory, e.g.:
+
+    python -m benchmarks.bench_pacing
+
+Benchmarks replace the LLM-backed agents with deterministic fakes so they
+measure orchestration overhead rather than provider latency.
+"""
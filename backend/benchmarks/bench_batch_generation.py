@@ -0,0 +1,87 @@
+"""
+Generating a list of protocols: one blocking /api/generate call after
+another vs a single /api/generate/batch request streaming NDJSON results.
+
+Runs the real app (TestClient, SQLite checkpointer and job queue on a
+scratch directory) with fake agents. "first" is when the first protocol
+is ready to send (TestClient buffers the stream, so batch results use the
+server-side elapsed_seconds of each line).
+
+Usage:
+    python -m benchmarks.bench_batch_generation [--items N] [--parallelism N] [--latency SECONDS]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from .common import install_fake_agents, print_table
+
+
+def intents(items: int):
+    return [{"user_intent": f"Exposure hierarchy for agoraphobia, case {index}", "source": "mcp", "use_cache": False} for index in range(items)]
+
+
+def sequential(client: TestClient, items: int):
+    """One request per protocol, each waiting for its run."""
+    start = time.perf_counter()
+    first = None
+    for body in intents(items):
+        client.post("/api/generate", json=body).raise_for_status()
+        first = first or time.perf_counter() - start
+    return {"first": first, "total": time.perf_counter() - start, "completed": items}
+
+
+def batch(client: TestClient, items: int, parallelism: int):
+    """One batch request, reading results as they stream in."""
+    start = time.perf_counter()
+    ready, completed = [], 0
+    body = {"requests": intents(items), "parallelism": parallelism}
+    with client.stream("POST", "/api/generate/batch", json=body) as response:
+        for line in response.iter_lines():
+            record = json.loads(line)
+            if record["type"] == "result":
+                ready.append(record["elapsed_seconds"])
+                completed += record["status"] == "completed"
+    return {"first": min(ready), "total": time.perf_counter() - start, "completed": completed}
+
+
+def main(items: int, parallelism: int, latency: float):
+    import main as app_module
+    from config import settings
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # The checkpointer resolves relative SQLite URLs against the cwd
+        os.chdir(tmp)
+        settings.database_url = "sqlite:///./bench.db"
+        settings.job_queue_path = "./bench_jobs.db"
+        settings.job_queue_workers = parallelism
+        # Let batch jobs use every worker; nothing else is queued
+        settings.job_queue_class_shares = {**settings.job_queue_class_shares, "batch": 1.0}
+        install_fake_agents(latency=latency)
+
+        rows = {}
+        settings.job_queue_enabled = False
+        with TestClient(app_module.app) as client:
+            rows["sequential /generate"] = sequential(client, items)
+        settings.job_queue_enabled = True
+        with TestClient(app_module.app) as client:
+            rows[f"batch, parallelism {parallelism}"] = batch(client, items, parallelism)
+        os.chdir(cwd)
+
+    print_table(f"{items} protocols (agent latency {latency:g}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=12)
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    main(args.items, args.parallelism, args.latency)
@@ -0,0 +1,76 @@
+"""
+Offline bulk generation interrupted part-way and run again: a fresh run
+over the whole file vs re-running the same command, which skips items
+already written, writes out finished threads and continues interrupted
+ones from their last checkpoint.
+
+Runs bulk_generate against a scratch SQLite checkpointer with fake agents.
+
+Usage:
+    python -m benchmarks.bench_bulk_generate [--items N] [--concurrency N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from .common import install_fake_agents, print_table
+
+
+def write_intents(path: str, items: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for index in range(items):
+            f.write(json.dumps({"id": f"case-{index}", "user_intent": f"Exposure hierarchy for agoraphobia, case {index}"}) + "\n")
+
+
+async def timed(run_id: str, concurrency: int, timeout: float = None):
+    """Run the bulk CLI once, optionally cut off after `timeout` seconds."""
+    from bulk_generate import run_bulk
+
+    start = time.perf_counter()
+    try:
+        stats = await asyncio.wait_for(run_bulk("intents.jsonl", f"{run_id}.jsonl", concurrency, run_id), timeout)
+    except asyncio.TimeoutError:
+        stats = {}
+    with open(f"{run_id}.jsonl", encoding="utf-8") as f:
+        written = sum(1 for _ in f)
+    return {**stats, "written": written, "elapsed": time.perf_counter() - start}
+
+
+async def run(concurrency: int):
+    rows = {}
+    rows["fresh run"] = await timed("fresh", concurrency)
+    full = rows["fresh run"]["elapsed"]
+    rows["interrupted at 50%"] = await timed("resume", concurrency, timeout=full / 2)
+    rows["re-run after interruption"] = await timed("resume", concurrency)
+    rows["re-run when complete"] = await timed("resume", concurrency)
+    return rows
+
+
+def main(items: int, concurrency: int, latency: float):
+    from config import settings
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # The checkpointer resolves relative SQLite URLs against the cwd
+        os.chdir(tmp)
+        settings.database_url = "sqlite:///./bench.db"
+        install_fake_agents(latency=latency)
+        write_intents("intents.jsonl", items)
+        rows = asyncio.run(run(concurrency))
+        os.chdir(cwd)
+
+    print_table(f"Bulk generation of {items} protocols (concurrency {concurrency}, agent latency {latency:g}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    main(args.items, args.concurrency, args.latency)
@@ -0,0 +1,93 @@
+"""
+Abandoned generations on a small worker pool: half the submitted jobs
+are abandoned by their clients shortly after submission. Without
+cancellation they run to max_iterations anyway; with
+POST /api/workflow/{thread_id}/cancel they are stopped mid-call and their
+workers go to the jobs still wanted.
+
+Runs the real app (TestClient, SQLite checkpointer and queue file on a
+scratch directory) with fake agents whose critic never approves, so every
+run uses all its iterations.
+
+Usage:
+    python -m benchmarks.bench_cancellation [--jobs N] [--workers N] [--latency SECONDS]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from .bench_job_queue import wait_for_jobs
+from .common import install_fake_agents, print_table
+
+
+def run(jobs: int, latency: float, cancel: bool):
+    """Submit `jobs` generations, abandon every other one and time the rest."""
+    import main as app_module
+    from graph import nodes
+
+    install_fake_agents(latency=latency, critic_scores=[6.0])
+    with TestClient(app_module.app) as client:
+        start = time.perf_counter()
+        thread_ids = [
+            client.post(
+                "/api/generate",
+                json={"user_intent": f"Exposure hierarchy for agoraphobia, case {index}", "source": "mcp", "use_cache": False}
+            ).json()["thread_id"]
+            for index in range(jobs)
+        ]
+        abandoned, wanted = thread_ids[::2], thread_ids[1::2]
+
+        time.sleep(latency * 2)
+        if cancel:
+            for thread_id in abandoned:
+                client.post(f"/api/workflow/{thread_id}/cancel").raise_for_status()
+
+        wait_for_jobs(client, wanted)
+        wanted_done = time.perf_counter() - start
+        wait_for_jobs(client, abandoned)
+        stats = client.get("/api/jobs/stats").json()
+
+    return {
+        "wanted_done": wanted_done,
+        "all_workers_free": time.perf_counter() - start,
+        "critic_calls": nodes._clinical_critic.started,
+        "cancelled": stats["cancelled"],
+    }
+
+
+def main(jobs: int, workers: int, latency: float):
+    from config import settings
+
+    cwd = os.getcwd()
+    rows = {}
+    for cancel in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            # The checkpointer resolves relative SQLite URLs against the cwd
+            os.chdir(tmp)
+            settings.database_url = "sqlite:///./bench.db"
+            settings.job_queue_path = "./bench_jobs.db"
+            settings.job_queue_workers = workers
+            settings.llm_cache_enabled = False
+            label = "abandoned jobs cancelled" if cancel else "abandoned jobs run on"
+            rows[label] = run(jobs, latency, cancel)
+            os.chdir(cwd)
+
+    print_table(
+        f"{jobs} jobs, every other one abandoned ({workers} workers, "
+        f"{settings.max_agent_iterations} iterations, latency {latency:g}s)",
+        rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    main(args.jobs, args.workers, args.latency)
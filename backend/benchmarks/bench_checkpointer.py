@@ -0,0 +1,89 @@
+"""
+Per-request latency with a per-request async checkpointer vs the shared one.
+
+The per-request variant reproduces the old route behaviour: open an
+aiosqlite connection and run setup() for every call. Both variants run
+against a scratch SQLite file so repeated runs start from the same state.
+
+Usage:
+    python -m benchmarks.bench_checkpointer [--requests N] [--concurrency N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from uuid import uuid4
+
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from graph.workflow import create_protocol_workflow
+from state.protocol_state import ProtocolState
+
+from .common import install_fake_agents, summarize, print_table
+
+
+async def run_protocol(checkpointer):
+    """Compile against a checkpointer and drive one protocol to its halt."""
+    thread_id = str(uuid4())
+    state = ProtocolState(thread_id=thread_id, user_intent="Sleep hygiene plan")
+    config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+
+    graph = create_protocol_workflow().compile(checkpointer=checkpointer)
+    await graph.ainvoke(state, config)
+
+
+async def per_request(db_path: str):
+    """Old behaviour: connect and set up tables for each request."""
+    async with aiosqlite.connect(db_path) as conn:
+        checkpointer = AsyncSqliteSaver(conn)
+        await checkpointer.setup()
+        await run_protocol(checkpointer)
+
+
+async def measure(handler, requests: int, concurrency: int):
+    """Run requests through a handler with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await handler()
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples
+
+
+async def main(requests: int, concurrency: int, latency: float):
+    install_fake_agents(latency=latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = {}
+
+        db_path = os.path.join(tmp, "per_request.db")
+        samples = await measure(lambda: per_request(db_path), requests, concurrency)
+        rows["per-request connection"] = summarize(samples)
+
+        db_path = os.path.join(tmp, "shared.db")
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute("PRAGMA journal_mode=WAL")
+            shared = AsyncSqliteSaver(conn)
+            await shared.setup()
+            samples = await measure(lambda: run_protocol(shared), requests, concurrency)
+        rows["shared checkpointer"] = summarize(samples)
+
+    print_table(f"Latency per request ({requests} requests, concurrency {concurrency})", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
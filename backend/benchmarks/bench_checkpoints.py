@@ -0,0 +1,114 @@
+"""
+Checkpoints and bytes written per completed protocol, before and after
+collapsing the supervisor node into the routing edge.
+
+The "separate supervisor node" topology is rebuilt here from the current
+nodes with a pass-through supervisor step after every agent, which is what
+the graph used to do: one extra superstep (and checkpoint) per agent step.
+
+Usage:
+    python -m benchmarks.bench_checkpoints [--runs N] [--scores 6,7,8.5]
+"""
+
+import argparse
+import asyncio
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, END
+
+from config import settings
+from graph.workflow import create_protocol_workflow
+from graph.edges import supervisor_router
+from graph.nodes import initialize_node, adrafter_node, areview_node, halt_node, max_iterations_node
+from state.protocol_state import ProtocolState
+
+from .common import install_fake_agents, print_table
+
+
+class CountingSaver(MemorySaver):
+    """In-memory checkpointer that counts checkpoints, writes and bytes."""
+
+    def __init__(self):
+        super().__init__()
+        self.checkpoints = 0
+        self.checkpoint_bytes = 0
+        self.write_count = 0
+        self.write_bytes = 0
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self.checkpoints += 1
+        self.checkpoint_bytes += len(self.serde.dumps_typed(checkpoint)[1])
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self.write_count += len(writes)
+        self.write_bytes += sum(len(self.serde.dumps_typed(value)[1]) for _, value in writes)
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+def supervisor_passthrough(state: ProtocolState) -> ProtocolState:
+    """Stand-in for the old supervisor node (the decision is already stored)."""
+    state.current_agent = "supervisor"
+    return state
+
+
+def create_legacy_workflow() -> StateGraph:
+    """Same agents, with a supervisor superstep after every agent step."""
+    routes = {"drafter": "drafter", "review": "review", "halt": "halt", "max_iterations": "max_iterations"}
+
+    workflow = StateGraph(ProtocolState)
+    workflow.add_node("initialize", initialize_node)
+    workflow.add_node("supervisor", supervisor_passthrough)
+    workflow.add_node("drafter", adrafter_node)
+    workflow.add_node("review", areview_node)
+    workflow.add_node("halt", halt_node)
+    workflow.add_node("max_iterations", max_iterations_node)
+
+    workflow.set_entry_point("initialize")
+    workflow.add_edge("initialize", "supervisor")
+    workflow.add_conditional_edges("supervisor", supervisor_router, routes)
+    workflow.add_edge("drafter", "supervisor")
+    workflow.add_edge("review", "supervisor")
+    workflow.add_edge("max_iterations", "halt")
+    workflow.add_edge("halt", END)
+    return workflow
+
+
+async def measure(workflow: StateGraph, runs: int):
+    """Drive protocols to completion and return per-protocol write stats."""
+    saver = CountingSaver()
+    graph = workflow.compile(checkpointer=saver)
+
+    for _ in range(runs):
+        thread_id = str(uuid4())
+        state = ProtocolState(thread_id=thread_id, user_intent="Exposure hierarchy for agoraphobia")
+        await graph.ainvoke(state, {"configurable": {"thread_id": thread_id}, "recursion_limit": 50})
+
+    return {
+        "checkpoints": saver.checkpoints / runs,
+        "checkpoint_kb": saver.checkpoint_bytes / runs / 1024,
+        "writes": saver.write_count / runs,
+        "write_kb": saver.write_bytes / runs / 1024,
+    }
+
+
+async def main(runs: int, scores):
+    install_fake_agents(critic_scores=scores)
+    settings.early_stopping_enabled = False  # the fake drafts never change; measure the full loop
+
+    rows = {
+        "separate supervisor node": await measure(create_legacy_workflow(), runs),
+        "decision stored by agents": await measure(create_protocol_workflow(), runs),
+    }
+
+    print_table(f"Per completed protocol (critic scores {scores})", rows, unit="")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scores", type=str, default="6,7,8.5")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, [float(score) for score in args.scores.split(",")]))
@@ -0,0 +1,59 @@
+"""
+Per-request cost of building and compiling the workflow vs a registry lookup.
+
+Usage:
+    python -m benchmarks.bench_compile [--requests N]
+"""
+
+import argparse
+import logging
+import time
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow import create_protocol_workflow
+from graph.registry import WorkflowRegistry
+from utils.logger import logger
+
+from .common import summarize, print_table
+
+
+def time_calls(func, requests: int):
+    """Time a synchronous callable over several calls (milliseconds)."""
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(requests: int):
+    checkpointer = MemorySaver()
+    rows = {}
+
+    for label, level in (("compile per request", logger.level), ("compile per request, quiet", logging.WARNING)):
+        previous = logger.level
+        logger.setLevel(level)
+        try:
+            samples = time_calls(
+                lambda: create_protocol_workflow().compile(checkpointer=checkpointer),
+                requests
+            )
+        finally:
+            logger.setLevel(previous)
+        rows[label] = summarize(samples)
+
+    registry = WorkflowRegistry()
+    rows["registry warm-up (once)"] = summarize(time_calls(lambda: registry.warm(checkpointer), 1))
+    rows["registry lookup"] = summarize(time_calls(lambda: registry.get(checkpointer, "web"), requests))
+
+    print_table(f"Workflow acquisition per request ({requests} requests)", rows, unit="ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    main(args.requests)
@@ -0,0 +1,135 @@
+"""
+Clinical Critic prompt tokens per iteration: full re-review of every
+revision vs incremental re-review (previous scores plus a diff), with the
+periodic full review left at its configured interval.
+
+Each revision edits one section of the sample draft, as a drafter
+addressing a single piece of feedback does. The real ClinicalCriticAgent
+runs against a fake provider that answers in the review format it asked for.
+
+Usage:
+    python -m benchmarks.bench_critic_diff [--iterations N] [--scale N]
+"""
+
+import argparse
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from config import settings
+from graph.nodes import _apply_critic_response
+from models import llm_client
+from models.llm_client import LLMClient, LLMScheduler, count_tokens
+from state.protocol_state import ProtocolState, AgentRole
+
+from .bench_safety_sections import revisions
+from .common import print_table
+
+
+FULL_REVIEW = """Overall Quality Score: 7.0/10
+
+Individual Scores:
+Clinical Accuracy: 8/10 - Sound exposure steps
+Empathy & Tone: 7/10 - Warm but brief
+Clarity & Accessibility: 7/10 - Clear
+Therapeutic Alliance: 6/10 - Prescriptive in places
+Completeness: 6/10 - Homework is vague
+Engagement: 7/10 - Relevant
+
+Empathy Score: 0.7
+
+Areas for Improvement:
+- Homework Assignments: make the practice schedule concrete
+
+Recommendation: REQUEST_MINOR_REVISIONS"""
+
+INCREMENTAL_REVIEW = """Completeness: 7/10 - Homework now has a schedule
+
+Overall Quality Score: 7.2/10
+
+Areas for Improvement:
+- Homework Assignments: add a way to log SUDs
+
+Recommendation: REQUEST_MINOR_REVISIONS"""
+
+
+class CriticChatModel:
+    """Chat model stand-in that returns a fixed review and counts prompt tokens."""
+
+    def __init__(self):
+        self.tokens = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.tokens += sum(count_tokens(str(message.content)) for message in messages)
+        incremental = "Changes Since the Previous Review" in messages[-1].content
+        return AIMessage(content=INCREMENTAL_REVIEW if incremental else FULL_REVIEW)
+
+
+class CriticClient(LLMClient):
+    """LLMClient wired to the review stand-in."""
+
+    provider = "critic"
+
+    def __init__(self):
+        super().__init__(model="critic", scheduler=LLMScheduler(tokens_per_minute=0))
+        self.chat_model = CriticChatModel()
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+async def run(iterations: int, scale: int, incremental: bool):
+    """Review every revision and return prompt tokens per iteration."""
+    from agents.clinical_critic import ClinicalCriticAgent
+
+    settings.critic_incremental_review = incremental
+    client = CriticClient()
+    llm_client._shared_clients[settings.primary_llm_provider] = client
+    agent = ClinicalCriticAgent()
+
+    state = ProtocolState(thread_id="bench", user_intent="Exposure hierarchy for agoraphobia")
+    per_iteration = []
+    for draft in revisions(iterations, scale):
+        state.add_draft_version(draft, AgentRole.DRAFTER)
+        state.increment_iteration()
+
+        before = client.chat_model.tokens
+        response = await agent.aprocess(state)
+        per_iteration.append(client.chat_model.tokens - before)
+        _apply_critic_response(state, response)
+
+    return {
+        "first": per_iteration[0],
+        "later_mean": round(sum(per_iteration[1:]) / max(1, len(per_iteration) - 1)),
+        "total": sum(per_iteration),
+        "scopes": "".join(feedback.review_scope[0] for feedback in state.critic_feedbacks),
+        "final_score": state.critic_feedbacks[-1].overall_score,
+    }
+
+
+async def main(iterations: int, scale: int):
+    settings.llm_cache_enabled = False
+
+    rows = {
+        "full re-review": await run(iterations, scale, incremental=False),
+        "incremental re-review": await run(iterations, scale, incremental=True),
+    }
+
+    print_table(
+        f"Critic prompt tokens per iteration ({iterations} iterations, "
+        f"full review every {settings.critic_full_review_interval})",
+        rows,
+        unit=""
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=6)
+    parser.add_argument("--scale", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.scale))
@@ -0,0 +1,156 @@
+"""
+Drafter output tokens and latency per revision: full regeneration vs
+section patches.
+
+Each revision answers critic feedback that names one section, and a
+lexicon hit in another, as a typical "fix this part" review does. The real
+CBTDrafterAgent runs against a fake provider whose latency grows with the
+number of tokens it writes.
+
+Usage:
+    python -m benchmarks.bench_draft_patches [--iterations N] [--scale N] [--ms-per-token MS]
+"""
+
+import argparse
+import asyncio
+import re
+import time
+
+from langchain_core.messages import AIMessage
+
+from config import settings
+from models import llm_client
+from models.llm_client import LLMClient, LLMScheduler, count_tokens
+from state.protocol_state import ProtocolState, AgentRole, SafetySeverity
+from utils.helpers import split_sections
+
+from .common import SAMPLE_DRAFT, print_table
+
+
+class DraftChatModel:
+    """Chat model stand-in that rewrites what it is given, one token at a time."""
+
+    def __init__(self, seconds_per_token: float):
+        self.seconds_per_token = seconds_per_token
+        self.output_tokens = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        prompt = messages[-1].content
+        blocks = re.findall(r"^=== SECTION (\d+): .*? ===\n(.*?)(?=\n\n=== SECTION |\n\n\*\*Feedback|\Z)", prompt, re.MULTILINE | re.DOTALL)
+        if blocks:
+            content = "\n\n".join(f"=== SECTION {number} ===\n{text.strip()}\nRevised." for number, text in blocks)
+        else:
+            draft = prompt.split("**Previous Draft:**\n", 1)[1].split("\n\n**Feedback to Address:**", 1)[0]
+            content = draft.rstrip("\n") + "\nRevised.\n"
+
+        tokens = count_tokens(content)
+        self.output_tokens += tokens
+        await asyncio.sleep(tokens * self.seconds_per_token)
+        return AIMessage(content=content)
+
+
+class DraftClient(LLMClient):
+    """LLMClient wired to the drafting stand-in."""
+
+    provider = "draft"
+
+    def __init__(self, seconds_per_token: float):
+        super().__init__(model="draft", scheduler=LLMScheduler(tokens_per_minute=0))
+        self.chat_model = DraftChatModel(seconds_per_token)
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+def scaled_draft(scale: int) -> str:
+    """The sample draft with every section body repeated `scale` times."""
+    sections = []
+    for _, chunk in split_sections(SAMPLE_DRAFT):
+        heading, _, body = chunk.partition("\n")
+        sections.append(f"{heading}\n" + body * scale if heading.startswith("#") else chunk)
+    return "".join(sections)
+
+
+def review(state: ProtocolState):
+    """Record the feedback a revision has to address on the current draft."""
+    state.add_critic_feedback(
+        overall_score=6.5,
+        empathy_score=0.8,
+        individual_scores={},
+        strengths=[],
+        improvements=[
+            "Homework Assignments: give a concrete daily practice schedule",
+            "QUALITY_REVISION_NEEDED: REQUEST_MINOR_REVISIONS"
+        ],
+        recommendation="REQUEST_MINOR_REVISIONS",
+        feedback="Overall Quality Score: 6.5/10",
+        confidence=0.9
+    )
+    start = state.current_draft.index("## Safety Considerations") + len("## Safety Considerations\n")
+    state.add_safety_flag(
+        severity=SafetySeverity.MEDIUM,
+        issue="Suggests the protocol can replace professional care",
+        recommendation="Recommend working alongside a clinician",
+        confidence=0.95,
+        category="replacing_care",
+        span_start=start,
+        span_end=start + 10
+    )
+
+
+async def run(iterations: int, scale: int, seconds_per_token: float, patches: bool):
+    """Run `iterations` revisions and return output tokens and time per revision."""
+    from agents.drafter import CBTDrafterAgent
+
+    settings.drafter_patch_revisions = patches
+    client = DraftClient(seconds_per_token)
+    llm_client._shared_clients[settings.primary_llm_provider] = client
+    agent = CBTDrafterAgent()
+
+    state = ProtocolState(thread_id="bench", user_intent="Exposure hierarchy for agoraphobia")
+    state.add_draft_version(scaled_draft(scale), AgentRole.DRAFTER)
+    state.increment_iteration()
+
+    tokens, samples = [], []
+    for _ in range(iterations):
+        review(state)
+        before = client.chat_model.output_tokens
+        start = time.perf_counter()
+        response = await agent.aprocess(state)
+        samples.append(time.perf_counter() - start)
+        tokens.append(client.chat_model.output_tokens - before)
+
+        state.add_draft_version(response.content, AgentRole.DRAFTER, patches=response.metadata.get("patches"))
+        state.increment_iteration()
+
+    return {
+        "draft_tokens": count_tokens(state.current_draft),
+        "output_tokens": round(sum(tokens) / iterations),
+        "latency": sum(samples) / iterations,
+        "patched": sum(1 for version in state.draft_versions if version.patched_sections),
+    }
+
+
+async def main(iterations: int, scale: int, ms_per_token: float):
+    # Every revision prompt differs, but keep the response cache out of it
+    settings.llm_cache_enabled = False
+
+    rows = {
+        "full regeneration": await run(iterations, scale, ms_per_token / 1000, patches=False),
+        "section patches": await run(iterations, scale, ms_per_token / 1000, patches=True),
+    }
+
+    print_table(f"Drafter revisions ({iterations} iterations, {ms_per_token:g} ms per output token)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=6)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.scale, args.ms_per_token))
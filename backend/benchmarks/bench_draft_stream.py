@@ -0,0 +1,63 @@
+"""
+Time to first protocol content on the stream: drafter node updates only
+(the old /generate-stream behaviour) vs token-level draft_delta events.
+
+The fake drafter spreads its latency over the draft's lines, like a model
+streaming tokens, so first content arrives after one line's worth of
+latency instead of the whole draft's.
+
+Usage:
+    python -m benchmarks.bench_draft_stream [--runs N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow import create_protocol_workflow
+from state.protocol_state import ProtocolState
+
+from .common import install_fake_agents, summarize, print_table
+
+
+async def first_content(graph, stream_mode) -> float:
+    """Seconds until the stream carries any drafter output."""
+    thread_id = str(uuid4())
+    state = ProtocolState(thread_id=thread_id, user_intent="Exposure hierarchy for agoraphobia")
+    config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+
+    start = time.perf_counter()
+    elapsed = None
+    async for item in graph.astream(state, config, stream_mode=stream_mode):
+        if elapsed is None:
+            if isinstance(stream_mode, list):
+                mode, event = item
+                if mode == "custom" and event.get("type") == "draft_delta":
+                    elapsed = time.perf_counter() - start
+            elif "drafter" in item:
+                elapsed = time.perf_counter() - start
+    return elapsed
+
+
+async def main(runs: int, latency: float):
+    install_fake_agents(latency=latency)
+    graph = create_protocol_workflow().compile(checkpointer=MemorySaver())
+
+    rows = {}
+    for label, stream_mode in (("node updates only", "updates"), ("draft_delta events", ["updates", "custom"])):
+        samples = [await first_content(graph, stream_mode) for _ in range(runs)]
+        rows[label] = summarize(samples)
+
+    print_table(f"Time to first draft content (drafter latency {latency:g}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, args.latency))
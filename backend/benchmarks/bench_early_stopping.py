@@ -0,0 +1,119 @@
+"""
+Iterations and time per protocol with and without diminishing-returns
+stopping, for two loops that never reach the quality threshold:
+
+- plateau: the critic score flattens (6.8 -> 6.9 -> 6.9 -> 7.0 -> 7.0)
+  while every revision still changes the draft
+- converged: the drafter returns the same draft every time
+
+Also times calculate_similarity on two ~15 KB drafts against the previous
+whitespace-split implementation.
+
+Usage:
+    python -m benchmarks.bench_early_stopping [--runs N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from config import settings
+from graph import nodes
+from graph.workflow import create_protocol_workflow
+from state.protocol_state import ProtocolState
+from utils.helpers import calculate_similarity, _token_set
+
+from .common import SAMPLE_DRAFT, FakeDrafter, install_fake_agents, summarize, print_table
+
+
+PLATEAU_SCORES = [6.8, 6.9, 6.9, 7.0, 7.0]
+
+
+class RevisingDrafter(FakeDrafter):
+    """Fake drafter whose every revision adds a paragraph of new wording."""
+
+    def _respond(self, state: Any):
+        response = super()._respond(state)
+        rng = random.Random(state.iteration_count)
+        words = " ".join(f"revision{rng.randrange(10 ** 6)}" for _ in range(60))
+        response.content = f"{SAMPLE_DRAFT}\n## Revision notes\n{words}\n"
+        return response
+
+
+def legacy_similarity(text1: str, text2: str) -> float:
+    """calculate_similarity before the token-set rewrite."""
+    if not text1 or not text2:
+        return 0.0
+    words1 = set(text1.lower().split())
+    words2 = set(text2.lower().split())
+    union = words1.union(words2)
+    return len(words1.intersection(words2)) / len(union) if union else 0.0
+
+
+async def run_loop(runs: int, latency: float, revising: bool, early_stopping: bool):
+    """Run the workflow to the halt and collect iteration counts."""
+    settings.early_stopping_enabled = early_stopping
+    install_fake_agents(latency=latency, critic_scores=PLATEAU_SCORES)
+    if revising:
+        nodes._drafter = RevisingDrafter(latency)
+    graph = create_protocol_workflow().compile(checkpointer=MemorySaver())
+
+    samples, iterations, saved = [], 0, 0
+    for _ in range(runs):
+        thread_id = str(uuid4())
+        state = ProtocolState(thread_id=thread_id, user_intent="Exposure hierarchy for agoraphobia")
+        start = time.perf_counter()
+        values = await graph.ainvoke(state, {"configurable": {"thread_id": thread_id}, "recursion_limit": 50})
+        samples.append(time.perf_counter() - start)
+
+        final = ProtocolState(**values)
+        iterations += final.iteration_count
+        saved += final.metadata.iterations_saved
+
+    return {**summarize(samples), "iterations": round(iterations / runs), "iterations_saved": round(saved / runs)}
+
+
+def time_similarity(func, text1: str, text2: str, runs: int = 50) -> float:
+    """Mean milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        func(text1, text2)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+async def main(runs: int, latency: float):
+    rows = {}
+    for scenario, revising in (("plateau", True), ("converged", False)):
+        for early_stopping in (False, True):
+            label = f"{scenario}, stopping {'on' if early_stopping else 'off'}"
+            rows[label] = await run_loop(runs, latency, revising, early_stopping)
+
+    print_table(f"Protocols that never reach the threshold (latency {latency:g}s)", rows)
+
+    draft1 = (SAMPLE_DRAFT + "\n") * 20
+    draft2 = draft1.replace(" the ", " a ")
+
+    def uncached(a, b):
+        _token_set.cache_clear()
+        return calculate_similarity(a, b)
+
+    rows = {
+        "whitespace split": {"per_call": time_similarity(legacy_similarity, draft1, draft2)},
+        "token sets": {"per_call": time_similarity(uncached, draft1, draft2)},
+        "token sets (cached)": {"per_call": time_similarity(calculate_similarity, draft1, draft2)},
+    }
+    print_table(f"calculate_similarity on two {len(draft1) / 1024:.0f} KB drafts", rows, unit="ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, args.latency))
@@ -0,0 +1,122 @@
+"""
+Drafter feedback context size per revision as a thread accumulates
+reviews: the previous get_context_for_revision (every recent flag and
+improvement, no limit) vs the deduplicated, ranked, token-budgeted builder.
+
+Every review raises the same kinds of problems again with slightly
+different wording, as successive reviews of similar drafts do, and a
+reviewer rejects the draft every few iterations.
+
+Usage:
+    python -m benchmarks.bench_feedback_context [--iterations N] [--flags N]
+"""
+
+import argparse
+import random
+
+from config import settings
+from models.llm_client import count_tokens
+from state.protocol_state import ProtocolState, SafetySeverity
+
+from .common import print_table
+
+
+ISSUES = [
+    (SafetySeverity.HIGH, "Gives specific medication dosing: \"take {n} mg\""),
+    (SafetySeverity.MEDIUM, "Suggests the protocol can replace professional care: \"instead of therapy\""),
+    (SafetySeverity.MEDIUM, "Exposure step {n} has no guidance for stopping if distress peaks"),
+    (SafetySeverity.LOW, "Promises a guaranteed outcome in step {n}"),
+]
+
+IMPROVEMENTS = [
+    "Homework Assignments: make the practice schedule concrete for week {n}",
+    "Session Overview: acknowledge how hard the first step is",
+    "Exposure Hierarchy: add an intermediate step between {n} and {m}",
+    "QUALITY_REVISION_NEEDED: REQUEST_MINOR_REVISIONS",
+]
+
+RECOMMENDATION = "Recommend consulting a prescriber and add crisis resources"
+
+
+def legacy_context(state: ProtocolState) -> str:
+    """get_context_for_revision before the bounded builder."""
+    context_parts = []
+    recent_safety = [f for f in state.safety_flags if f.iteration >= state.iteration_count - 1]
+    if recent_safety:
+        context_parts.append("**Safety Concerns:**")
+        for flag in recent_safety:
+            context_parts.append(f"- [{flag.severity.upper()}] {flag.issue}")
+            context_parts.append(f"  Recommendation: {flag.recommendation}")
+    latest_critic = state.get_latest_critic_feedback()
+    if latest_critic and latest_critic.improvements:
+        context_parts.append("\n**Quality Improvements Needed:**")
+        for improvement in latest_critic.improvements:
+            context_parts.append(f"- {improvement}")
+    if state.human_feedback:
+        context_parts.append(f"\n**Human Reviewer Feedback:**\n{state.human_feedback}")
+    return "\n".join(context_parts)
+
+
+def review(state: ProtocolState, flags: int, rng: random.Random):
+    """Record one safety and critic review of the current draft."""
+    for _ in range(flags):
+        severity, issue = rng.choice(ISSUES)
+        state.add_safety_flag(
+            severity=severity,
+            issue=issue.format(n=rng.randrange(1, 9) * 10),
+            recommendation=RECOMMENDATION,
+            confidence=0.9
+        )
+    state.add_critic_feedback(
+        overall_score=6.5,
+        empathy_score=0.7,
+        individual_scores={},
+        strengths=[],
+        improvements=[
+            improvement.format(n=rng.randrange(1, 5), m=rng.randrange(5, 9))
+            for improvement in IMPROVEMENTS for _ in range(flags // 4)
+        ],
+        recommendation="REQUEST_MINOR_REVISIONS",
+        feedback="",
+        confidence=0.9
+    )
+
+
+def run(iterations: int, flags: int):
+    """Context tokens at each revision of one thread, for both builders."""
+    rng = random.Random(7)
+    state = ProtocolState(thread_id="bench", user_intent="Exposure hierarchy for agoraphobia")
+    legacy, bounded = [], []
+    for iteration in range(1, iterations + 1):
+        state.iteration_count = iteration
+        review(state, flags, rng)
+        if iteration % 3 == 0:
+            state.human_feedback = (state.human_feedback or "") + (
+                f" Round {iteration}: the homework is still vague and the tone in the overview feels clinical."
+            )
+        legacy.append(count_tokens(legacy_context(state)))
+        bounded.append(count_tokens(state.get_context_for_revision()))
+    return legacy, bounded
+
+
+def main(iterations: int, flags: int):
+    rows = {}
+    for per_review in (flags // 4, flags, flags * 4):
+        legacy, bounded = run(iterations, per_review)
+        rows[f"{per_review} flags/review, previous"] = {"mean": round(sum(legacy) / iterations), "max": max(legacy)}
+        rows[f"{per_review} flags/review, bounded"] = {"mean": round(sum(bounded) / iterations), "max": max(bounded)}
+
+    print_table(
+        f"Feedback context tokens per revision ({iterations} iterations, "
+        f"budget {settings.feedback_context_max_tokens})",
+        rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--flags", type=int, default=8)
+    args = parser.parse_args()
+
+    main(args.iterations, args.flags)
@@ -0,0 +1,103 @@
+"""
+/api/generate under a burst of concurrent requests: the workflow run
+inside the request vs the job queue (thread_id returned at once, a fixed
+worker pool runs the graphs, admission control past the queue limit).
+
+Runs the real app (TestClient, SQLite checkpointer and queue file on a
+scratch directory) with fake agents.
+
+Usage:
+    python -m benchmarks.bench_job_queue [--requests N] [--workers N] [--max-depth N] [--latency SECONDS]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from .common import install_fake_agents, summarize, print_table
+
+
+def burst(client: TestClient, requests: int):
+    """Send `requests` generations at once; return response times, thread ids and rejections."""
+    def send(index: int):
+        start = time.perf_counter()
+        response = client.post(
+            "/api/generate",
+            json={"user_intent": f"Exposure hierarchy for agoraphobia, case {index}", "source": "mcp", "use_cache": False}
+        )
+        return time.perf_counter() - start, response
+
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        results = list(pool.map(send, range(requests)))
+
+    accepted = [response.json()["thread_id"] for _, response in results if response.status_code == 200]
+    rejected = sum(1 for _, response in results if response.status_code == 503)
+    return [elapsed for elapsed, _ in results], accepted, rejected
+
+
+def wait_for_jobs(client: TestClient, thread_ids):
+    """Poll the jobs endpoint until every job has finished."""
+    pending = set(thread_ids)
+    while pending:
+        pending = {
+            thread_id for thread_id in pending
+            if client.get(f"/api/jobs/{thread_id}").json()["status"] in ("queued", "running")
+        }
+        time.sleep(0.05)
+
+
+def run(requests: int, queued: bool):
+    """One burst against a fresh app; returns response and completion times."""
+    import main as app_module
+    from config import settings
+
+    settings.job_queue_enabled = queued
+    with TestClient(app_module.app) as client:
+        start = time.perf_counter()
+        samples, accepted, rejected = burst(client, requests)
+        if queued:
+            wait_for_jobs(client, accepted)
+        all_done = time.perf_counter() - start
+
+    response = summarize(samples)
+    return {"response_mean": response["mean"], "response_max": response["max"], "all_done": all_done, "rejected": rejected}
+
+
+def main(requests: int, workers: int, max_depth: int, latency: float):
+    from config import settings
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # The checkpointer resolves relative SQLite URLs against the cwd
+        os.chdir(tmp)
+        settings.database_url = "sqlite:///./bench.db"
+        settings.job_queue_path = "./bench_jobs.db"
+        settings.job_queue_workers = workers
+        settings.job_queue_max_depth = max_depth
+        install_fake_agents(latency=latency)
+
+        rows = {
+            "run in request": run(requests, queued=False),
+            f"job queue ({workers} workers)": run(requests, queued=True),
+        }
+        os.chdir(cwd)
+
+    print_table(
+        f"{requests} concurrent /api/generate requests (agent latency {latency:g}s, queue limit {max_depth})",
+        rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-depth", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    main(args.requests, args.workers, args.max_depth, args.latency)
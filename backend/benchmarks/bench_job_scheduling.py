@@ -0,0 +1,75 @@
+"""
+Queue wait per scheduling class when a bulk MCP client floods the job
+queue while web users and a second MCP client submit a steady trickle:
+plain FIFO (every job treated as aged) vs weighted fair queueing with
+per-class worker shares.
+
+Runs the real JobQueue on a scratch file with a runner that sleeps for
+the job's duration instead of running the graph.
+
+Usage:
+    python -m benchmarks.bench_job_scheduling [--workers N] [--bulk N] [--run-seconds S]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from config import settings
+from state.protocol_state import ProtocolState
+
+from .common import print_table
+
+
+async def run(workers: int, bulk: int, run_seconds: float, fifo: bool):
+    """Flood, then trickle; return each class's queue-wait stats."""
+    from api.job_queue import JobQueue
+
+    settings.job_queue_aging_seconds = 0.0 if fifo else 300.0
+
+    async def runner(job):
+        await asyncio.sleep(run_seconds)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(path=os.path.join(tmp, "jobs.db"), workers=workers, max_depth=10 ** 6, max_wait=float("inf"))
+        await queue.start(runner)
+
+        for index in range(bulk):
+            state = ProtocolState(thread_id=f"bulk-{index}", user_intent="bulk", source="mcp")
+            await queue.submit(state, client_key="bulk-client")
+        for index in range(bulk // 4):
+            await queue.submit(ProtocolState(thread_id=f"web-{index}", user_intent="web", source="web"))
+            await queue.submit(
+                ProtocolState(thread_id=f"mcp-{index}", user_intent="mcp", source="mcp"),
+                client_key="small-client"
+            )
+            await asyncio.sleep(run_seconds / workers)
+
+        while queue.get_stats()["queued"] or queue.get_stats()["running"]:
+            await asyncio.sleep(run_seconds)
+        stats = queue.get_stats()["classes"]
+        await queue.stop()
+
+    return stats
+
+
+async def main(workers: int, bulk: int, run_seconds: float):
+    rows = {}
+    for label, fifo in (("FIFO", True), ("weighted fair", False)):
+        for name, stats in (await run(workers, bulk, run_seconds, fifo)).items():
+            if stats["wait"]["acquired"]:
+                wait = stats["wait"]
+                rows[f"{label}, {name}"] = {key: wait[key] for key in ("acquired", "p50_wait", "p95_wait", "p99_wait", "max_wait")}
+
+    print_table(f"Queue wait per class ({workers} workers, {bulk} bulk jobs, {run_seconds:g}s per job)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--bulk", type=int, default=40)
+    parser.add_argument("--run-seconds", type=float, default=0.05)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.workers, args.bulk, args.run_seconds))
@@ -0,0 +1,108 @@
+"""
+Latency and provider calls for repeated reviews with and without the LLM
+response cache.
+
+Each round replays the same safety and critic prompts, as a resume or a
+retried request does. The "restart" row drops the in-memory tier between
+rounds so every hit comes from the SQLite store.
+
+Usage:
+    python -m benchmarks.bench_llm_cache [--rounds N] [--prompts N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from config import settings
+from models.llm_client import LLMClient, LLMResponseCache, LLMScheduler
+from models.prompts import SAFETY_GUARDIAN_SYSTEM_PROMPT, get_safety_user_prompt
+
+from .common import SAMPLE_DRAFT, print_table
+
+
+class SlowChatModel:
+    """Chat model stand-in with fixed latency that counts calls."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="Overall Safety Rating: SAFE")
+
+
+class SlowClient(LLMClient):
+    """LLMClient wired to the slow stand-in."""
+
+    provider = "slow"
+
+    def __init__(self, latency: float, cache: LLMResponseCache):
+        super().__init__(model="slow", scheduler=LLMScheduler(tokens_per_minute=0), cache=cache)
+        self.chat_model = SlowChatModel(latency)
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+async def run(rounds: int, prompts: int, latency: float, cache: LLMResponseCache, enabled: bool, restart: bool):
+    """Replay the same review prompts for several rounds."""
+    settings.llm_cache_enabled = enabled
+    client = SlowClient(latency, cache)
+    batches = [
+        [
+            SystemMessage(content=SAFETY_GUARDIAN_SYSTEM_PROMPT),
+            HumanMessage(content=get_safety_user_prompt(f"Intent {index}", SAMPLE_DRAFT))
+        ]
+        for index in range(prompts)
+    ]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if restart:
+            cache._memory.clear()
+        for messages in batches:
+            await client.ainvoke(messages, agent="Safety_Guardian", temperature=settings.safety_temperature)
+    wall = time.perf_counter() - start
+
+    return {
+        "provider_calls": client.chat_model.calls,
+        "hit_rate": cache.get_stats()["hit_rate"],
+        "per_call": wall / (rounds * prompts),
+    }
+
+
+async def main(rounds: int, prompts: int, latency: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = {
+            "no cache": await run(
+                rounds, prompts, latency, LLMResponseCache(path=""), enabled=False, restart=False
+            ),
+            "memory + sqlite": await run(
+                rounds, prompts, latency, LLMResponseCache(path=os.path.join(tmp, "a.db")), enabled=True, restart=False
+            ),
+            "sqlite only (restart)": await run(
+                rounds, prompts, latency, LLMResponseCache(path=os.path.join(tmp, "b.db")), enabled=True, restart=True
+            ),
+        }
+
+    print_table(f"{rounds} rounds x {prompts} safety reviews, provider latency {latency:g}s", rows, unit="")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--prompts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rounds, args.prompts, args.latency))
@@ -0,0 +1,109 @@
+"""
+Completed vs lost LLM calls against a throttling provider, with and without
+the retry/backoff layer in models/llm_client.py.
+
+The fake provider admits a fixed number of requests per second and answers
+the rest with 429 + Retry-After, like a rate-limited API.
+
+Usage:
+    python -m benchmarks.bench_llm_retry [--calls N] [--rate PER_SECOND] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import openai
+from langchain_core.messages import AIMessage, HumanMessage
+
+from config import settings
+from models.llm_client import LLMClient
+
+from .common import print_table
+
+
+class ThrottledChatModel:
+    """Chat model stand-in that enforces a requests-per-second budget."""
+
+    def __init__(self, rate: float, latency: float):
+        self.rate = rate
+        self.latency = latency
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def _admit(self):
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start, self._window_count = now, 0
+        if self._window_count >= self.rate:
+            retry_after = 1.0 - (now - self._window_start)
+            request = httpx.Request("POST", "https://provider.invalid/v1/chat")
+            response = httpx.Response(429, headers={"retry-after": f"{retry_after:.3f}"}, request=request)
+            raise openai.RateLimitError("Rate limit exceeded", response=response, body=None)
+        self._window_count += 1
+
+    async def ainvoke(self, messages, **kwargs):
+        self._admit()
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="ok")
+
+
+class ThrottledClient(LLMClient):
+    """LLMClient wired to the throttled stand-in."""
+
+    provider = "throttled"
+
+    def __init__(self, rate: float, latency: float):
+        super().__init__(model="throttled")
+        self.chat_model = ThrottledChatModel(rate, latency)
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+async def run(calls: int, rate: float, latency: float, max_retries: int):
+    """Fire all calls at once and count outcomes."""
+    settings.llm_max_retries = max_retries
+    client = ThrottledClient(rate, latency)
+    client.breaker.record_success()
+
+    async def one():
+        try:
+            await client.ainvoke([HumanMessage(content="hello")])
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(calls)))
+    return {
+        "completed": sum(results),
+        "lost": calls - sum(results),
+        "wall": time.perf_counter() - start,
+    }
+
+
+async def main(calls: int, rate: float, latency: float):
+    retries = settings.llm_max_retries
+    settings.llm_circuit_failure_threshold = calls * 10  # measure backoff alone
+
+    rows = {
+        "no retries": await run(calls, rate, latency, max_retries=0),
+        f"{retries} retries + backoff": await run(calls, rate, latency, max_retries=retries),
+    }
+
+    print_table(f"{calls} concurrent calls, provider limit {rate:g}/s", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--rate", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.calls, args.rate, args.latency))
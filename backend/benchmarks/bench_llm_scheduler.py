@@ -0,0 +1,124 @@
+"""
+Burst of agent calls against a concurrency-limited provider, with and
+without the adaptive request scheduler in models/llm_client.py.
+
+The fake provider serves a fixed number of requests at once and answers
+the rest with 429 + Retry-After. Without the scheduler every call of the
+burst hits the provider and most of them are bounced into backoff; with it
+the provider limit converges on what the provider accepts and the excess
+waits in the scheduler's queue instead.
+
+Usage:
+    python -m benchmarks.bench_llm_scheduler [--calls N] [--capacity N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import openai
+from langchain_core.messages import AIMessage, HumanMessage
+
+from config import settings
+from models.llm_client import LLMClient, LLMScheduler
+
+from .common import print_table
+
+
+class CapacityChatModel:
+    """Chat model stand-in that serves at most `capacity` calls at once."""
+
+    def __init__(self, capacity: int, latency: float):
+        self.capacity = capacity
+        self.latency = latency
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            request = httpx.Request("POST", "https://provider.invalid/v1/chat")
+            response = httpx.Response(429, headers={"retry-after": f"{self.latency:.3f}"}, request=request)
+            raise openai.RateLimitError("Rate limit exceeded", response=response, body=None)
+
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return AIMessage(content="ok")
+
+
+class CapacityClient(LLMClient):
+    """LLMClient wired to the capacity-limited stand-in."""
+
+    provider = "capacity"
+
+    def __init__(self, capacity: int, latency: float, scheduler: LLMScheduler):
+        super().__init__(model="capacity", scheduler=scheduler)
+        self.chat_model = CapacityChatModel(capacity, latency)
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+async def run(calls: int, capacity: int, latency: float, scheduler: LLMScheduler):
+    """Fire the whole burst at once and collect provider and queue stats."""
+    client = CapacityClient(capacity, latency, scheduler)
+    client.breaker.record_success()
+    agents = ["CBT_Drafter", "Safety_Guardian", "Clinical_Critic"]
+
+    async def one(index: int):
+        try:
+            await client.ainvoke([HumanMessage(content="hello")], agent=agents[index % len(agents)])
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(index) for index in range(calls)))
+    wall = time.perf_counter() - start
+
+    provider_stats = scheduler.get_stats()["providers"]["capacity"]
+    return {
+        "completed": sum(results),
+        "429s": client.chat_model.rejected,
+        "final_limit": provider_stats["limit"],
+        "max_queue": provider_stats["max_queue_depth"],
+        "p95_wait": provider_stats["p95_wait"],
+        "wall": wall,
+    }
+
+
+async def main(calls: int, capacity: int, latency: float):
+    settings.llm_circuit_failure_threshold = calls * 10  # measure scheduling alone
+
+    # Unscheduled: the limit never drops below the burst size
+    unscheduled = LLMScheduler(
+        provider_max_concurrency=calls,
+        provider_min_concurrency=calls,
+        agent_max_concurrency={},
+        tokens_per_minute=0
+    )
+    scheduled = LLMScheduler(tokens_per_minute=0)
+
+    rows = {
+        "no scheduling": await run(calls, capacity, latency, unscheduled),
+        "adaptive scheduler": await run(calls, capacity, latency, scheduled),
+    }
+
+    print_table(f"{calls}-call burst, provider serves {capacity} at once", rows, unit="")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.calls, args.capacity, args.latency))
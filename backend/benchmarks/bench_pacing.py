@@ -0,0 +1,52 @@
+"""
+Wall-clock time per protocol run with and without UI event pacing.
+
+Usage:
+    python -m benchmarks.bench_pacing [--runs N] [--interval SECONDS] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from graph.workflow import create_protocol_workflow
+from graph.streaming import stream_workflow_events
+from config import settings
+from state.protocol_state import ProtocolState
+
+from .common import install_fake_agents, summarize, print_table, time_async
+
+
+async def run_once(graph):
+    """Drive one protocol through the SSE stream until it halts."""
+    thread_id = str(uuid4())
+    state = ProtocolState(thread_id=thread_id, user_intent="Exposure hierarchy for agoraphobia")
+    config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+
+    async for _ in stream_workflow_events(graph, state, config):
+        pass
+
+
+async def main(runs: int, interval: float, latency: float):
+    install_fake_agents(latency=latency)
+    graph = create_protocol_workflow().compile(checkpointer=MemorySaver())
+
+    rows = {}
+    for label, pacing in (("pacing off", 0.0), (f"pacing {interval}s", interval)):
+        settings.stream_pacing_interval = pacing
+        samples = await time_async(lambda: run_once(graph), runs)
+        rows[label] = summarize(samples)
+
+    print_table(f"Wall-clock per run (agent latency {latency}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, args.interval, args.latency))
@@ -0,0 +1,134 @@
+"""
+Input tokens per protocol for each system prompt variant setting:
+full prompts on every call, compact prompts on every call, and "auto"
+(full on the first pass, compact on revisions).
+
+The real drafter, Safety Guardian and Clinical Critic run for a fixed
+number of iterations against a fake provider that answers in each
+agent's output format. "cacheable" is the prompt prefix each call shares
+with the same agent's previous call, which a provider-side prefix cache
+can reuse.
+
+Usage:
+    python -m benchmarks.bench_prompt_variants [--iterations N] [--scale N]
+"""
+
+import argparse
+import asyncio
+import os
+import re
+
+from langchain_core.messages import AIMessage
+
+from config import settings
+from graph.nodes import _apply_draft_response, _apply_safety_response, _apply_critic_response
+from models import llm_client
+from models.llm_client import LLMClient, LLMScheduler, count_tokens
+from models.prompts import SYSTEM_PROMPT_VARIANTS
+from state.protocol_state import ProtocolState
+
+from .bench_critic_diff import FULL_REVIEW, INCREMENTAL_REVIEW
+from .bench_safety_sections import revisions
+from .common import print_table
+
+
+AGENTS = {text: agent for agent, variants in SYSTEM_PROMPT_VARIANTS.items() for text in variants.values()}
+
+
+class ProtocolChatModel:
+    """Chat model stand-in that answers as whichever agent's system prompt it gets."""
+
+    def __init__(self, drafts):
+        self.drafts = iter(drafts)
+        self.previous = {}
+        self.cacheable = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        agent = AGENTS[messages[0].content]
+        prompt = "\n".join(str(message.content) for message in messages)
+        if agent in self.previous:
+            self.cacheable += count_tokens(os.path.commonprefix([self.previous[agent], prompt]))
+        self.previous[agent] = prompt
+
+        user = messages[-1].content
+        if agent == "drafter":
+            return AIMessage(content=next(self.drafts))
+        if agent == "clinical_critic":
+            incremental = "Changes Since the Previous Review" in user
+            return AIMessage(content=INCREMENTAL_REVIEW if incremental else FULL_REVIEW)
+        numbers = re.findall(r"^=== SECTION (\d+):", user, re.MULTILINE)
+        if not numbers:
+            return AIMessage(content="Overall Safety Rating: SAFE")
+        return AIMessage(content="\n".join(
+            f"=== SECTION {number} ===\nOverall Safety Rating: SAFE" for number in numbers
+        ))
+
+
+class ProtocolClient(LLMClient):
+    """LLMClient wired to the protocol stand-in."""
+
+    provider = "protocol"
+
+    def __init__(self, drafts):
+        super().__init__(model="protocol", scheduler=LLMScheduler(tokens_per_minute=0))
+        self.chat_model = ProtocolChatModel(drafts)
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+async def run(iterations: int, scale: int, variant: str):
+    """Run one protocol for `iterations` draft/review rounds and return its input tokens."""
+    from agents.drafter import CBTDrafterAgent
+    from agents.safety_guardian import SafetyGuardianAgent
+    from agents.clinical_critic import ClinicalCriticAgent
+
+    settings.prompt_variant = variant
+    client = ProtocolClient(revisions(iterations, scale))
+    llm_client._shared_clients[settings.primary_llm_provider] = client
+    drafter, safety, critic = CBTDrafterAgent(), SafetyGuardianAgent(), ClinicalCriticAgent()
+
+    state = ProtocolState(thread_id="bench", user_intent="Exposure hierarchy for agoraphobia")
+    for _ in range(iterations):
+        _apply_draft_response(state, await drafter.aprocess(state))
+        _apply_safety_response(state, await safety.aprocess(state))
+        _apply_critic_response(state, await critic.aprocess(state))
+
+    by_agent = {agent: 0 for agent in SYSTEM_PROMPT_VARIANTS}
+    for version, tokens in state.metadata.input_tokens_by_prompt.items():
+        by_agent[version.split("/", 1)[0]] += tokens
+
+    return {
+        **by_agent,
+        "input_tokens": state.metadata.input_tokens,
+        "cacheable": client.chat_model.cacheable,
+    }, state.metadata.input_tokens_by_prompt
+
+
+async def main(iterations: int, scale: int):
+    settings.llm_cache_enabled = False
+    # Whole-draft revisions, so the drafter's prompt is the same shape every pass
+    settings.drafter_patch_revisions = False
+
+    rows = {}
+    for variant in ("full", "compact", "auto"):
+        rows[variant], by_prompt = await run(iterations, scale, variant)
+
+    print_table(f"Input tokens per protocol ({iterations} iterations, scale {scale})", rows, unit="")
+    print_table(
+        'Input tokens per prompt variant with prompt_variant="auto"',
+        {version: {"input_tokens": tokens} for version, tokens in sorted(by_prompt.items())},
+        unit=""
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=6)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.scale))
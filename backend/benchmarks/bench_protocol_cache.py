@@ -0,0 +1,72 @@
+"""
+/api/generate latency for repeated, equivalently worded MCP requests with
+and without the finalized-protocol cache.
+
+Runs the real app (TestClient, shared SQLite checkpointer on a scratch
+file) with fake agents. The first request of each intent always runs the full loop; the
+rest are rewordings that normalize to the same key.
+
+Usage:
+    python -m benchmarks.bench_protocol_cache [--repeats N] [--latency SECONDS]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from .common import install_fake_agents, summarize, print_table
+
+
+INTENTS = [
+    ["Exposure hierarchy for agoraphobia", "exposure  hierarchy for Agoraphobia.", "Create an exposure hierarchy for agoraphobia"],
+    ["Sleep hygiene plan for insomnia", "sleep hygiene plan for insomnia!", "Please create a sleep hygiene plan for insomnia"],
+]
+
+
+def measure(client: TestClient, repeats: int, use_cache: bool):
+    """Send each intent's rewordings `repeats` times and time the requests."""
+    client.delete("/api/cache/protocols")
+    samples = []
+    for variants in INTENTS:
+        for index in range(repeats):
+            body = {"user_intent": variants[index % len(variants)], "source": "mcp", "use_cache": use_cache}
+            start = time.perf_counter()
+            response = client.post("/api/generate", json=body)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return samples
+
+
+def main(repeats: int, latency: float):
+    import main as app_module
+    from config import settings
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # The checkpointer resolves relative SQLite URLs against the cwd
+        os.chdir(tmp)
+        settings.database_url = "sqlite:///./bench.db"
+        # Time the whole run inside the request, as the cache saves it
+        settings.job_queue_enabled = False
+        install_fake_agents(latency=latency)
+
+        with TestClient(app_module.app) as client:
+            rows = {
+                "use_cache=false": summarize(measure(client, repeats, use_cache=False)),
+                "use_cache=true": summarize(measure(client, repeats, use_cache=True)),
+            }
+        os.chdir(cwd)
+
+    print_table(f"/api/generate, {len(INTENTS)} intents x {repeats} requests (agent latency {latency:g}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    main(args.repeats, args.latency)
@@ -0,0 +1,74 @@
+"""
+Critic calls and wall time per review policy for drafts the Safety
+Guardian blocks before one passes (UNSAFE, UNSAFE, then SAFE).
+
+- parallel: safety and critic always run together (the old behaviour)
+- speculative: both start, the critic is cancelled when safety blocks
+- safety_first: the critic only runs once safety has passed the draft
+
+The fake critic is slower than the fake safety review, as the real
+critic's longer output makes it.
+
+Usage:
+    python -m benchmarks.bench_review_policy [--runs N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from config import settings
+from graph import nodes
+from graph.workflow import create_protocol_workflow
+from state.protocol_state import ProtocolState
+
+from .common import install_fake_agents, print_table
+
+
+SAFETY_RATINGS = ["UNSAFE", "UNSAFE", "SAFE"]
+
+
+async def run_policy(policy: str, runs: int, latency: float):
+    """Run the workflow to the halt `runs` times under one policy."""
+    settings.review_policy = policy
+    install_fake_agents(latency=latency, safety_ratings=SAFETY_RATINGS)
+    critic = nodes._clinical_critic
+    critic.latency = latency * 1.5
+    graph = create_protocol_workflow().compile(checkpointer=MemorySaver())
+
+    avoided = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        thread_id = str(uuid4())
+        state = ProtocolState(thread_id=thread_id, user_intent="Exposure hierarchy for agoraphobia")
+        config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+        final = ProtocolState(**await graph.ainvoke(state, config))
+        avoided += final.metadata.critic_calls_avoided
+    wall = time.perf_counter() - start
+
+    return {
+        "critic_started": critic.started,
+        "critic_completed": critic.completed,
+        "critic_calls_avoided": avoided,
+        "wall_per_run": wall / runs,
+    }
+
+
+async def main(runs: int, latency: float):
+    rows = {}
+    for policy in ("parallel", "speculative", "safety_first"):
+        rows[policy] = await run_policy(policy, runs, latency)
+
+    print_table(f"{runs} runs, safety ratings {' -> '.join(SAFETY_RATINGS)} (latency {latency:g}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, args.latency))
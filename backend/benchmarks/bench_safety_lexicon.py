@@ -0,0 +1,87 @@
+"""
+Lexicon pre-screen cost on large drafts: the combined single-pass regex in
+agents/safety_lexicon.py vs scanning the draft once per lexicon pattern.
+
+The draft is the sample protocol repeated to the target size with a few
+risky phrases spliced in, so both scanners have matches to report.
+
+Usage:
+    python -m benchmarks.bench_safety_lexicon [--runs N] [--size KB]
+"""
+
+import argparse
+import re
+import time
+
+from agents.safety_lexicon import RiskLexicon, DEFAULT_RISK_LEXICON
+
+from .common import SAMPLE_DRAFT, summarize, print_table
+
+
+RISKY_PHRASES = [
+    "If it gets bad, take 40 mg of your medication before the exercise.",
+    "Some people find it's okay to hurt yourself when anxiety peaks.",
+    "This exercise is guaranteed to cure your panic attacks.",
+]
+
+
+def build_draft(size_kb: int) -> str:
+    """Repeat the sample draft to size_kb, inserting a risky phrase every copy."""
+    parts = []
+    length = 0
+    index = 0
+    while length < size_kb * 1024:
+        chunk = f"{SAMPLE_DRAFT}\n{RISKY_PHRASES[index % len(RISKY_PHRASES)]}\n"
+        parts.append(chunk)
+        length += len(chunk)
+        index += 1
+    return "".join(parts)
+
+
+def per_pattern_scan(patterns, text: str):
+    """Baseline: one pass over the text per pattern, then sort by offset."""
+    matches = []
+    for category, pattern in patterns:
+        for match in pattern.finditer(text):
+            matches.append((match.start(), match.end(), category))
+    return sorted(matches)
+
+
+def time_calls(func, runs: int):
+    """Time a synchronous callable over several runs."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(runs: int, size_kb: int):
+    draft = build_draft(size_kb)
+    lexicon = RiskLexicon(DEFAULT_RISK_LEXICON)
+    patterns = [
+        (category, re.compile(pattern, re.IGNORECASE))
+        for category, rule in DEFAULT_RISK_LEXICON.items()
+        for pattern in rule["patterns"]
+    ]
+
+    combined = lexicon.scan(draft)
+    baseline = per_pattern_scan(patterns, draft)
+
+    rows = {
+        f"per-pattern ({len(patterns)} passes)": summarize(time_calls(lambda: per_pattern_scan(patterns, draft), runs)),
+        "combined regex (1 pass)": summarize(time_calls(lambda: lexicon.scan(draft), runs)),
+    }
+
+    print_table(f"Lexicon pre-screen on a {len(draft) / 1024:.0f} KB draft", rows)
+    print(f"\n  matches: combined={len(combined)} per-pattern={len(baseline)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--size", type=int, default=100, help="draft size in KB")
+    args = parser.parse_args()
+
+    main(args.runs, args.size)
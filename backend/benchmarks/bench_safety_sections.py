@@ -0,0 +1,123 @@
+"""
+Safety Guardian prompt tokens per iteration: whole-draft review vs
+section-level review with cached verdicts for unchanged sections.
+
+Each revision edits one section of the sample draft, as a drafter
+addressing a single piece of feedback does. The real SafetyGuardianAgent
+runs against a fake provider that answers in the per-section format.
+
+Usage:
+    python -m benchmarks.bench_safety_sections [--iterations N] [--scale N]
+"""
+
+import argparse
+import asyncio
+import re
+
+from langchain_core.messages import AIMessage
+
+from config import settings
+from models import llm_client
+from models.llm_client import LLMClient, LLMScheduler, count_tokens
+from state.protocol_state import ProtocolState
+from utils.helpers import split_sections
+
+from .common import SAMPLE_DRAFT, print_table
+
+
+class ReviewChatModel:
+    """Chat model stand-in that rates every section SAFE and counts prompt tokens."""
+
+    def __init__(self):
+        self.calls = 0
+        self.tokens = 0
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        self.tokens += sum(count_tokens(str(message.content)) for message in messages)
+
+        numbers = re.findall(r"^=== SECTION (\d+):", messages[-1].content, re.MULTILINE)
+        if not numbers:
+            return AIMessage(content="Overall Safety Rating: SAFE")
+        return AIMessage(content="\n".join(
+            f"=== SECTION {number} ===\nOverall Safety Rating: SAFE" for number in numbers
+        ))
+
+
+class ReviewClient(LLMClient):
+    """LLMClient wired to the review stand-in."""
+
+    provider = "review"
+
+    def __init__(self):
+        super().__init__(model="review", scheduler=LLMScheduler(tokens_per_minute=0))
+        self.chat_model = ReviewChatModel()
+
+    def _create_chat_model(self, temperature, max_tokens):
+        return self.chat_model
+
+    def _tokens_used(self, response):
+        return None
+
+
+def revisions(iterations: int, scale: int):
+    """The sample draft (bodies repeated `scale` times) with one section edited per iteration."""
+    sections = []
+    for _, chunk in split_sections(SAMPLE_DRAFT):
+        heading, _, body = chunk.partition("\n")
+        sections.append(f"{heading}\n" + body * scale if heading.startswith("#") else chunk)
+    drafts = []
+    for iteration in range(iterations):
+        if iteration:
+            index = 1 + (iteration - 1) % (len(sections) - 1)
+            sections[index] = sections[index].rstrip("\n") + f"\nRevision note {iteration}.\n\n"
+        drafts.append("".join(sections))
+    return drafts
+
+
+async def run(iterations: int, scale: int, section_review: bool):
+    """Review every revision and return prompt tokens per iteration."""
+    from agents.safety_guardian import SafetyGuardianAgent
+
+    settings.safety_section_review = section_review
+    client = ReviewClient()
+    llm_client._shared_clients[settings.primary_llm_provider] = client
+    agent = SafetyGuardianAgent()
+
+    per_iteration = []
+    for iteration, draft in enumerate(revisions(iterations, scale)):
+        state = ProtocolState(thread_id="bench", user_intent="Exposure hierarchy for agoraphobia")
+        state.current_draft = draft
+        state.iteration_count = iteration + 1
+
+        before = client.chat_model.tokens
+        response = await agent.aprocess(state)
+        per_iteration.append(client.chat_model.tokens - before)
+
+    return {
+        "first": per_iteration[0],
+        "later_mean": sum(per_iteration[1:]) / max(1, len(per_iteration) - 1),
+        "total": sum(per_iteration),
+        "rating": response.metadata["safety_rating"],
+    }
+
+
+async def main(iterations: int, scale: int):
+    # Isolate section caching from the whole-response cache
+    settings.llm_cache_enabled = False
+
+    rows = {
+        "whole draft": await run(iterations, scale, section_review=False),
+        "changed sections only": await run(iterations, scale, section_review=True),
+    }
+
+    print_table(f"Safety prompt tokens per iteration ({iterations} iterations)", rows, unit="")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.scale))
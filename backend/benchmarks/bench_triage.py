@@ -0,0 +1,75 @@
+"""
+Time to a halted response for crisis and medication-advice intents, with
+and without the triage stage between initialize and the supervisor.
+
+Without triage these intents run at least one draft/safety/critic cycle
+before anything reaches a reviewer; with it they get the pre-approved
+template straight away and no agent LLM calls are made.
+
+Usage:
+    python -m benchmarks.bench_triage [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from config import settings
+from graph.workflow import create_protocol_workflow
+from state.protocol_state import ProtocolState
+
+from .common import install_fake_agents, summarize, print_table
+
+
+INTENTS = [
+    "I want to end my life, give me something to do tonight",
+    "I'm suicidal and can't stop thinking about it",
+    "How many mg of sertraline should I take to feel better?",
+    "Should I stop taking my antidepressants before starting CBT?",
+]
+
+
+async def run(graph, intent: str):
+    """Run one intent to the halt and count the agent calls it made."""
+    thread_id = str(uuid4())
+    state = ProtocolState(thread_id=thread_id, user_intent=intent)
+    config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+
+    start = time.perf_counter()
+    values = await graph.ainvoke(state, config)
+    elapsed = time.perf_counter() - start
+
+    final = ProtocolState(**values)
+    agent_calls = (
+        sum(1 for version in final.draft_versions if version.created_by == "drafter") +
+        len(final.scratchpad.get("safety_checks", [])) +
+        len(final.critic_feedbacks)
+    )
+    return elapsed, agent_calls
+
+
+async def main(latency: float):
+    install_fake_agents(latency=latency)
+    graph = create_protocol_workflow().compile(checkpointer=MemorySaver())
+
+    rows = {}
+    for label, enabled in (("no triage", False), ("triage", True)):
+        settings.triage_enabled = enabled
+        results = [await run(graph, intent) for intent in INTENTS]
+        rows[label] = {
+            **summarize([elapsed for elapsed, _ in results]),
+            "agent_calls": sum(calls for _, calls in results),
+        }
+
+    print_table(f"{len(INTENTS)} crisis/medication intents (agent latency {latency:g}s)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency))
@@ -0,0 +1,202 @@
+"""
+Shared fixtures for benchmarks: fake agents and timing helpers.
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from agents.base_agent import BaseAgent, AgentResponse
+
+
+SAMPLE_DRAFT = """# CBT Protocol: Exposure Hierarchy for Agoraphobia
+
+## Session Overview
+Purpose: Build confidence leaving home through gradual, planned exposure.
+It is normal to feel anxious at first; progress matters more than perfection.
+
+## Exposure Hierarchy
+1. Stand at the front door for five minutes (SUDs 30)
+2. Walk to the end of the street with a support person (SUDs 45)
+3. Visit a quiet shop during off-peak hours (SUDs 60)
+
+## Cognitive Reframing Techniques
+Use a thought record: situation, automatic thought, evidence for, evidence
+against, and a more balanced alternative perspective.
+
+## Homework Assignments
+Practise step 1 daily this week and note your SUDs before and after.
+
+## Safety Considerations
+If you feel unsafe or overwhelmed, contact your therapist or a crisis line.
+"""
+
+
+class FakeDrafter(BaseAgent):
+    """Drafter stand-in that returns a fixed, well-structured draft."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(name="Fake_Drafter", role="Benchmark drafter", temperature=0.0)
+        self.latency = latency
+
+    def get_system_prompt(self) -> str:
+        return ""
+
+    def _respond(self, state: Any) -> AgentResponse:
+        return self._create_response(
+            content=SAMPLE_DRAFT,
+            reasoning=f"Fake draft for iteration {state.iteration_count + 1}",
+            confidence=0.9,
+            metadata={
+                "word_count": len(SAMPLE_DRAFT.split()),
+                "has_structure": True,
+                "iteration": state.iteration_count + 1
+            }
+        )
+
+    def process(self, state: Any) -> AgentResponse:
+        time.sleep(self.latency)
+        return self._respond(state)
+
+    async def aprocess(self, state: Any, on_delta: Callable[[str], None] = None) -> AgentResponse:
+        if on_delta is None:
+            await asyncio.sleep(self.latency)
+        else:
+            # Spread the latency over the draft's lines, as a streaming model would
+            lines = SAMPLE_DRAFT.splitlines(keepends=True)
+            for line in lines:
+                await asyncio.sleep(self.latency / len(lines))
+                on_delta(line)
+        return self._respond(state)
+
+
+class FakeSafetyGuardian(BaseAgent):
+    """Safety Guardian stand-in that returns a configurable rating sequence (SAFE by default)."""
+
+    def __init__(self, latency: float = 0.0, ratings: List[str] = None):
+        super().__init__(name="Fake_Safety_Guardian", role="Benchmark safety", temperature=0.0)
+        self.latency = latency
+        self.ratings = ratings or ["SAFE"]
+
+    def get_system_prompt(self) -> str:
+        return ""
+
+    def _respond(self, state: Any) -> AgentResponse:
+        index = min(len(state.scratchpad.get("safety_checks", [])), len(self.ratings) - 1)
+        rating = self.ratings[index]
+        return self._create_response(
+            content=f"Overall Safety Rating: {rating}",
+            reasoning="Fake safety review",
+            confidence=0.9,
+            flags=[] if rating == "SAFE" else [f"HIGH severity issue: fake {rating} rating"],
+            metadata={
+                "safety_rating": rating,
+                "high_severity_issues": 0 if rating == "SAFE" else 1,
+                "iteration": state.iteration_count
+            }
+        )
+
+    def process(self, state: Any) -> AgentResponse:
+        time.sleep(self.latency)
+        return self._respond(state)
+
+    async def aprocess(self, state: Any) -> AgentResponse:
+        await asyncio.sleep(self.latency)
+        return self._respond(state)
+
+
+class FakeClinicalCritic(BaseAgent):
+    """Clinical Critic stand-in that returns a configurable score sequence."""
+
+    def __init__(self, latency: float = 0.0, scores: List[float] = None):
+        super().__init__(name="Fake_Clinical_Critic", role="Benchmark critic", temperature=0.0)
+        self.latency = latency
+        self.scores = scores or [8.0]
+        self.started = 0
+        self.completed = 0
+
+    def get_system_prompt(self) -> str:
+        return ""
+
+    def _respond(self, state: Any) -> AgentResponse:
+        self.completed += 1
+        index = min(len(state.critic_feedbacks), len(self.scores) - 1)
+        score = self.scores[index]
+        recommendation = "APPROVE" if score >= 8.0 else "REQUEST_MINOR_REVISIONS"
+        return self._create_response(
+            content=f"Overall Quality Score: {score}/10",
+            reasoning="Fake clinical review",
+            confidence=0.9,
+            flags=[] if score >= 8.0 else [f"QUALITY_REVISION_NEEDED: {recommendation}"],
+            metadata={
+                "overall_score": score,
+                "empathy_score": 0.8,
+                "recommendation": recommendation,
+                "individual_scores": {},
+                "iteration": state.iteration_count
+            }
+        )
+
+    def process(self, state: Any) -> AgentResponse:
+        self.started += 1
+        time.sleep(self.latency)
+        return self._respond(state)
+
+    async def aprocess(self, state: Any) -> AgentResponse:
+        self.started += 1
+        await asyncio.sleep(self.latency)
+        return self._respond(state)
+
+
+def install_fake_agents(
+    latency: float = 0.0,
+    critic_scores: List[float] = None,
+    safety_ratings: List[str] = None
+):
+    """
+    Replace the node-level agent singletons with fakes.
+
+    Args:
+        latency: Simulated LLM latency per agent call (seconds)
+        critic_scores: Scores returned by successive critic reviews
+        safety_ratings: Ratings returned by successive safety reviews
+    """
+    from graph import nodes
+
+    nodes._drafter = FakeDrafter(latency)
+    nodes._safety_guardian = FakeSafetyGuardian(latency, safety_ratings)
+    nodes._clinical_critic = FakeClinicalCritic(latency, critic_scores)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize a list of timings in seconds."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean": statistics.mean(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "max": ordered[-1],
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]], unit: str = "s"):
+    """Print benchmark results as a small aligned table."""
+    print(f"\n{title}")
+    print("-" * len(title))
+    for label, stats in rows.items():
+        parts = [
+            f"{key}={value:.4f}{unit}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in stats.items()
+        ]
+        print(f"  {label:<28} " + "  ".join(parts))
+
+
+async def time_async(func: Callable, runs: int) -> List[float]:
+    """Time an async callable over several runs."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+    return samples
@@ -0,0 +1,229 @@
+"""
+Offline bulk protocol generation.
+
+Streams intents from a JSONL file and runs the compiled graph in-process
+(no HTTP layer) with a bounded number of protocols in flight, appending
+one result line per protocol to an output JSONL file as it finishes.
+
+Every item runs on a thread id derived from the run id and the item id,
+so the checkpointer records each item's progress. Re-running the same
+command after an interruption skips items already in the output, writes
+out items that finished but were not written, continues interrupted
+items from their last checkpoint and only generates the rest.
+
+Input lines are JSON objects with "user_intent" and optional "id",
+"max_iterations", "source" ("mcp" finalizes without human review, the
+default) and "full_critic_reviews"; a bare JSON string is an intent.
+
+Usage:
+    python bulk_generate.py intents.jsonl protocols.jsonl [--concurrency N] [--run-id NAME]
+    python main.py bulk intents.jsonl protocols.jsonl ...
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from config import settings
+from database import init_async_checkpointer, close_async_checkpointer
+from graph.registry import get_compiled_workflow
+from state.protocol_state import ProtocolState
+from state.schemas import BatchItemResult
+from utils.logger import logger
+
+
+async def read_items(path: Path) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield input items one line at a time (blank lines are skipped).
+    
+    Items without an "id" get their 1-based line number.
+    """
+    with path.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"user_intent": item}
+            item.setdefault("id", str(line_number))
+            item["line"] = line_number
+            yield item
+
+
+def completed_ids(path: Path) -> Set[str]:
+    """Ids already written to the output as completed."""
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by the interruption
+                continue
+            if record.get("status") == "completed":
+                done.add(str(record["id"]))
+    return done
+
+
+class BulkRun:
+    """One bulk generation run over an input file."""
+    
+    def __init__(self, input_path: Path, output_path: Path, run_id: str, concurrency: int):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.run_id = run_id
+        self.concurrency = concurrency
+        self.checkpointer = None
+        self.stats = {"generated": 0, "resumed": 0, "recovered": 0, "skipped": 0, "failed": 0}
+    
+    def thread_id(self, item: Dict[str, Any]) -> str:
+        """Stable thread id of an item, so a re-run finds its checkpoints."""
+        return f"bulk:{self.run_id}:{item['id']}"
+    
+    async def run_item(self, item: Dict[str, Any]) -> BatchItemResult:
+        """
+        Bring one item's thread to its end, continuing from any checkpoint.
+        
+        Args:
+            item: Parsed input line
+            
+        Returns:
+            Result record for the output file
+        """
+        start = time.perf_counter()
+        thread_id = self.thread_id(item)
+        source = item.get("source", "mcp")
+        result = BatchItemResult(
+            index=item["line"], thread_id=thread_id, user_intent=item["user_intent"], status="completed"
+        )
+        config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+        
+        try:
+            compiled_workflow = get_compiled_workflow(self.checkpointer, source)
+            snapshot = await compiled_workflow.aget_state(config)
+            
+            if snapshot.values and not snapshot.next:
+                # Finished before the interruption, but not written out
+                self.stats["recovered"] += 1
+                values = snapshot.values
+            elif snapshot.values:
+                self.stats["resumed"] += 1
+                values = await compiled_workflow.ainvoke(None, config)
+            else:
+                self.stats["generated"] += 1
+                initial_state = ProtocolState(
+                    thread_id=thread_id,
+                    user_intent=item["user_intent"],
+                    max_iterations=item.get("max_iterations") or settings.max_agent_iterations,
+                    source=source,
+                    full_critic_reviews=item.get("full_critic_reviews", False)
+                )
+                values = await compiled_workflow.ainvoke(initial_state, config)
+            
+            final_state = ProtocolState(**values) if isinstance(values, dict) else values
+            result.approval_status = getattr(final_state.approval_status, "value", final_state.approval_status)
+            result.iteration_count = final_state.iteration_count
+            result.draft = final_state.final_approved_draft or final_state.current_draft
+        
+        except Exception as e:
+            logger.error(f"Bulk item {item['id']} ({thread_id}) failed: {str(e)}")
+            self.stats["failed"] += 1
+            result.status, result.error = "failed", str(e)
+        
+        result.elapsed_seconds = round(time.perf_counter() - start, 3)
+        return result
+    
+    async def run(self) -> Dict[str, int]:
+        """
+        Process the whole input file.
+        
+        Returns:
+            Counts of generated, resumed, recovered, skipped and failed items
+        """
+        done = completed_ids(self.output_path)
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        
+        self.checkpointer = await init_async_checkpointer()
+        
+        with self.output_path.open("a", encoding="utf-8") as output:
+            
+            async def worker():
+                while True:
+                    item = await pending.get()
+                    if item is None:
+                        return
+                    result = await self.run_item(item)
+                    # Written (and flushed) as each item finishes
+                    output.write(json.dumps({"id": item["id"], **result.model_dump()}) + "\n")
+                    output.flush()
+                    print(f"[bulk] {item['id']}: {result.status} ({result.approval_status})", file=sys.stderr)
+            
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            try:
+                async for item in read_items(self.input_path):
+                    if str(item["id"]) in done:
+                        self.stats["skipped"] += 1
+                        continue
+                    await pending.put(item)
+                for _ in workers:
+                    await pending.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+        
+        return self.stats
+
+
+async def run_bulk(
+    input_path: str,
+    output_path: str,
+    concurrency: Optional[int] = None,
+    run_id: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Generate a protocol for every intent in a JSONL file.
+    
+    Args:
+        input_path: Input JSONL file
+        output_path: Output JSONL file (appended to)
+        concurrency: Protocols in flight at once (default: batch_default_parallelism)
+        run_id: Names the run's threads (default: the input file name)
+        
+    Returns:
+        Item counts
+    """
+    source = Path(input_path)
+    bulk = BulkRun(
+        input_path=source,
+        output_path=Path(output_path),
+        run_id=run_id or source.stem,
+        concurrency=concurrency or settings.batch_default_parallelism
+    )
+    try:
+        return await bulk.run()
+    finally:
+        await close_async_checkpointer()
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI entry point: parse arguments and run the bulk generation."""
+    parser = argparse.ArgumentParser(description="Generate CBT protocols in bulk from a JSONL file of intents.")
+    parser.add_argument("input", help="Input JSONL file of intents")
+    parser.add_argument("output", help="Output JSONL file of results (appended to)")
+    parser.add_argument("--concurrency", type=int, default=None, help="Protocols generated at once")
+    parser.add_argument("--run-id", default=None, help="Name for the run's threads (default: input file name)")
+    args = parser.parse_args(argv)
+    
+    stats = asyncio.run(run_bulk(args.input, args.output, args.concurrency, args.run_id))
+    print(f"[bulk] done: {json.dumps(stats)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
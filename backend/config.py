@@ -4,7 +4,7 @@ Loads environment variables and provides typed configuration objects.
 """
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -22,16 +22,82 @@ class Settings(BaseSettings):
     primary_llm_provider: Literal["openai", "anthropic"] = "openai"
     openai_model: str = "gpt-4-turbo-preview"
     anthropic_model: str = "claude-3-5-sonnet-20241022"
+    # Transient provider errors (429/5xx/timeouts) are retried with jittered
+    # exponential backoff; Retry-After hints take precedence
+    llm_request_timeout: float = 120.0
+    llm_max_retries: int = 6
+    llm_retry_initial_wait: float = 1.0
+    llm_retry_max_wait: float = 60.0
+    # Per-provider circuit breaker: open after N consecutive transient
+    # failures, allow a trial call after the reset timeout
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_timeout: float = 30.0
+    # Request scheduler: concurrent calls per provider (adapted between the
+    # min and max from 429s and rate-limit headers), per-agent caps so one
+    # slow agent cannot take every provider slot, and a tokens-per-minute
+    # budget (0 = only what the provider's headers report)
+    llm_provider_max_concurrency: int = 16
+    llm_provider_min_concurrency: int = 1
+    llm_agent_max_concurrency: Dict[str, int] = {
+        "CBT_Drafter": 8,
+        "Safety_Guardian": 8,
+        "Clinical_Critic": 8
+    }
+    llm_tokens_per_minute: int = 0
+    # Response cache for repeatable calls, opted into per agent name. An
+    # in-memory LRU in front of a SQLite file ("" = memory only)
+    llm_cache_enabled: bool = True
+    llm_cache_agents: List[str] = ["Safety_Guardian", "Clinical_Critic"]
+    llm_cache_path: str = "./llm_cache.db"
+    llm_cache_ttl: float = 86400.0
+    llm_cache_max_memory_entries: int = 512
+    llm_cache_max_disk_entries: int = 10000
     
     # Database
     database_type: Literal["sqlite", "postgresql"] = "sqlite"
     database_url: str = "sqlite:///./cerina_protocol.db"
+    # Connection pool bounds for the shared async PostgreSQL checkpointer
+    database_pool_min_size: int = 2
+    database_pool_max_size: int = 20
     
     # Application
     app_env: str = "development"
     log_level: str = "INFO"
     max_agent_iterations: int = 5
     enable_debug_logging: bool = True
+    # Threads available to the remaining synchronous graph nodes and
+    # blocking helpers (LLM calls are awaited on the event loop).
+    graph_executor_max_workers: int = 32
+    # Finalized protocols are reused for requests with the same normalized
+    # intent (and prompt version) until the TTL expires
+    protocol_cache_enabled: bool = True
+    protocol_cache_ttl: float = 7 * 24 * 3600.0
+    protocol_cache_max_entries: int = 256
+    # Generation job queue: /api/generate enqueues and returns the thread_id
+    # while a pool of workers runs the graph. Jobs persist in a SQLite file
+    # so queued work survives a restart; new jobs get 503 + Retry-After when
+    # this many are queued or the estimated wait (seconds) is over the limit
+    job_queue_enabled: bool = True
+    job_queue_path: str = "./job_queue.db"
+    job_queue_workers: int = 4
+    job_queue_max_depth: int = 100
+    job_queue_max_wait: float = 900.0
+    job_queue_default_run_seconds: float = 90.0
+    job_queue_max_attempts: int = 3
+    job_queue_retention: float = 7 * 24 * 3600.0
+    # Scheduling classes: sources map to a class, classes share the workers
+    # by weight (weighted fair queueing, round-robin between API keys within
+    # a class) and each may hold at most its share of the workers. A job
+    # queued longer than the aging limit (seconds) is run next regardless
+    job_queue_source_classes: Dict[str, str] = {"web": "interactive", "mcp": "automation"}
+    job_queue_class_weights: Dict[str, float] = {"interactive": 4.0, "automation": 2.0, "batch": 1.0}
+    job_queue_class_shares: Dict[str, float] = {"interactive": 1.0, "automation": 0.75, "batch": 0.5}
+    job_queue_aging_seconds: float = 300.0
+    # /api/generate/batch: items per request and protocols generated at
+    # once per batch (each batch item also goes through the job queue)
+    batch_max_items: int = 200
+    batch_default_parallelism: int = 4
+    batch_max_parallelism: int = 16
     
     # API
     api_host: str = "0.0.0.0"
@@ -43,6 +109,66 @@ class Settings(BaseSettings):
     safety_temperature: float = 0.2
     critic_temperature: float = 0.5
     supervisor_temperature: float = 0.3
+    # Intent triage before drafting: crisis and medication-advice intents get
+    # a fixed pre-approved response. Local rules decide clear cases;
+    # triage_model (a small model, e.g. "gpt-4o-mini") decides ambiguous
+    # ones when set, otherwise they proceed to drafting
+    triage_enabled: bool = True
+    triage_model: Optional[str] = None
+    # Review routing: "safety_first" runs the Clinical Critic only on drafts
+    # the Safety Guardian did not block; "parallel" runs both at once;
+    # "speculative" starts both and cancels the critic if safety blocks
+    review_policy: Literal["safety_first", "parallel", "speculative"] = "safety_first"
+    # Safety results that send a draft straight back to the drafter:
+    # "unsafe_rating", "high_severity", "needs_revision_rating"
+    review_short_circuit_rules: List[str] = ["unsafe_rating", "high_severity"]
+    # Diminishing-returns stopping: halt for human review instead of revising
+    # again once the critic score gained less than plateau_min_gain over the
+    # last plateau_window reviews, or successive drafts are at least
+    # convergence_similarity alike (word-set Jaccard)
+    early_stopping_enabled: bool = True
+    plateau_window: int = 3
+    plateau_min_gain: float = 0.3
+    convergence_similarity: float = 0.95
+    # Revisions rewrite only the sections the feedback on the current draft
+    # points at and patch them in, unless that is more than
+    # drafter_patch_max_fraction of the sections (then a full rewrite)
+    drafter_patch_revisions: bool = True
+    drafter_patch_max_fraction: float = 0.5
+    # Clinical Critic re-reviews of a revision get the previous scores and a
+    # diff instead of the whole draft, and re-score only the criteria the
+    # changes affect. Every critic_full_review_interval-th review, a diff
+    # over critic_diff_max_fraction of the draft, reviewer feedback or a
+    # request's full_critic_reviews make it a full review
+    critic_incremental_review: bool = True
+    critic_full_review_interval: int = 3
+    critic_diff_max_fraction: float = 0.5
+    # Revision feedback context: items at least feedback_dedup_similarity
+    # alike (word-set Jaccard) are merged, and the highest-ranked ones are
+    # kept within feedback_context_max_tokens
+    feedback_context_max_tokens: int = 600
+    feedback_dedup_similarity: float = 0.75
+    # System prompt variant: "auto" sends the full prompt on an agent's
+    # first pass and the compact one on revision passes
+    prompt_variant: Literal["auto", "full", "compact"] = "auto"
+    # Safety Guardian re-reviews only sections whose content changed since
+    # their last verdict (False = whole draft every time)
+    safety_section_review: bool = True
+    safety_section_cache_size: int = 1024
+    # Deterministic risk lexicon scanned before the Safety Guardian's LLM
+    # call; HIGH-severity hits send the draft straight back for revision.
+    # safety_lexicon_path points at a JSON file extending the defaults
+    safety_lexicon_enabled: bool = True
+    safety_lexicon_short_circuit: bool = True
+    safety_lexicon_path: Optional[str] = None
+    
+    # Streaming
+    # Minimum seconds between UI events on the SSE stream. None = 1.0s in
+    # development (so agent activity stays readable) and 0 (off) elsewhere.
+    stream_pacing_interval: Optional[float] = None
+    # Drafter tokens are batched into draft_delta events at most this often
+    # (seconds); 0 sends every chunk as it arrives
+    draft_stream_flush_interval: float = 0.1
     
     # MCP Server
     mcp_server_name: str = "cerina-foundry"
@@ -58,6 +184,13 @@ class Settings(BaseSettings):
     def is_production(self) -> bool:
         """Check if running in production mode."""
         return self.app_env == "production"
+    
+    @property
+    def effective_stream_pacing_interval(self) -> float:
+        """Resolve the UI event pacing interval for the current environment."""
+        if self.stream_pacing_interval is not None:
+            return max(0.0, self.stream_pacing_interval)
+        return 1.0 if self.is_development else 0.0
 
 
 # Global settings instance
@@ -4,15 +4,14 @@ Supports both SQLite (development) and PostgreSQL (production).
 Handles both sync and async operations.
 """
 
+import asyncio
 import sqlite3
 import aiosqlite
 from contextlib import contextmanager, asynccontextmanager
-from typing import Generator, Union, AsyncGenerator
+from typing import TYPE_CHECKING, Generator, Union, AsyncGenerator, Optional, Any
 
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-from langgraph.checkpoint.postgres import PostgresSaver
-from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
@@ -20,6 +19,9 @@ from sqlalchemy.orm import sessionmaker, Session
 from config import settings
 from utils.logger import logger
 
+if TYPE_CHECKING:
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
 
 # SQLAlchemy setup
 engine = create_engine(
@@ -36,6 +38,12 @@ metadata = MetaData()
 # Global checkpointer instances
 _sync_checkpointer = None
 
+# Long-lived async checkpointer shared by all requests, plus the
+# connection (SQLite) or pool (PostgreSQL) that backs it
+_async_checkpointer: Optional[Union[AsyncSqliteSaver, "AsyncPostgresSaver"]] = None
+_async_resource: Optional[Any] = None
+_async_init_lock = asyncio.Lock()
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency for FastAPI to get database session."""
@@ -46,6 +54,11 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def _sqlite_path() -> str:
+    """File path of the SQLite database from the configured URL."""
+    return settings.database_url.replace("sqlite:///./", "")
+
+
 def get_checkpointer():
     """
     Get the synchronous LangGraph checkpointer based on database type.
@@ -62,10 +75,7 @@ def get_checkpointer():
         logger.info(f"Initializing SQLite checkpointer: {settings.database_url}")
         
         # Create connection for checkpointer
-        conn = sqlite3.connect(
-            settings.database_url.replace("sqlite:///./", ""),
-            check_same_thread=False
-        )
+        conn = sqlite3.connect(_sqlite_path(), check_same_thread=False)
         
         _sync_checkpointer = SqliteSaver(conn)
         logger.info("SQLite checkpointer initialized successfully")
@@ -74,6 +84,9 @@ def get_checkpointer():
     elif settings.database_type == "postgresql":
         logger.info(f"Initializing PostgreSQL checkpointer: {settings.database_url}")
         
+        # Loads psycopg, so only imported for PostgreSQL deployments
+        from langgraph.checkpoint.postgres import PostgresSaver
+        
         # PostgreSQL connection string
         _sync_checkpointer = PostgresSaver.from_conn_string(settings.database_url)
         logger.info("PostgreSQL checkpointer initialized successfully")
@@ -83,60 +96,112 @@ def get_checkpointer():
         raise ValueError(f"Unsupported database type: {settings.database_type}")
 
 
+async def init_async_checkpointer() -> Union[AsyncSqliteSaver, "AsyncPostgresSaver"]:
+    """
+    Create the shared async checkpointer (idempotent).
+    
+    Called once from the application lifespan. SQLite uses a single
+    aiosqlite connection in WAL mode (the saver serializes its own writes);
+    PostgreSQL uses a connection pool so concurrent threads check out
+    separate connections. Checkpoint tables are set up here, not per request.
+    
+    Returns:
+        AsyncSqliteSaver or AsyncPostgresSaver: Shared async checkpointer
+    """
+    global _async_checkpointer, _async_resource
+    
+    async with _async_init_lock:
+        if _async_checkpointer is not None:
+            return _async_checkpointer
+        
+        if settings.database_type == "sqlite":
+            logger.info(f"Opening shared async SQLite checkpointer: {settings.database_url}")
+            
+            conn = await aiosqlite.connect(_sqlite_path())
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            checkpointer = AsyncSqliteSaver(conn)
+            resource = conn
+        
+        elif settings.database_type == "postgresql":
+            logger.info("Opening shared async PostgreSQL checkpointer pool")
+            
+            # Only needed (and installed) for PostgreSQL deployments
+            from psycopg.rows import dict_row
+            from psycopg_pool import AsyncConnectionPool
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            
+            pool = AsyncConnectionPool(
+                conninfo=settings.database_url,
+                min_size=settings.database_pool_min_size,
+                max_size=settings.database_pool_max_size,
+                kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+                open=False
+            )
+            await pool.open(wait=True)
+            checkpointer = AsyncPostgresSaver(pool)
+            resource = pool
+        
+        else:
+            raise ValueError(f"Unsupported database type: {settings.database_type}")
+        
+        try:
+            await checkpointer.setup()
+        except Exception:
+            await resource.close()
+            raise
+        
+        _async_checkpointer, _async_resource = checkpointer, resource
+        logger.info("Shared async checkpointer ready")
+        return _async_checkpointer
+
+
+async def close_async_checkpointer():
+    """Close the shared async checkpointer and its connection or pool."""
+    global _async_checkpointer, _async_resource
+    
+    async with _async_init_lock:
+        if _async_resource is None:
+            return
+        
+        try:
+            await _async_resource.close()
+            logger.info("Shared async checkpointer closed")
+        finally:
+            _async_checkpointer, _async_resource = None, None
+
+
+async def get_shared_async_checkpointer() -> Union[AsyncSqliteSaver, "AsyncPostgresSaver"]:
+    """
+    FastAPI dependency returning the shared async checkpointer.
+    
+    Initializes it lazily when the application lifespan has not run
+    (e.g. scripts and benchmarks).
+    
+    Returns:
+        AsyncSqliteSaver or AsyncPostgresSaver: Shared async checkpointer
+    """
+    if _async_checkpointer is not None:
+        return _async_checkpointer
+    return await init_async_checkpointer()
+
+
 @asynccontextmanager
 async def get_async_checkpointer():
     """
     Get the asynchronous LangGraph checkpointer as a context manager.
     
-    Used for streaming and async operations.
+    Yields the shared checkpointer; leaving the context does not close it
+    (that happens once, in close_async_checkpointer at shutdown).
     
     Usage:
         async with get_async_checkpointer() as checkpointer:
             # use checkpointer
     
     Yields:
-        AsyncSqliteSaver or AsyncPostgresSaver: Configured async checkpointer instance
+        AsyncSqliteSaver or AsyncPostgresSaver: Shared async checkpointer instance
     """
-    if settings.database_type == "sqlite":
-        logger.info(f"Initializing Async SQLite checkpointer: {settings.database_url}")
-        
-        # Get database path
-        db_path = settings.database_url.replace("sqlite:///./", "")
-        
-        # Create async connection using aiosqlite
-        async with aiosqlite.connect(db_path) as conn:
-            # Create checkpointer with the connection
-            checkpointer = AsyncSqliteSaver(conn)
-            
-            # Setup tables
-            await checkpointer.setup()
-            
-            logger.info("Async SQLite checkpointer initialized successfully")
-            
-            try:
-                yield checkpointer
-            finally:
-                # Cleanup happens automatically when context exits
-                logger.info("Async SQLite checkpointer closed")
-    
-    elif settings.database_type == "postgresql":
-        logger.info(f"Initializing Async PostgreSQL checkpointer: {settings.database_url}")
-        
-        # Use the async context manager for PostgreSQL
-        async with AsyncPostgresSaver.from_conn_string(
-            settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
-        ) as checkpointer:
-            await checkpointer.setup()
-            
-            logger.info("Async PostgreSQL checkpointer initialized successfully")
-            
-            try:
-                yield checkpointer
-            finally:
-                logger.info("Async PostgreSQL checkpointer closed")
-    
-    else:
-        raise ValueError(f"Unsupported database type: {settings.database_type}")
+    yield await get_shared_async_checkpointer()
 
 
 def init_database():
@@ -6,10 +6,10 @@ the CBT protocol generation process.
 """
 
 from .workflow import create_protocol_workflow, compile_workflow_async
+from .registry import WorkflowRegistry, get_workflow_registry, get_compiled_workflow
 from .nodes import (
-    drafter_node,
-    safety_guardian_node,
-    clinical_critic_node,
+    adrafter_node,
+    areview_node,
     halt_node,
     finalize_node
 )
@@ -18,9 +18,11 @@ from .edges import supervisor_router, should_continue
 __all__ = [
     "create_protocol_workflow",
     "compile_workflow_async",
-    "drafter_node",
-    "safety_guardian_node",
-    "clinical_critic_node",
+    "WorkflowRegistry",
+    "get_workflow_registry",
+    "get_compiled_workflow",
+    "adrafter_node",
+    "areview_node",
     "halt_node",
     "finalize_node",
     "supervisor_router",
@@ -6,15 +6,18 @@ Edges determine routing between nodes based on state conditions.
 
 from typing import Literal
 from state.protocol_state import ProtocolState
-from agents import SupervisorAgent
 from utils.logger import logger
+from .nodes import get_supervisor
 
 
 def supervisor_router(
     state: ProtocolState
-) -> Literal["drafter", "safety_guardian", "clinical_critic", "halt", "finalize", "max_iterations"]:
+) -> Literal["drafter", "review", "halt", "finalize", "max_iterations"]:
     """
     Supervisor routing logic with MCP bypass support.
+    
+    The supervisor decision is made at the end of each agent node and
+    stored in state.next_action; this edge only maps it to the next node.
     """
     logger.info(f"[Supervisor Router] Evaluating routing (iteration {state.iteration_count})")
     
@@ -54,11 +57,9 @@ def supervisor_router(
         logger.info("[Supervisor Router] State is halted or finalized, routing to halt")
         return "halt"
     
-    # Get supervisor agent
-    supervisor = SupervisorAgent()
-    
-    # Make routing decision
-    decision = supervisor.decide_next_action(state)
+    # Read the stored decision (checkpoints written before next_action
+    # existed have none, so decide here in that case)
+    decision = state.next_action or get_supervisor().decide_next_action(state)
     
     # ✅ NEW: If bypass mode and supervisor wants to halt, finalize instead
     if state.bypass_halt and decision == "halt_for_human":
@@ -68,9 +69,11 @@ def supervisor_router(
     # Map decision to node name
     routing_map = {
         "run_drafter": "drafter",
-        "run_safety": "safety_guardian",
-        "run_critic": "clinical_critic",
+        "run_review": "review",
+        "run_safety": "review",
+        "run_critic": "review",
         "halt_for_human": "halt",
+        "finalize": "finalize",
         "max_iterations_reached": "max_iterations"
     }
     
@@ -152,7 +155,7 @@ def human_decision_router(
 
 def after_drafter_router(
     state: ProtocolState
-) -> Literal["supervisor", "error"]:
+) -> Literal["drafter", "review", "halt", "finalize", "max_iterations", "error"]:
     """
     Route after drafter node completes.
     
@@ -167,36 +170,15 @@ def after_drafter_router(
         logger.error("[After Drafter Router] Drafter error detected")
         return "error"
     
-    # Normal flow - go to supervisor for decision
-    return "supervisor"
-
-
-def after_safety_router(
-    state: ProtocolState
-) -> Literal["supervisor", "error"]:
-    """
-    Route after safety guardian node completes.
-    
-    Args:
-        state: Current protocol state
-        
-    Returns:
-        Next node
-    """
-    # Check for errors
-    if state.errors and state.errors[-1].get("agent") == "safety_guardian":
-        logger.error("[After Safety Router] Safety guardian error detected")
-        return "error"
-    
-    # Normal flow - go to supervisor for decision
-    return "supervisor"
+    # Normal flow - follow the supervisor decision
+    return supervisor_router(state)
 
 
-def after_critic_router(
+def after_review_router(
     state: ProtocolState
-) -> Literal["supervisor", "error"]:
+) -> Literal["drafter", "review", "halt", "finalize", "max_iterations", "error"]:
     """
-    Route after clinical critic node completes.
+    Route after the review node (Safety Guardian + Clinical Critic) completes.
     
     Args:
         state: Current protocol state
@@ -205,9 +187,9 @@ def after_critic_router(
         Next node
     """
     # Check for errors
-    if state.errors and state.errors[-1].get("agent") == "clinical_critic":
-        logger.error("[After Critic Router] Clinical critic error detected")
+    if state.errors and state.errors[-1].get("agent") in ("safety_guardian", "clinical_critic"):
+        logger.error("[After Review Router] Review error detected")
         return "error"
     
-    # Normal flow - go to supervisor for decision
-    return "supervisor"
+    # Normal flow - follow the supervisor decision
+    return supervisor_router(state)
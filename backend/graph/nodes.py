@@ -5,18 +5,23 @@ Each node represents a specific step in the protocol generation workflow,
 typically corresponding to an agent action.
 """
 
+import asyncio
 from typing import Dict, Any
 from datetime import datetime
-import time
+
+from langgraph.config import get_stream_writer
 
 from state.protocol_state import ProtocolState, AgentRole, SafetySeverity
 from agents import (
     CBTDrafterAgent,
     SafetyGuardianAgent,
     ClinicalCriticAgent,
-    SupervisorAgent
+    SupervisorAgent,
+    TriageAgent
 )
+from config import settings
 from utils.logger import logger
+from .pacing import DeltaThrottle
 
 
 # Initialize agents (singleton pattern)
@@ -24,6 +29,7 @@ _drafter = None
 _safety_guardian = None
 _clinical_critic = None
 _supervisor = None
+_triage = None
 
 
 def get_drafter() -> CBTDrafterAgent:
@@ -58,11 +64,156 @@ def get_supervisor() -> SupervisorAgent:
     return _supervisor
 
 
+def get_triage() -> TriageAgent:
+    """Get or create intent triage agent instance."""
+    global _triage
+    if _triage is None:
+        _triage = TriageAgent()
+    return _triage
+
+
+# Agent response handlers (shared by the sync and async node variants)
+
+def _apply_draft_response(state: ProtocolState, response) -> ProtocolState:
+    """Record a drafter response on the state and advance the iteration."""
+    # Update state with new draft
+    state.add_draft_version(
+        content=response.content,
+        agent=AgentRole.DRAFTER,
+        changes_summary=response.reasoning,
+        patches=response.metadata.get("patches")
+    )
+    state.metadata.record_input_tokens(response.metadata.get("prompt_variant"), response.metadata.get("prompt_tokens"))
+    
+    # Add drafter note to scratchpad
+    state.add_drafter_note(
+        note=response.reasoning,
+        word_count=response.metadata.get("word_count", 0),
+        has_structure=response.metadata.get("has_structure", False),
+        addressed_feedback=response.suggestions
+    )
+    
+    # Increment iteration
+    state.increment_iteration()
+    
+    logger.info(f"[Drafter Node] Draft generation completed (iteration {state.iteration_count})")
+    
+    return state
+
+
+def _draft_delta_throttle(state: ProtocolState) -> DeltaThrottle:
+    """
+    Batch drafter tokens into draft_delta events on the graph's custom stream.
+    
+    The writer is a no-op unless the caller streams with mode "custom".
+    """
+    writer = get_stream_writer()
+    iteration = state.iteration_count + 1
+    
+    return DeltaThrottle(
+        lambda text: writer({"type": "draft_delta", "iteration": iteration, "delta": text})
+    )
+
+
+def _apply_safety_response(state: ProtocolState, response) -> ProtocolState:
+    """Record a safety guardian response as flags and a safety check entry."""
+    # Parse and add safety flags
+    if response.flags:
+        for flag_text in response.flags:
+            # Parse severity from flag text
+            severity = SafetySeverity.MEDIUM  # Default
+            if "HIGH" in flag_text.upper():
+                severity = SafetySeverity.HIGH
+            elif "LOW" in flag_text.upper():
+                severity = SafetySeverity.LOW
+            
+            state.add_safety_flag(
+                severity=severity,
+                issue=flag_text,
+                recommendation=response.suggestions[0] if response.suggestions else "Review and revise",
+                confidence=response.confidence
+            )
+    
+    # Lexicon pre-screen hits carry their own severity and draft offsets
+    lexicon_matches = response.metadata.get("lexicon_matches", [])
+    for match in lexicon_matches:
+        state.add_safety_flag(
+            severity=SafetySeverity(match["severity"]),
+            issue=f"{match['description']}: \"{match['text']}\"",
+            recommendation=match["recommendation"],
+            confidence=match["confidence"],
+            category=match["category"],
+            span_start=match["start"],
+            span_end=match["end"]
+        )
+    
+    # Record safety check in scratchpad
+    state.scratchpad["safety_checks"].append({
+        "timestamp": datetime.now().isoformat(),
+        "iteration": state.iteration_count,
+        "agent": "safety_guardian",
+        "rating": response.metadata.get("safety_rating", "UNKNOWN"),
+        "flags_count": len(response.flags) + len(lexicon_matches),
+        "lexicon_matches": len(lexicon_matches),
+        "short_circuited": response.metadata.get("short_circuited", False),
+        "confidence": response.confidence,
+        "prompt_tokens": response.metadata.get("prompt_tokens"),
+        "full_prompt_tokens": response.metadata.get("full_prompt_tokens")
+    })
+    state.metadata.record_input_tokens(response.metadata.get("prompt_variant"), response.metadata.get("prompt_tokens"))
+    
+    logger.info(f"[Safety Guardian Node] Safety validation completed - {len(response.flags) + len(lexicon_matches)} flags found")
+    
+    return state
+
+
+def _apply_critic_response(state: ProtocolState, response) -> ProtocolState:
+    """Record a clinical critic response as structured feedback."""
+    # Extract scores from metadata
+    metadata = response.metadata
+    
+    # Add critic feedback to state
+    state.add_critic_feedback(
+        overall_score=metadata.get("overall_score", 0.0),
+        empathy_score=metadata.get("empathy_score", 0.0),
+        individual_scores=metadata.get("individual_scores", {}),
+        strengths=response.suggestions[:3] if response.suggestions else [],  # First 3 as strengths
+        improvements=metadata.get("improvements", []) + (response.flags or []),
+        recommendation=metadata.get("recommendation", "REVIEW"),
+        feedback=response.content,
+        confidence=response.confidence,
+        review_scope=metadata.get("review_scope", "full"),
+        draft_version=len(state.draft_versions) or None,
+        carried_forward=metadata.get("carried_forward")
+    )
+    state.metadata.record_input_tokens(metadata.get("prompt_variant"), metadata.get("prompt_tokens"))
+    
+    logger.info(f"[Clinical Critic Node] Quality review completed - Score: {metadata.get('overall_score', 0)}/10")
+    
+    return state
+
+
+def _decide_next_action(state: ProtocolState) -> ProtocolState:
+    """
+    Run the supervisor's routing decision and store it on the state.
+    
+    Called at the end of every agent node so the decision is computed once
+    per step and persisted in the same checkpoint as the agent's output;
+    the routing edge only reads it back.
+    """
+    state.refresh_metadata()
+    state.next_action = get_supervisor().decide_next_action(state)
+    
+    logger.info(f"[Supervisor] Decision: {state.next_action}")
+    
+    return state
+
+
 # Node Implementations
 
-def drafter_node(state: ProtocolState) -> ProtocolState:
+async def adrafter_node(state: ProtocolState) -> ProtocolState:
     """
-    Drafter node - generates or revises CBT protocol content.
+    Async drafter node - awaits the LLM on the event loop instead of a worker thread.
     
     Args:
         state: Current protocol state
@@ -70,44 +221,19 @@ def drafter_node(state: ProtocolState) -> ProtocolState:
     Returns:
         Updated state with new draft
     """
-    time.sleep(1.0)
-
     logger.info(f"[Drafter Node] Starting draft generation (iteration {state.iteration_count})")
 
     # Set current agent at the start
     state.current_agent = 'drafter'
     
     try:
-        # Get drafter agent
-        drafter = get_drafter()
-        
-        # Process current state
-        response = drafter.process(state)
-        
-        # Update state with new draft
-        state.add_draft_version(
-            content=response.content,
-            agent=AgentRole.DRAFTER,
-            changes_summary=response.reasoning
-        )
-        
-        # Add drafter note to scratchpad
-        state.add_drafter_note(
-            note=response.reasoning,
-            word_count=response.metadata.get("word_count", 0),
-            has_structure=response.metadata.get("has_structure", False),
-            addressed_feedback=response.suggestions
-        )
-        
-        # Increment iteration
-        state.increment_iteration()
-        
-        logger.info(f"[Drafter Node] Draft generation completed (iteration {state.iteration_count})")
-
-        # ⭐ Delay to allow frontend to see update
-        time.sleep(1.0)
-        
-        return state
+        # Tokens reach the stream as they arrive; the full draft is still
+        # only written to state (and checkpointed) once complete
+        throttle = _draft_delta_throttle(state)
+        response = await get_drafter().aprocess(state, on_delta=throttle.add)
+        throttle.flush()
+        _apply_draft_response(state, response)
+        return _decide_next_action(state)
         
     except Exception as e:
         logger.error(f"[Drafter Node] Error: {str(e)}")
@@ -116,166 +242,105 @@ def drafter_node(state: ProtocolState) -> ProtocolState:
         raise
 
 
-def safety_guardian_node(state: ProtocolState) -> ProtocolState:
+# Agents run by the review node, in the order their results are applied
+REVIEW_AGENTS = ("safety_guardian", "clinical_critic")
+
+
+async def areview_node(state: ProtocolState) -> ProtocolState:
     """
-    Safety Guardian node - validates draft for safety concerns.
+    Review node - runs the Safety Guardian and Clinical Critic concurrently.
+    
+    Both reviewers only read the draft, so their LLM calls are awaited
+    together; results are applied in a fixed order and the next action is
+    decided once, so the whole review is a single superstep and checkpoint.
+    Under the default safety_first policy the supervisor asks for one
+    review at a time instead (see settings.review_policy).
     
     Args:
         state: Current protocol state
         
     Returns:
-        Updated state with safety assessment
+        Updated state with safety and quality assessments
     """
-    time.sleep(1.0)
-
-    logger.info(f"[Safety Guardian Node] Starting safety validation (iteration {state.iteration_count})")
-
-    # Set current agent at the start
-    state.current_agent = 'safety_guardian'
+    logger.info(f"[Review Node] Starting draft review (iteration {state.iteration_count})")
     
-    try:
-        # Get safety guardian agent
-        safety_guardian = get_safety_guardian()
-        
-        # Process current state
-        response = safety_guardian.process(state)
-        
-        # Parse and add safety flags
-        if response.flags:
-            for flag_text in response.flags:
-                # Parse severity from flag text
-                severity = SafetySeverity.MEDIUM  # Default
-                if "HIGH" in flag_text.upper():
-                    severity = SafetySeverity.HIGH
-                elif "LOW" in flag_text.upper():
-                    severity = SafetySeverity.LOW
-                
-                state.add_safety_flag(
-                    severity=severity,
-                    issue=flag_text,
-                    recommendation=response.suggestions[0] if response.suggestions else "Review and revise",
-                    confidence=response.confidence
-                )
-        
-        # Record safety check in scratchpad
-        state.scratchpad["safety_checks"].append({
-            "timestamp": datetime.now().isoformat(),
-            "iteration": state.iteration_count,
-            "agent": "safety_guardian",
-            "rating": response.metadata.get("safety_rating", "UNKNOWN"),
-            "flags_count": len(response.flags),
-            "confidence": response.confidence
-        })
-        
-        logger.info(f"[Safety Guardian Node] Safety validation completed - {len(response.flags)} flags found")
-        
-        # ⭐ Delay to allow frontend to see update
-        time.sleep(1.0)
-        
-        return state
-        
-    except Exception as e:
-        logger.error(f"[Safety Guardian Node] Error: {str(e)}")
+    # Run only the reviews the stored decision asked for
+    action = state.next_action or "run_review"
+    if action == "run_review" and settings.review_policy == "speculative":
+        return await _aspeculative_review(state)
+    
+    reviews = []
+    if action in ("run_review", "run_safety"):
+        reviews.append(("safety_guardian", get_safety_guardian(), _apply_safety_response, "safety_error"))
+    if action in ("run_review", "run_critic"):
+        reviews.append(("clinical_critic", get_clinical_critic(), _apply_critic_response, "critic_error"))
+    
+    results = await asyncio.gather(
+        *(agent.aprocess(state) for _, agent, _, _ in reviews),
+        return_exceptions=True
+    )
+    
+    failures = []
+    state.reviewed_by = []
+    for (name, _, apply_response, error_type), result in zip(reviews, results):
+        if isinstance(result, Exception):
+            logger.error(f"[Review Node] {name} error: {str(result)}")
+            state.add_error(error_type, str(result), name)
+            failures.append(result)
+            continue
+        
+        state.current_agent = name
+        apply_response(state, result)
+        state.reviewed_by.append(name)
+    
+    if failures:
         state.current_agent = None
-        state.add_error("safety_error", str(e), "safety_guardian")
-        raise
+        raise failures[0]
+    
+    return _decide_next_action(state)
 
 
-def clinical_critic_node(state: ProtocolState) -> ProtocolState:
+async def _aspeculative_review(state: ProtocolState) -> ProtocolState:
     """
-    Clinical Critic node - evaluates draft quality and empathy.
+    Start both reviews, but cancel the critic if safety blocks the draft.
     
-    Args:
-        state: Current protocol state
-        
-    Returns:
-        Updated state with quality assessment
+    Keeps the latency of a parallel review for drafts that pass, while a
+    blocked draft stops paying for the critic as soon as safety returns.
     """
-    time.sleep(1.0)
-
-    logger.info(f"[Clinical Critic Node] Starting quality review (iteration {state.iteration_count})")
+    critic_task = asyncio.create_task(get_clinical_critic().aprocess(state))
     
-    # Set current agent at the start
-    state.current_agent = 'clinical_critic'
-
     try:
-        # Get clinical critic agent
-        critic = get_clinical_critic()
-        
-        # Process current state
-        response = critic.process(state)
-        
-        # Extract scores from metadata
-        metadata = response.metadata
-        
-        # Add critic feedback to state
-        state.add_critic_feedback(
-            overall_score=metadata.get("overall_score", 0.0),
-            empathy_score=metadata.get("empathy_score", 0.0),
-            individual_scores=metadata.get("individual_scores", {}),
-            strengths=response.suggestions[:3] if response.suggestions else [],  # First 3 as strengths
-            improvements=response.flags if response.flags else [],
-            recommendation=metadata.get("recommendation", "REVIEW"),
-            feedback=response.content,
-            confidence=response.confidence
-        )
-        
-        logger.info(f"[Clinical Critic Node] Quality review completed - Score: {metadata.get('overall_score', 0)}/10")
-        
-        # ⭐ Delay to allow frontend to see update
-        time.sleep(1.0)
-        
-        return state
-        
+        safety_response = await get_safety_guardian().aprocess(state)
     except Exception as e:
-        logger.error(f"[Clinical Critic Node] Error: {str(e)}")
+        critic_task.cancel()
+        logger.error(f"[Review Node] safety_guardian error: {str(e)}")
+        state.add_error("safety_error", str(e), "safety_guardian")
         state.current_agent = None
-        state.add_error("critic_error", str(e), "clinical_critic")
         raise
-
-
-def supervisor_node(state: ProtocolState) -> ProtocolState:
-    """
-    Supervisor node - makes routing decisions.
-    
-    This node determines the next step in the workflow based on
-    current state and agent outputs.
     
-    Args:
-        state: Current protocol state
-        
-    Returns:
-        Updated state with supervisor decision
-    """
-    time.sleep(1.0)
-
-    logger.info(f"[Supervisor Node] Evaluating workflow (iteration {state.iteration_count})")
+    state.current_agent = "safety_guardian"
+    _apply_safety_response(state, safety_response)
+    state.reviewed_by = ["safety_guardian"]
     
-    # Set current agent at the start
-    state.current_agent = 'supervisor'
+    block_rule = get_supervisor().safety_block_reason(state)
+    if block_rule:
+        critic_task.cancel()
+        logger.info(f"[Review Node] Safety blocked the draft ({block_rule}) - cancelled the critic review")
+        return _decide_next_action(state)
     
     try:
-        # Get supervisor agent
-        supervisor = get_supervisor()
-        
-        # Get next action decision
-        next_action = supervisor.decide_next_action(state)
-        
-        logger.info(f"[Supervisor Node] Decision: {next_action}")
-        
-        # The actual routing happens in the conditional edge
-        # This node just records the decision
-        
-        # ⭐ Delay to allow frontend to see update
-        time.sleep(1.0)
-        
-        return state
-        
+        critic_response = await critic_task
     except Exception as e:
-        logger.error(f"[Supervisor Node] Error: {str(e)}")
+        logger.error(f"[Review Node] clinical_critic error: {str(e)}")
+        state.add_error("critic_error", str(e), "clinical_critic")
         state.current_agent = None
-        state.add_error("supervisor_error", str(e), "supervisor")
         raise
+    
+    state.current_agent = "clinical_critic"
+    _apply_critic_response(state, critic_response)
+    state.reviewed_by.append("clinical_critic")
+    
+    return _decide_next_action(state)
 
 
 def halt_node(state: ProtocolState) -> ProtocolState:
@@ -291,8 +356,6 @@ def halt_node(state: ProtocolState) -> ProtocolState:
     Returns:
         Updated state marked for human review
     """
-    time.sleep(1.0)
-
     logger.info(f"[Halt Node] Halting for human review (iteration {state.iteration_count})")
     
     # Set current agent
@@ -325,8 +388,6 @@ def finalize_node(state: ProtocolState) -> ProtocolState:
     Returns:
         Finalized state
     """
-    time.sleep(1.0)
-
     logger.info(f"[Finalize Node] Finalizing protocol (iteration {state.iteration_count})")
     
     # Set current agent
@@ -345,9 +406,6 @@ def finalize_node(state: ProtocolState) -> ProtocolState:
         logger.info(f"[Finalize Node] Final status: {state.approval_status}")
         logger.info(f"[Finalize Node] Total iterations: {state.iteration_count}")
         
-        # ⭐ Delay to allow frontend to see update
-        time.sleep(1.0)
-        
         return state
         
     except Exception as e:
@@ -367,8 +425,6 @@ def error_node(state: ProtocolState) -> ProtocolState:
     Returns:
         State with error information
     """
-    time.sleep(1.0)
-
     logger.error(f"[Error Node] Workflow entered error state")
     logger.error(f"[Error Node] Errors: {state.errors}")
     
@@ -379,9 +435,6 @@ def error_node(state: ProtocolState) -> ProtocolState:
     if not state.should_halt:
         state.halt_for_human_review()
     
-    # ⭐ Delay to allow frontend to see update
-    time.sleep(1.0)
-    
     return state
 
 
@@ -398,8 +451,6 @@ def max_iterations_node(state: ProtocolState) -> ProtocolState:
     Returns:
         State marked for human review
     """
-    time.sleep(1.0)
-
     logger.warning(f"[Max Iterations Node] Maximum iterations reached: {state.iteration_count}/{state.max_iterations}")
     
     # Set current agent
@@ -418,9 +469,6 @@ def max_iterations_node(state: ProtocolState) -> ProtocolState:
         
         logger.info(f"[Max Iterations Node] Halting for human review due to iteration limit")
         
-        # ⭐ Delay to allow frontend to see update
-        time.sleep(1.0)
-        
         return state
         
     except Exception as e:
@@ -442,14 +490,12 @@ def initialize_node(state: ProtocolState) -> ProtocolState:
     Returns:
         Initialized state
     """
-    time.sleep(1.0)
-
     logger.info(f"[Initialize Node] Starting new protocol generation")
     logger.info(f"[Initialize Node] Thread ID: {state.thread_id}")
     logger.info(f"[Initialize Node] User Intent: {state.user_intent}")
 
     # ⭐ DON'T SET current_agent - this is just initialization, not a real agent execution
-    # The supervisor node will set it when it actually runs
+    # The drafter node will set it when it actually runs
     
     # Record initial supervisor decision
     state.add_supervisor_decision(
@@ -458,5 +504,56 @@ def initialize_node(state: ProtocolState) -> ProtocolState:
         next_agent="drafter"
     )
     
-    # No delay needed for initialization
+    return _decide_next_action(state)
+
+
+async def atriage_node(state: ProtocolState) -> ProtocolState:
+    """
+    Triage node - screens the intent before any drafting.
+    
+    Crisis and medication-advice intents get a fixed, pre-approved response
+    as the draft and halt for review (MCP requests finalize it, as they do
+    verified drafts); everything else keeps the initial decision to run the
+    drafter. Runs once per thread: /resume re-enters the graph at
+    initialize, and a thread that was triaged or already has drafts is
+    passed through unchanged.
+    
+    Args:
+        state: Initialized protocol state
+        
+    Returns:
+        State unchanged, or holding the template and routed to halt
+    """
+    if not settings.triage_enabled or state.scratchpad.get("triage") or state.draft_versions:
+        return state
+    
+    response = await get_triage().aprocess(state)
+    route = response.metadata["route"]
+    
+    state.scratchpad.setdefault("triage", []).append({
+        "timestamp": datetime.now().isoformat(),
+        "iteration": state.iteration_count,
+        "agent": "triage",
+        "route": route,
+        "method": response.metadata["method"],
+        "matched": response.metadata["matched"]
+    })
+    
+    if route == "proceed":
+        return state
+    
+    logger.info(f"[Triage Node] Intent routed to the '{route}' template, skipping the draft loop")
+    
+    state.add_draft_version(
+        content=response.content,
+        agent=AgentRole.TRIAGE,
+        changes_summary=response.reasoning
+    )
+    state.next_action = "finalize" if getattr(state, "source", "web") == "mcp" else "halt_for_human"
+    state.add_supervisor_decision(
+        action="triage",
+        reason=response.reasoning,
+        next_agent="finalize" if state.next_action == "finalize" else "halt"
+    )
+    
     return state
@@ -0,0 +1,92 @@
+"""
+Event pacing for streamed workflow updates.
+
+Graph nodes run at full speed; when a UI needs time to render each agent
+step, the streaming layer spaces out the events it emits instead. Pacing
+only delays delivery to the client and never blocks a worker thread.
+Token deltas go the other way: they are batched, not delayed.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+from config import settings
+
+
+class EventPacer:
+    """
+    Enforces a minimum interval between consecutive streamed events.
+
+    Only the remainder of the interval is awaited, so time already spent
+    inside a node counts towards it. An interval of 0 disables pacing.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        """
+        Initialize the pacer.
+
+        Args:
+            interval: Minimum seconds between events (defaults to settings)
+        """
+        self.interval = settings.effective_stream_pacing_interval if interval is None else max(0.0, interval)
+        self._last_emit: Optional[float] = None
+        self.total_wait = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether this pacer introduces any delay."""
+        return self.interval > 0
+
+    async def wait(self):
+        """Wait until the next event may be emitted, then mark it as emitted."""
+        now = time.monotonic()
+
+        if self.enabled and self._last_emit is not None:
+            remaining = self.interval - (now - self._last_emit)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                self.total_wait += remaining
+                now = time.monotonic()
+
+        self._last_emit = now
+
+
+class DeltaThrottle:
+    """
+    Batches streamed text and flushes it at most once per interval.
+
+    Nothing is ever delayed beyond the next chunk: a batch is sent as soon
+    as a chunk arrives after the interval has passed, and flush() sends
+    whatever is left when the stream ends.
+    """
+
+    def __init__(self, emit: Callable[[str], None], interval: Optional[float] = None):
+        """
+        Initialize the throttle.
+
+        Args:
+            emit: Called with each batch of text
+            interval: Minimum seconds between batches (defaults to settings)
+        """
+        self.emit = emit
+        self.interval = settings.draft_stream_flush_interval if interval is None else max(0.0, interval)
+        self._buffer: list = []
+        self._last_emit: Optional[float] = None
+
+    def add(self, text: str):
+        """Buffer a chunk, flushing if the interval has elapsed."""
+        if not text:
+            return
+        self._buffer.append(text)
+
+        now = time.monotonic()
+        if self._last_emit is None or now - self._last_emit >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Emit any buffered text."""
+        if self._buffer:
+            self.emit("".join(self._buffer))
+            self._buffer.clear()
+            self._last_emit = time.monotonic()
@@ -0,0 +1,110 @@
+"""
+Registry of compiled workflow graphs.
+
+Building and compiling the StateGraph is pure CPU work that gives the same
+result for a given checkpointer and variant, so each combination is
+compiled once (normally at startup) and shared by every request.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from utils.logger import logger
+
+from .workflow import create_protocol_workflow, WorkflowVariant
+
+
+class WorkflowRegistry:
+    """
+    Caches compiled workflows keyed by (checkpointer, variant).
+    
+    Compiled LangGraph graphs are stateless between invocations (all
+    per-thread state lives in the checkpointer), so sharing one instance
+    across concurrent requests is safe.
+    """
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        # Values keep a reference to the checkpointer so its id() stays unique
+        self._graphs: Dict[Tuple[int, str], Tuple[BaseCheckpointSaver, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, checkpointer: Optional[BaseCheckpointSaver], variant: WorkflowVariant = "web") -> Any:
+        """
+        Get the compiled workflow, compiling it on first use.
+        
+        Args:
+            checkpointer: Checkpointer the graph persists to
+            variant: Workflow variant ("web" or "mcp")
+            
+        Returns:
+            Compiled workflow graph
+        """
+        key = (id(checkpointer), variant)
+        entry = self._graphs.get(key)
+        if entry is not None:
+            return entry[1]
+        
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is None:
+                logger.info(f"Compiling {variant} workflow for {type(checkpointer).__name__}")
+                compiled = create_protocol_workflow(variant).compile(checkpointer=checkpointer)
+                entry = (checkpointer, compiled)
+                self._graphs[key] = entry
+        
+        return entry[1]
+    
+    def warm(
+        self,
+        checkpointer: Optional[BaseCheckpointSaver],
+        variants: Iterable[WorkflowVariant] = ("web", "mcp")
+    ):
+        """
+        Compile the given variants ahead of the first request.
+        
+        Args:
+            checkpointer: Checkpointer the graphs persist to
+            variants: Variants to compile
+        """
+        for variant in variants:
+            self.get(checkpointer, variant)
+    
+    def clear(self):
+        """Drop all compiled graphs (e.g. when their checkpointer is closed)."""
+        with self._lock:
+            self._graphs.clear()
+    
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+
+# Global registry instance
+_registry: Optional[WorkflowRegistry] = None
+
+
+def get_workflow_registry() -> WorkflowRegistry:
+    """Get or create the global workflow registry."""
+    global _registry
+    if _registry is None:
+        _registry = WorkflowRegistry()
+    return _registry
+
+
+def get_compiled_workflow(
+    checkpointer: Optional[BaseCheckpointSaver],
+    variant: WorkflowVariant = "web"
+) -> Any:
+    """
+    Get the shared compiled workflow for a checkpointer and variant.
+    
+    Args:
+        checkpointer: Checkpointer the graph persists to
+        variant: Workflow variant ("web" or "mcp")
+        
+    Returns:
+        Compiled workflow graph
+    """
+    return get_workflow_registry().get(checkpointer, variant)
@@ -4,13 +4,33 @@ Streaming utilities for real-time workflow updates.
 Provides functions to stream workflow execution events to clients.
 """
 
-from typing import AsyncIterator, Dict, Any
+from typing import AsyncIterator, Dict, Any, Tuple
 from datetime import datetime
 import json
 
 from state.protocol_state import ProtocolState
 from state.schemas import StreamEvent
 from utils.logger import logger
+from .pacing import EventPacer
+from .nodes import REVIEW_AGENTS
+
+
+def node_agents(node_name: str, update: Any = None) -> Tuple[str, ...]:
+    """
+    Agents whose activity a node update represents.
+    
+    The review node runs up to two agents in one step, so the UI gets one
+    event per agent that ran (per the update's reviewed_by); every other
+    node maps to itself.
+    """
+    if node_name != "review":
+        return (node_name,)
+    
+    if isinstance(update, dict):
+        reviewed_by = update.get("reviewed_by")
+    else:
+        reviewed_by = getattr(update, "reviewed_by", None)
+    return tuple(reviewed_by) if reviewed_by else REVIEW_AGENTS
 
 
 async def stream_workflow_events(
@@ -34,6 +54,8 @@ async def stream_workflow_events(
     thread_id = config.get('configurable', {}).get('thread_id', 'unknown')
     logger.info(f"Starting workflow stream for thread: {thread_id}")
     
+    pacer = EventPacer()
+    
     try:
         # Send initial event
         start_event = StreamEvent(
@@ -45,26 +67,46 @@ async def stream_workflow_events(
         )
         yield f"data: {json.dumps(start_event.model_dump(), default=str)}\n\n"
         
-        # Stream graph execution using astream
-        async for event in graph.astream(initial_state, config, stream_mode="updates"):
+        # Running view of the state; nodes may emit partial updates
+        current_values = initial_state.model_dump()
+        
+        # Stream graph execution using astream (node updates + draft deltas)
+        async for mode, event in graph.astream(initial_state, config, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                if event.get("type") == "draft_delta":
+                    delta_event = StreamEvent(
+                        event_type="draft_delta",
+                        iteration=event["iteration"],
+                        message="Drafter output",
+                        agent="drafter",
+                        data={"delta": event["delta"]}
+                    )
+                    yield f"data: {json.dumps(delta_event.model_dump(), default=str)}\n\n"
+                continue
+            
             # event is a dict with node name as key and updated state as value
             for node_name, updated_state in event.items():
                 logger.info(f"Stream event from node: {node_name}")
                 
                 # Handle both dict and ProtocolState responses
                 if isinstance(updated_state, dict):
-                    # Convert dict to ProtocolState
-                    state_obj = ProtocolState(**updated_state)
-                else:
+                    current_values.update(updated_state)
+                    state_obj = ProtocolState(**current_values)
+                elif isinstance(updated_state, ProtocolState):
+                    current_values = updated_state.model_dump()
                     state_obj = updated_state
+                else:
+                    continue
                 
-                # Create stream event
-                stream_event = create_stream_event(node_name, state_obj)
-                
-                # Format as SSE
-                sse_data = f"data: {json.dumps(stream_event.model_dump(), default=str)}\n\n"
-                
-                yield sse_data
+                for agent_name in node_agents(node_name, updated_state):
+                    # Create stream event
+                    stream_event = create_stream_event(agent_name, state_obj)
+                    
+                    # Format as SSE
+                    sse_data = f"data: {json.dumps(stream_event.model_dump(), default=str)}\n\n"
+                    
+                    await pacer.wait()
+                    yield sse_data
                 
                 # Check if halted
                 if state_obj.should_halt or state_obj.is_finalized:
@@ -127,6 +169,14 @@ def create_stream_event(node_name: str, state: ProtocolState) -> StreamEvent:
             "max_iterations": state.max_iterations
         }
     
+    elif node_name == "triage":
+        event_type = "agent_end"
+        routed = state.next_action in ("halt_for_human", "finalize")
+        message = "Intent routed to a pre-approved response" if routed else "Intent cleared for drafting"
+        data = {
+            "routed": routed
+        }
+    
     elif node_name == "drafter":
         event_type = "draft_update"
         message = f"Drafter generated new draft (iteration {state.iteration_count})"
@@ -4,7 +4,7 @@ Main LangGraph workflow definition.
 This module creates and compiles the complete protocol generation workflow graph.
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Literal
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.base import BaseCheckpointSaver
 
@@ -14,10 +14,9 @@ from utils.logger import logger
 
 from .nodes import (
     initialize_node,
-    drafter_node,
-    safety_guardian_node,
-    clinical_critic_node,
-    supervisor_node,
+    atriage_node,
+    adrafter_node,
+    areview_node,
     halt_node,
     finalize_node,
     max_iterations_node,
@@ -26,37 +25,47 @@ from .nodes import (
 from .edges import (
     supervisor_router,
     after_drafter_router,
-    after_safety_router,
-    after_critic_router
+    after_review_router
 )
 
 
-def create_protocol_workflow() -> StateGraph:
+WorkflowVariant = Literal["web", "mcp"]
+
+
+def create_protocol_workflow(variant: WorkflowVariant = "web") -> StateGraph:
     """
     Create the LangGraph workflow for protocol generation.
     
     Workflow Structure:
-    1. Initialize
-    2. Enter agent loop (Drafter -> Safety -> Critic)
-    3. Supervisor makes routing decisions
+    1. Initialize, then triage the intent (crisis/medication intents get a
+       fixed response and halt without drafting)
+    2. Enter agent loop (Drafter -> Review: Safety + Critic concurrently)
+    3. Supervisor decides at the end of each agent step; edges route on it
     4. Halt for human review
     5. Finalize based on human decision
     
+    Args:
+        variant: "web" halts for human review; "mcp" also lets the
+            supervisor route straight to finalize (auto-approval)
+    
     Returns:
         StateGraph instance (not yet compiled)
     """
-    logger.info("Creating protocol generation workflow")
+    logger.info(f"Creating protocol generation workflow ({variant})")
     
     # Create state graph
     workflow = StateGraph(ProtocolState)
     
     # Add nodes
+    # LLM-backed nodes are async so in-flight provider calls share the event
+    # loop; the remaining lightweight nodes run on the default executor.
+    # There is no separate supervisor node: each agent node stores the
+    # supervisor decision, so one agent step is one superstep/checkpoint.
     logger.info("Adding workflow nodes")
     workflow.add_node("initialize", initialize_node)
-    workflow.add_node("drafter", drafter_node)
-    workflow.add_node("safety_guardian", safety_guardian_node)
-    workflow.add_node("clinical_critic", clinical_critic_node)
-    workflow.add_node("supervisor", supervisor_node)
+    workflow.add_node("triage", atriage_node)
+    workflow.add_node("drafter", adrafter_node)
+    workflow.add_node("review", areview_node)
     workflow.add_node("halt", halt_node)
     workflow.add_node("finalize", finalize_node)
     workflow.add_node("max_iterations", max_iterations_node)
@@ -68,50 +77,33 @@ def create_protocol_workflow() -> StateGraph:
     # Add edges
     logger.info("Adding workflow edges")
     
-    # Initialize -> Supervisor (to start the loop)
-    workflow.add_edge("initialize", "supervisor")
+    # Targets of the supervisor decision
+    supervisor_routes = {
+        "drafter": "drafter",
+        "review": "review",
+        "halt": "halt",
+        "max_iterations": "max_iterations"
+    }
+    if variant == "mcp":
+        # MCP requests skip human review once the draft passes validation
+        supervisor_routes["finalize"] = "finalize"
     
-    # Supervisor -> Conditional routing to agents
-    workflow.add_conditional_edges(
-        "supervisor",
-        supervisor_router,
-        {
-            "drafter": "drafter",
-            "safety_guardian": "safety_guardian",
-            "clinical_critic": "clinical_critic",
-            "halt": "halt",
-            "max_iterations": "max_iterations"
-        }
-    )
+    # Initialize -> Triage -> first supervisor decision
+    workflow.add_edge("initialize", "triage")
+    workflow.add_conditional_edges("triage", supervisor_router, supervisor_routes)
     
-    # After Drafter -> Back to Supervisor
+    # After Drafter -> next agent (or error)
     workflow.add_conditional_edges(
         "drafter",
         after_drafter_router,
-        {
-            "supervisor": "supervisor",
-            "error": "error"
-        }
+        {**supervisor_routes, "error": "error"}
     )
     
-    # After Safety Guardian -> Back to Supervisor
+    # After Review -> next agent (or error)
     workflow.add_conditional_edges(
-        "safety_guardian",
-        after_safety_router,
-        {
-            "supervisor": "supervisor",
-            "error": "error"
-        }
-    )
-    
-    # After Clinical Critic -> Back to Supervisor
-    workflow.add_conditional_edges(
-        "clinical_critic",
-        after_critic_router,
-        {
-            "supervisor": "supervisor",
-            "error": "error"
-        }
+        "review",
+        after_review_router,
+        {**supervisor_routes, "error": "error"}
     )
     
     # Halt -> END (workflow pauses here for human review)
@@ -131,7 +123,10 @@ def create_protocol_workflow() -> StateGraph:
     return workflow
 
 
-async def compile_workflow_async(checkpointer: Optional[Any] = None) -> Any:
+async def compile_workflow_async(
+    checkpointer: Optional[Any] = None,
+    variant: WorkflowVariant = "web"
+) -> Any:
     """
     Compile the workflow with async checkpointing enabled.
     
@@ -139,6 +134,7 @@ async def compile_workflow_async(checkpointer: Optional[Any] = None) -> Any:
     
     Args:
         checkpointer: Optional custom async checkpointer (uses default if None)
+        variant: Workflow variant to compile ("web" or "mcp")
         
     Returns:
         Compiled workflow graph with async support
@@ -146,13 +142,13 @@ async def compile_workflow_async(checkpointer: Optional[Any] = None) -> Any:
     logger.info("Compiling workflow with async checkpointing")
     
     # Create workflow
-    workflow = create_protocol_workflow()
+    workflow = create_protocol_workflow(variant)
     
     # Get async checkpointer if not provided
     if checkpointer is None:
-        logger.info("Using default async checkpointer from database config")
-        from database import get_async_checkpointer
-        checkpointer = await get_async_checkpointer()
+        logger.info("Using shared async checkpointer from database config")
+        from database import get_shared_async_checkpointer
+        checkpointer = await get_shared_async_checkpointer()
     
     # Compile with async checkpointer
     compiled = workflow.compile(checkpointer=checkpointer)
@@ -178,14 +174,14 @@ def create_workflow_diagram() -> str:
       ↓
     [Initialize]
       ↓
-    [Supervisor] ←─────────────────────┐
-      ↓                                │
-    (Decision)                         │
-      ├─→ [Drafter] ──────────────────┤
-      ├─→ [Safety Guardian] ──────────┤
-      ├─→ [Clinical Critic] ──────────┤
-      ├─→ [Max Iterations] → [Halt]   │
-      └─→ [Halt] ─────────────────────┘
+    [Triage] ── crisis / medication intent → fixed response → [Halt] (MCP: [Finalize])
+      ↓
+    (Supervisor decision) ←──────────────┐
+      ├─→ [Drafter] ─────────────────────┤
+      ├─→ [Review] ──────────────────────┘
+      │     (Safety Guardian + Clinical Critic, concurrent)
+      ├─→ [Max Iterations] → [Halt]
+      └─→ [Halt]
            ↓
     (Human Review)
            ↓
@@ -195,7 +191,7 @@ def create_workflow_diagram() -> str:
     
     Legend:
     - [ ] = Node (agent action)
-    - ( ) = Conditional routing
+    - ( ) = Conditional routing (decided at the end of each agent node)
     - → = Edge (flow direction)
     - ← = Loop back
     """
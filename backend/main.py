@@ -16,8 +16,10 @@ Author: Cerina Health - Agentic Architect Sprint
 """
 
 import sys
+import asyncio
 from pathlib import Path
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
@@ -26,9 +28,16 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
 
 from config import settings
-from database import init_database, get_checkpointer
+from database import (
+    init_database,
+    get_checkpointer,
+    init_async_checkpointer,
+    close_async_checkpointer
+)
 from utils.logger import logger, log_exception
-from api.routes import router as api_router
+from models.prompts import get_prompt_variants, get_prompt_version
+from api.routes import router as api_router, run_generation_job
+from api.job_queue import get_job_queue, stop_job_queue
 from api.websocket import websocket_endpoint
 from api.middleware import LoggingMiddleware
 from api.error_handlers import (
@@ -36,7 +45,8 @@ from api.error_handlers import (
     validation_exception_handler,
     generic_exception_handler
 )
-from graph.workflow import compile_workflow_async, create_workflow_diagram
+from graph.workflow import create_workflow_diagram
+from graph.registry import get_workflow_registry
 
 
 # ASCII Art Banner
@@ -65,7 +75,7 @@ async def lifespan(app: FastAPI):
     Application lifespan manager.
     
     Handles startup and shutdown operations:
-    - Database initialization
+    - Database initialization and the shared async checkpointer
     - Workflow compilation
     - Resource cleanup
     """
@@ -75,18 +85,40 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Cerina Protocol Foundry")
     logger.info("=" * 70)
     
+    # Bounded executor for sync graph nodes and blocking helpers
+    executor = ThreadPoolExecutor(
+        max_workers=settings.graph_executor_max_workers,
+        thread_name_prefix="cerina-graph"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+    
     try:
         # Initialize database and checkpointer
         logger.info("Initializing database and checkpointing system...")
         init_database()
-        checkpointer = get_checkpointer()
+        checkpointer = await init_async_checkpointer()
+        app.state.checkpointer = checkpointer
         logger.info(f"✓ Database initialized: {settings.database_type}")
         
-        # Compile workflow
-        logger.info("Compiling LangGraph workflow...")
-        workflow = compile_workflow_async(checkpointer)
-        app.state.workflow = workflow
-        logger.info("✓ Workflow compiled successfully")
+        # Compile every workflow variant once; routes reuse them
+        logger.info("Compiling LangGraph workflows...")
+        registry = get_workflow_registry()
+        registry.warm(checkpointer)
+        registry.warm(get_checkpointer(), variants=("web",))
+        app.state.workflow = registry.get(checkpointer, "web")
+        logger.info(f"✓ {len(registry)} workflows compiled successfully")
+        
+        # Start the generation workers (requeues jobs a restart interrupted)
+        if settings.job_queue_enabled:
+            recovered = await get_job_queue().start(run_generation_job)
+            logger.info(f"✓ Job queue: {settings.job_queue_workers} workers, {recovered} jobs recovered")
+        
+        # Count system prompt tokens once per variant
+        prompt_variants = get_prompt_variants()
+        logger.info(f"✓ Prompts v{get_prompt_version()}: " + ", ".join(
+            f"{variant.agent}/{variant.name}={variant.tokens}"
+            for variants in prompt_variants.values() for variant in variants.values()
+        ))
         
         # Log configuration
         logger.info("=" * 70)
@@ -96,6 +128,9 @@ async def lifespan(app: FastAPI):
         logger.info(f"  OpenAI Model: {settings.openai_model}")
         logger.info(f"  Anthropic Model: {settings.anthropic_model}")
         logger.info(f"  Max Iterations: {settings.max_agent_iterations}")
+        logger.info(f"  Job Queue: {'on' if settings.job_queue_enabled else 'off'} ({settings.job_queue_workers} workers)")
+        logger.info(f"  Prompt Variant: {settings.prompt_variant}")
+        logger.info(f"  Graph Executor Workers: {settings.graph_executor_max_workers}")
         logger.info(f"  Database: {settings.database_type}")
         logger.info(f"  CORS Origins: {settings.cors_origins}")
         logger.info("=" * 70)
@@ -127,8 +162,17 @@ async def lifespan(app: FastAPI):
         # Cleanup resources
         logger.info("Cleaning up resources...")
         
-        # Close database connections
-        # (handled automatically by SQLAlchemy/SQLite)
+        # Stop the workers before the checkpointer they write to; running
+        # jobs are requeued on the next start
+        await stop_job_queue()
+        
+        # Drop compiled graphs and close the shared async checkpointer
+        # (SQLAlchemy cleans up itself)
+        get_workflow_registry().clear()
+        await close_async_checkpointer()
+        
+        # Stop the graph executor
+        executor.shutdown(wait=False, cancel_futures=True)
         
         logger.info("✓ Cleanup completed")
         logger.info("👋 Cerina Protocol Foundry stopped successfully")
@@ -179,8 +223,8 @@ app = FastAPI(
     
     ## Quick Start
     
-    1. **Generate Protocol**: POST `/api/generate` with user intent
-    2. **Check State**: GET `/api/state/{thread_id}`
+    1. **Generate Protocol**: POST `/api/generate` with user intent (queued; returns the thread_id)
+    2. **Check State**: GET `/api/jobs/{thread_id}` or `/api/state/{thread_id}`
     3. **Review & Approve**: POST `/api/resume/{thread_id}` with action
     """,
     version="1.0.0",
@@ -271,8 +315,11 @@ async def info():
             "health": "/api/health",
             "generate": "/api/generate",
             "generate_stream": "/api/generate/stream",
+            "generate_batch": "/api/generate/batch",
             "state": "/api/state/{thread_id}",
+            "job": "/api/jobs/{thread_id}",
             "resume": "/api/resume/{thread_id}",
+            "cancel": "/api/workflow/{thread_id}/cancel",
             "websocket": "/ws/{thread_id}"
         }
     }
@@ -420,5 +467,19 @@ def main():
     )
 
 
+def bulk_main(argv=None):
+    """
+    CLI entry point for offline bulk generation (`python main.py bulk ...`).
+    
+    Runs the graph in-process over a JSONL file of intents; see bulk_generate.
+    """
+    from bulk_generate import main as run_bulk_cli
+    
+    run_bulk_cli(argv)
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["bulk"]:
+        bulk_main(sys.argv[2:])
+    else:
+        main()
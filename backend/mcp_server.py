@@ -20,6 +20,9 @@ API_BASE_URL = "http://localhost:8000/api"
 # Store active thread IDs for resource discovery
 _active_threads: List[str] = []
 
+# How often to retry /generate when the job queue is full (503)
+MAX_ADMISSION_RETRIES = 5
+
 
 # ============================================================================
 # PRIMARY TOOL: The Single Workflow Entry Point
@@ -50,14 +53,21 @@ async def generate_cbt_protocol(
             # ✅ LOGGING FIX: Send to stderr to avoid breaking JSON
             print(f"[MCP] Starting workflow for: {user_intent}", file=sys.stderr)
             
-            response = await client.post(
-                f"{API_BASE_URL}/generate",
-                json={
-                    "user_intent": user_intent,
-                    "max_iterations": max_iterations,
-                    "source": "mcp" 
-                }
-            )
+            # The API queues the run; wait out Retry-After when the queue is full
+            for attempt in range(MAX_ADMISSION_RETRIES + 1):
+                response = await client.post(
+                    f"{API_BASE_URL}/generate",
+                    json={
+                        "user_intent": user_intent,
+                        "max_iterations": max_iterations,
+                        "source": "mcp" 
+                    }
+                )
+                if response.status_code != 503 or attempt == MAX_ADMISSION_RETRIES:
+                    break
+                retry_after = int(response.headers.get("Retry-After", "10"))
+                print(f"[MCP] Job queue full, retrying in {retry_after}s", file=sys.stderr)
+                await asyncio.sleep(retry_after)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -85,7 +95,7 @@ Access the final protocol via: `cerina://protocol/{thread_id}`
             
             # ✅ Wait for finalization (should be quick with bypass mode)
             else:
-                max_wait = 300  # 5 minutes should be plenty
+                max_wait = 600  # includes time spent in the job queue
                 poll_interval = 3
                 elapsed = 0
                 poll_count = 0
@@ -98,6 +108,25 @@ Access the final protocol via: `cerina://protocol/{thread_id}`
                     poll_count += 1
                     print(f"[MCP] Polling status (attempt {poll_count}, elapsed: {elapsed}s)", file=sys.stderr)
                     
+                    # Wait for the queued job first (404: not queued, e.g. a cache hit)
+                    try:
+                        job_resp = await client.get(f"{API_BASE_URL}/jobs/{thread_id}", timeout=30.0)
+                    except httpx.TimeoutException:
+                        print(f"[MCP] Job check timeout on attempt {poll_count}", file=sys.stderr)
+                        continue
+                    
+                    if job_resp.status_code == 200:
+                        job_data = job_resp.json()
+                        if job_data.get('status') == 'failed':
+                            print(f"[MCP] Job failed: {job_data.get('error')}", file=sys.stderr)
+                            return f"❌ **Workflow Error**\n\n{job_data.get('error')}\nThread ID: `{thread_id}`"
+                        if job_data.get('status') == 'cancelled':
+                            print(f"[MCP] Job cancelled: {job_data.get('error')}", file=sys.stderr)
+                            return f"⚠️ **Workflow Cancelled**\n\n{job_data.get('error')}\nThread ID: `{thread_id}`"
+                        if job_data.get('status') in ('queued', 'running'):
+                            print(f"[MCP] Job {job_data['status']} (position: {job_data.get('queue_position')})", file=sys.stderr)
+                            continue
+                    
                     try:
                         status_resp = await client.get(
                             f"{API_BASE_URL}/state/{thread_id}",
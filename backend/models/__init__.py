@@ -10,7 +10,18 @@ This module provides:
 
 from .llm_client import (
     get_llm_client,
+    get_shared_llm_client,
     LLMClient,
+    LLMResponse,
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMScheduler,
+    ConcurrencyLimiter,
+    TokenBucket,
+    get_llm_scheduler,
+    LLMResponseCache,
+    get_llm_response_cache,
+    get_circuit_breaker_stats,
     OpenAIClient,
     AnthropicClient,
     count_tokens
@@ -27,7 +38,18 @@ from .prompts import (
 
 __all__ = [
     "get_llm_client",
+    "get_shared_llm_client",
     "LLMClient",
+    "LLMResponse",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LLMScheduler",
+    "ConcurrencyLimiter",
+    "TokenBucket",
+    "get_llm_scheduler",
+    "LLMResponseCache",
+    "get_llm_response_cache",
+    "get_circuit_breaker_stats",
     "OpenAIClient",
     "AnthropicClient",
     "count_tokens",
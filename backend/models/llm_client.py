@@ -1,12 +1,40 @@
 """
 Unified LLM client interface supporting multiple providers.
+
+All agents share one client per provider. Every call goes through the
+provider's circuit breaker and the global request scheduler (concurrency and
+tokens-per-minute budgets), and is retried on transient errors (rate limits,
+5xx, timeouts) with jittered exponential backoff that honours Retry-After.
 """
 
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Literal
+from collections import deque, OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Literal, Tuple, Callable, Deque, AsyncIterator
 from dataclasses import dataclass
+import httpx
+import openai
+import anthropic
 import tiktoken
+from tenacity import (
+    Retrying,
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential
+)
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
@@ -25,14 +53,957 @@ class LLMResponse:
     metadata: Dict[str, Any] = None
 
 
+# Retry and circuit breaking
+
+# HTTP statuses worth retrying (529 = Anthropic "overloaded")
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is rejecting calls."""
+    
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"Circuit breaker open for {provider}; retry in {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Check whether an LLM call failure is transient.
+    
+    Args:
+        error: Exception raised by the provider SDK
+        
+    Returns:
+        True for rate limits, overloads, 5xx, timeouts and connection errors
+    """
+    if isinstance(error, CircuitOpenError):
+        return True
+    if isinstance(error, (openai.APIConnectionError, anthropic.APIConnectionError, httpx.TransportError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Extract the server's requested delay from an error, if any.
+    
+    Args:
+        error: Exception raised by the provider SDK
+        
+    Returns:
+        Seconds to wait, or None if the error carries no hint
+    """
+    if isinstance(error, CircuitOpenError):
+        return error.retry_after
+    
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        retry_at = parsedate_to_datetime(retry_after)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    """Tenacity wait: Retry-After (plus jitter) if given, else jittered backoff."""
+    error = retry_state.outcome.exception()
+    hinted = retry_after_seconds(error) if error else None
+    
+    if hinted is not None:
+        delay = hinted + random.uniform(0, settings.llm_retry_initial_wait)
+    else:
+        backoff = wait_random_exponential(
+            multiplier=settings.llm_retry_initial_wait,
+            max=settings.llm_retry_max_wait
+        )
+        delay = backoff(retry_state)
+    
+    return min(delay, settings.llm_retry_max_wait)
+
+
+def _log_retry(retry_state: RetryCallState):
+    """Tenacity hook: log each retry with its delay."""
+    error = retry_state.outcome.exception()
+    logger.warning(
+        f"LLM call failed ({type(error).__name__}: {error}); "
+        f"retry {retry_state.attempt_number}/{settings.llm_max_retries} "
+        f"in {retry_state.next_action.sleep:.1f}s"
+    )
+
+
+def _retry_options() -> Dict[str, Any]:
+    """Shared tenacity configuration (read per call so settings stay live)."""
+    return {
+        "retry": retry_if_exception(is_retryable_error),
+        "wait": _retry_wait,
+        "stop": stop_after_attempt(settings.llm_max_retries + 1),
+        "before_sleep": _log_retry,
+        "reraise": True,
+    }
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    
+    Closed: calls pass through. After `failure_threshold` consecutive
+    transient failures it opens and rejects calls for `reset_timeout`
+    seconds, then lets a single trial call through (half-open); success
+    closes it again, failure re-opens it. Rejected calls raise
+    CircuitOpenError, which the retry loop waits out instead of failing.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the breaker.
+        
+        Args:
+            name: Provider name (for logs and errors)
+            failure_threshold: Consecutive failures before opening (defaults to settings)
+            reset_timeout: Seconds to stay open (defaults to settings)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.llm_circuit_failure_threshold
+        self.reset_timeout = reset_timeout or settings.llm_circuit_reset_timeout
+        self.state: Literal["closed", "open", "half_open"] = "closed"
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def before_call(self):
+        """
+        Admit or reject a call.
+        
+        Raises:
+            CircuitOpenError: If the breaker is open or a trial call is in flight
+        """
+        with self._lock:
+            if self.state == "open":
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = "half_open"
+                self._trial_in_flight = False
+            
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    raise CircuitOpenError(self.name, settings.llm_retry_initial_wait)
+                self._trial_in_flight = True
+    
+    def record_success(self):
+        """Record a call that reached the provider and got a usable answer."""
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit breaker for {self.name} closed")
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        """Record a transient provider failure."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Circuit breaker for {self.name} opened after "
+                        f"{self.consecutive_failures} consecutive failures"
+                    )
+                self.state = "open"
+                self._opened_at = time.monotonic()
+    
+    def record_cancelled(self):
+        """Record a call cancelled before it finished: no verdict on the provider, but a trial call is released."""
+        with self._lock:
+            self._trial_in_flight = False
+    
+    def record_outcome(self, error: BaseException):
+        """Record a failed call; only transient errors count against the provider."""
+        if is_retryable_error(error):
+            self.record_failure()
+        else:
+            # e.g. 400/401: the provider answered, so it is healthy
+            self.record_success()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state for monitoring."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+        }
+
+
+# Global breaker instances, one per provider
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Get or create the circuit breaker for a provider."""
+    with _circuit_breakers_lock:
+        if provider not in _circuit_breakers:
+            _circuit_breakers[provider] = CircuitBreaker(provider)
+        return _circuit_breakers[provider]
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the state of every provider's circuit breaker."""
+    with _circuit_breakers_lock:
+        breakers = dict(_circuit_breakers)
+    return {provider: breaker.get_stats() for provider, breaker in breakers.items()}
+
+
+# Request scheduling
+
+class SchedulerMetrics:
+    """Queue-depth and wait-time metrics for one limiter."""
+    
+    def __init__(self, sample_size: int = 1000):
+        self.acquired = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=sample_size)
+    
+    def record_wait(self, wait: float):
+        """Record how long one acquisition waited (0 if immediate)."""
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._recent_waits.append(wait)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get metrics as a dictionary (wait times in seconds)."""
+        recent = sorted(self._recent_waits)
+        
+        def percentile(fraction: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * fraction))] if recent else 0.0
+        
+        return {
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "p50_wait": percentile(0.50),
+            "p95_wait": percentile(0.95),
+            "p99_wait": percentile(0.99),
+            "max_wait": self.max_wait,
+        }
+
+
+class ConcurrencyLimiter:
+    """
+    FIFO concurrency limiter usable from threads and event loops alike.
+    
+    Sync LLM calls run on worker threads and async ones on the event loop,
+    so waiters are either threading.Events or futures resolved through
+    their loop. A released slot is handed directly to the oldest waiter.
+    The limit can be changed at runtime (see LLMScheduler's adaptation).
+    """
+    
+    def __init__(self, name: str, limit: int):
+        """
+        Initialize the limiter.
+        
+        Args:
+            name: Identifier used in metrics
+            limit: Maximum concurrent holders
+        """
+        self.name = name
+        self.limit = max(1, limit)
+        self.active = 0
+        self.metrics = SchedulerMetrics()
+        self._waiters: Deque[Any] = deque()
+        self._lock = threading.Lock()
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for a slot."""
+        return len(self._waiters)
+    
+    def _try_acquire_locked(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        return False
+    
+    def _enqueue_locked(self, waiter: Any):
+        self._waiters.append(waiter)
+        self.metrics.queued += 1
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, len(self._waiters))
+    
+    def _wake_locked(self):
+        """Hand free slots to waiters in arrival order."""
+        while self._waiters and self.active < self.limit:
+            waiter = self._waiters.popleft()
+            self.active += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._hand_over, future)
+    
+    def _hand_over(self, future: asyncio.Future):
+        """Resolve an async waiter on its own loop (or return the slot if it gave up)."""
+        if future.cancelled():
+            self.release()
+        elif not future.done():
+            future.set_result(None)
+    
+    def acquire_sync(self):
+        """Block the current thread until a slot is free."""
+        start = time.monotonic()
+        with self._lock:
+            if self._try_acquire_locked():
+                self.metrics.record_wait(0.0)
+                return
+            event = threading.Event()
+            self._enqueue_locked(event)
+        
+        event.wait()
+        self.metrics.record_wait(time.monotonic() - start)
+    
+    async def acquire(self):
+        """Wait on the event loop until a slot is free."""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_acquire_locked():
+                self.metrics.record_wait(0.0)
+                return
+            waiter = (loop, loop.create_future())
+            self._enqueue_locked(waiter)
+        
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over just as we were cancelled
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+        
+        self.metrics.record_wait(time.monotonic() - start)
+    
+    def release(self):
+        """Release a slot."""
+        with self._lock:
+            self.active -= 1
+            self._wake_locked()
+    
+    def set_limit(self, limit: int):
+        """Change the limit; raising it wakes waiters immediately."""
+        with self._lock:
+            self.limit = max(1, limit)
+            self._wake_locked()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter state and metrics."""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            **self.metrics.get_stats(),
+        }
+
+
+class TokenBucket:
+    """
+    Tokens-per-minute budget.
+    
+    Callers reserve their estimated tokens up front; the balance may go
+    negative, and the caller waits until refill brings it back to zero.
+    Unused tokens are refunded once the real usage is known.
+    """
+    
+    def __init__(self, tokens_per_minute: int):
+        """
+        Initialize the bucket.
+        
+        Args:
+            tokens_per_minute: Budget per minute (0 disables the bucket)
+        """
+        self.capacity = float(max(0, tokens_per_minute))
+        self.tokens = self.capacity
+        self.total_wait = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+    
+    def _refill_locked(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+    
+    def reserve(self, amount: int) -> float:
+        """
+        Reserve tokens.
+        
+        Args:
+            amount: Estimated tokens for the call
+            
+        Returns:
+            Seconds the caller must wait before sending
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill_locked()
+            self.tokens -= min(amount, self.capacity)
+            wait = max(0.0, -self.tokens * 60 / self.capacity)
+            self.total_wait += wait
+            return wait
+    
+    def refund(self, amount: int):
+        """Return reserved tokens that were not used."""
+        if not self.enabled or amount <= 0:
+            return
+        with self._lock:
+            self._refill_locked()
+            self.tokens = min(self.capacity, self.tokens + amount)
+    
+    def set_capacity(self, tokens_per_minute: float):
+        """Adopt a new per-minute budget (e.g. from provider headers)."""
+        with self._lock:
+            self._refill_locked()
+            if self.capacity == 0:
+                self.tokens = tokens_per_minute
+            self.capacity = float(max(0, tokens_per_minute))
+            self.tokens = min(self.tokens, self.capacity)
+    
+    def cap_remaining(self, remaining: float):
+        """Never assume more budget than the provider says is left."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._refill_locked()
+            self.tokens = min(self.tokens, remaining)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket state."""
+        with self._lock:
+            self._refill_locked()
+            return {
+                "tokens_per_minute": self.capacity,
+                "available": round(self.tokens, 1),
+                "total_wait": self.total_wait,
+            }
+
+
+def parse_rate_limit_headers(headers: Optional[Any]) -> Dict[str, float]:
+    """
+    Normalize OpenAI/Anthropic rate-limit headers.
+    
+    Args:
+        headers: Response headers (mapping) or None
+        
+    Returns:
+        Subset of limit_requests, remaining_requests, limit_tokens and
+        remaining_tokens that the provider reported
+    """
+    if not headers:
+        return {}
+    
+    names = {
+        "limit_requests": ("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit"),
+        "remaining_requests": ("x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining"),
+        "limit_tokens": ("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit"),
+        "remaining_tokens": ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining"),
+    }
+    lowered = {str(key).lower(): value for key, value in dict(headers).items()}
+    
+    parsed = {}
+    for field, candidates in names.items():
+        for name in candidates:
+            if name in lowered:
+                try:
+                    parsed[field] = float(lowered[name])
+                except (TypeError, ValueError):
+                    pass
+                break
+    return parsed
+
+
+class _ProviderSchedule:
+    """Concurrency limiter, token bucket and adaptation state for a provider."""
+    
+    def __init__(self, provider: str, max_concurrency: int, min_concurrency: int, tokens_per_minute: int):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.limiter = ConcurrencyLimiter(provider, max_concurrency)
+        self.bucket = TokenBucket(tokens_per_minute)
+        self.configured_tpm = tokens_per_minute
+        self.successes_since_change = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+
+class LLMScheduler:
+    """
+    Coordinates every LLM call in the process.
+    
+    A call acquires, in order: its agent's concurrency slot, its share of
+    the provider's tokens-per-minute budget, and a provider concurrency
+    slot. The provider limit adapts AIMD-style: halved on a 429, raised by
+    one after a full window of successes, and token budgets follow the
+    provider's rate-limit headers when they are present.
+    """
+    
+    def __init__(
+        self,
+        provider_max_concurrency: Optional[int] = None,
+        provider_min_concurrency: Optional[int] = None,
+        agent_max_concurrency: Optional[Dict[str, int]] = None,
+        tokens_per_minute: Optional[int] = None
+    ):
+        """
+        Initialize the scheduler (defaults come from settings).
+        
+        Args:
+            provider_max_concurrency: Upper bound on concurrent calls per provider
+            provider_min_concurrency: Floor the adaptive limit never drops below
+            agent_max_concurrency: Concurrent calls allowed per agent name
+            tokens_per_minute: Local TPM budget per provider (0 = headers only)
+        """
+        self.provider_max_concurrency = provider_max_concurrency or settings.llm_provider_max_concurrency
+        self.provider_min_concurrency = provider_min_concurrency or settings.llm_provider_min_concurrency
+        self.agent_max_concurrency = (
+            settings.llm_agent_max_concurrency if agent_max_concurrency is None else agent_max_concurrency
+        )
+        self.tokens_per_minute = settings.llm_tokens_per_minute if tokens_per_minute is None else tokens_per_minute
+        
+        self._providers: Dict[str, _ProviderSchedule] = {}
+        self._agents: Dict[str, ConcurrencyLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def _provider(self, provider: str) -> _ProviderSchedule:
+        with self._lock:
+            if provider not in self._providers:
+                self._providers[provider] = _ProviderSchedule(
+                    provider,
+                    self.provider_max_concurrency,
+                    self.provider_min_concurrency,
+                    self.tokens_per_minute
+                )
+            return self._providers[provider]
+    
+    def _agent(self, agent: Optional[str]) -> Optional[ConcurrencyLimiter]:
+        if agent is None or agent not in self.agent_max_concurrency:
+            return None
+        with self._lock:
+            if agent not in self._agents:
+                self._agents[agent] = ConcurrencyLimiter(agent, self.agent_max_concurrency[agent])
+            return self._agents[agent]
+    
+    @contextmanager
+    def slot(self, provider: str, agent: Optional[str] = None, tokens: int = 0):
+        """
+        Hold a scheduling slot for one synchronous provider call.
+        
+        Args:
+            provider: Provider name
+            agent: Calling agent's name (for per-agent limits)
+            tokens: Estimated tokens (prompt + max output)
+        """
+        schedule = self._provider(provider)
+        agent_limiter = self._agent(agent)
+        
+        if agent_limiter:
+            agent_limiter.acquire_sync()
+        try:
+            delay = schedule.bucket.reserve(tokens)
+            if delay:
+                time.sleep(delay)
+            schedule.limiter.acquire_sync()
+            try:
+                yield
+            finally:
+                schedule.limiter.release()
+        finally:
+            if agent_limiter:
+                agent_limiter.release()
+    
+    @asynccontextmanager
+    async def aslot(self, provider: str, agent: Optional[str] = None, tokens: int = 0):
+        """Async variant of slot(); waits without blocking the event loop."""
+        schedule = self._provider(provider)
+        agent_limiter = self._agent(agent)
+        
+        if agent_limiter:
+            await agent_limiter.acquire()
+        try:
+            delay = schedule.bucket.reserve(tokens)
+            try:
+                if delay:
+                    await asyncio.sleep(delay)
+                await schedule.limiter.acquire()
+                try:
+                    yield
+                finally:
+                    schedule.limiter.release()
+            except asyncio.CancelledError:
+                # A cancelled call never reports its usage; give the reservation back
+                schedule.bucket.refund(tokens)
+                raise
+        finally:
+            if agent_limiter:
+                agent_limiter.release()
+    
+    def record_success(
+        self,
+        provider: str,
+        headers: Optional[Any] = None,
+        reserved_tokens: int = 0,
+        used_tokens: Optional[int] = None
+    ):
+        """
+        Feed a successful call back into the scheduler.
+        
+        Args:
+            provider: Provider name
+            headers: Response headers, if the provider exposes them
+            reserved_tokens: Tokens reserved for the call
+            used_tokens: Tokens actually used (refunds the difference)
+        """
+        schedule = self._provider(provider)
+        if used_tokens is not None:
+            schedule.bucket.refund(reserved_tokens - used_tokens)
+        self._apply_headers(schedule, headers)
+        
+        with schedule._lock:
+            schedule.successes_since_change += 1
+            limit = schedule.limiter.limit
+            if schedule.successes_since_change >= limit and limit < schedule.max_concurrency:
+                schedule.successes_since_change = 0
+                schedule.limiter.set_limit(limit + 1)
+    
+    def record_rate_limited(self, provider: str, headers: Optional[Any] = None):
+        """
+        Feed a 429 back into the scheduler: halve the provider's concurrency.
+        
+        Args:
+            provider: Provider name
+            headers: Error response headers, if any
+        """
+        schedule = self._provider(provider)
+        self._apply_headers(schedule, headers)
+        
+        with schedule._lock:
+            schedule.rate_limited += 1
+            schedule.successes_since_change = 0
+            new_limit = max(schedule.min_concurrency, schedule.limiter.limit // 2)
+            if new_limit != schedule.limiter.limit:
+                logger.warning(
+                    f"LLM scheduler: {provider} rate limited, "
+                    f"concurrency {schedule.limiter.limit} -> {new_limit}"
+                )
+                schedule.limiter.set_limit(new_limit)
+    
+    def _apply_headers(self, schedule: _ProviderSchedule, headers: Optional[Any]):
+        """Align the token budget with the provider's rate-limit headers."""
+        limits = parse_rate_limit_headers(headers)
+        
+        if "limit_tokens" in limits:
+            reported = limits["limit_tokens"]
+            budget = min(reported, schedule.configured_tpm) if schedule.configured_tpm else reported
+            if budget != schedule.bucket.capacity:
+                schedule.bucket.set_capacity(budget)
+        if "remaining_tokens" in limits:
+            schedule.bucket.cap_remaining(limits["remaining_tokens"])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue-depth, wait-time and budget metrics.
+        
+        Returns:
+            Per-provider and per-agent statistics
+        """
+        with self._lock:
+            providers = dict(self._providers)
+            agents = dict(self._agents)
+        
+        return {
+            "providers": {
+                name: {
+                    **schedule.limiter.get_stats(),
+                    "max_concurrency": schedule.max_concurrency,
+                    "rate_limited": schedule.rate_limited,
+                    "token_budget": schedule.bucket.get_stats(),
+                }
+                for name, schedule in providers.items()
+            },
+            "agents": {name: limiter.get_stats() for name, limiter in agents.items()},
+        }
+
+
+# Global scheduler instance
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create the global LLM request scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
+
+
+# Response caching
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses.
+    
+    Keys hash the normalized messages together with provider, model and
+    sampling parameters. Lookups hit an in-memory LRU first and then a
+    SQLite store, so cached verdicts survive restarts. Entries expire
+    after a TTL, and both tiers are bounded in size (least recently used
+    entries are evicted first).
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_memory_entries: Optional[int] = None,
+        max_disk_entries: Optional[int] = None
+    ):
+        """
+        Initialize the cache (defaults come from settings).
+        
+        Args:
+            path: SQLite file for the persistent tier (None = memory only)
+            ttl: Seconds an entry stays valid
+            max_memory_entries: Size of the in-memory LRU tier
+            max_disk_entries: Size of the SQLite tier
+        """
+        self.path = settings.llm_cache_path if path is None else path
+        self.ttl = settings.llm_cache_ttl if ttl is None else ttl
+        self.max_memory_entries = max_memory_entries or settings.llm_cache_max_memory_entries
+        self.max_disk_entries = max_disk_entries or settings.llm_cache_max_disk_entries
+        
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        
+        if self.path:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+    
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        messages: List[BaseMessage],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        Build the cache key for a call.
+        
+        Message text is normalized (line endings, trailing whitespace) so
+        that cosmetic differences do not defeat the cache.
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        normalized = [
+            [message.type, "\n".join(line.rstrip() for line in str(message.content).strip().splitlines())]
+            for message in messages
+        ]
+        payload = json.dumps(
+            [provider, model, float(temperature), int(max_tokens), normalized],
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key from make_key()
+            
+        Returns:
+            Stored response fields, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                self.stats["expired"] += 1
+            
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at <= self.ttl:
+                        self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        value = json.loads(value)
+                        self._remember_locked(key, created_at, value)
+                        self.stats["disk_hits"] += 1
+                        return value
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.stats["expired"] += 1
+            
+            self.stats["misses"] += 1
+            return None
+    
+    def put(self, key: str, value: Dict[str, Any]):
+        """
+        Store a response.
+        
+        Args:
+            key: Cache key from make_key()
+            value: JSON-serializable response fields
+        """
+        now = time.time()
+        with self._lock:
+            self._remember_locked(key, now, value)
+            self.stats["stores"] += 1
+            
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                excess = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_disk_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                        (excess,)
+                    )
+                    self.stats["evictions"] += excess
+                self._conn.commit()
+    
+    def _remember_locked(self, key: str, created_at: float, value: Dict[str, Any]):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """Async get(); the SQLite tier is read off the event loop."""
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aput(self, key: str, value: Dict[str, Any]):
+        """Async put(); the SQLite tier is written off the event loop."""
+        await asyncio.to_thread(self.put, key, value)
+    
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss metrics.
+        
+        Returns:
+            Counters, hit rate and tier sizes
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_entries"] = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+# Global cache instance
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get or create the global LLM response cache."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache()
+        return _response_cache
+
+
 class LLMClient(ABC):
-    """Abstract base class for LLM clients."""
+    """
+    Abstract base class for LLM clients.
+    
+    Subclasses only build the provider's LangChain chat model; calls,
+    caching, scheduling, retries and circuit breaking are handled here.
+    """
+    
+    provider: str = ""
     
     def __init__(
         self,
         model: str,
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        scheduler: Optional[LLMScheduler] = None,
+        cache: Optional[LLMResponseCache] = None
     ):
         """
         Initialize LLM client.
@@ -41,136 +1012,266 @@ class LLMClient(ABC):
             model: Model identifier
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
+            scheduler: Request scheduler (defaults to the global one)
+            cache: Response cache (defaults to the global one)
         """
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.logger = logger
+        self.breaker = get_circuit_breaker(self.provider)
+        self.scheduler = scheduler or get_llm_scheduler()
+        self._cache = cache
+        
+        # Chat models keyed by (temperature, max_tokens); each holds its own
+        # HTTP connection pool, so they are reused rather than rebuilt per call
+        self._chat_models: Dict[Tuple[float, int], BaseChatModel] = {}
+        self._chat_models_lock = threading.Lock()
     
     @abstractmethod
-    def invoke(
-        self,
-        messages: List[BaseMessage],
-        **kwargs
-    ) -> LLMResponse:
+    def _create_chat_model(self, temperature: float, max_tokens: int) -> BaseChatModel:
         """
-        Invoke the LLM with messages.
+        Build the provider's LangChain chat model.
+        
+        SDK-level retries must be disabled (max_retries=0) so that retries
+        are governed by this client alone.
         
         Args:
-            messages: List of messages
-            **kwargs: Additional arguments
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
             
         Returns:
-            LLMResponse object
+            LangChain chat model
         """
         pass
     
     @abstractmethod
-    def stream(
+    def _tokens_used(self, response: AIMessage) -> Optional[int]:
+        """Extract total token usage from a provider response."""
+        pass
+    
+    @property
+    def client(self) -> BaseChatModel:
+        """Chat model with this client's default parameters."""
+        return self._get_chat_model(self.temperature, self.max_tokens)
+    
+    def _get_chat_model(self, temperature: float, max_tokens: int) -> BaseChatModel:
+        """Get or create the cached chat model for the given parameters."""
+        key = (temperature, max_tokens)
+        chat_model = self._chat_models.get(key)
+        if chat_model is None:
+            with self._chat_models_lock:
+                chat_model = self._chat_models.get(key)
+                if chat_model is None:
+                    chat_model = self._create_chat_model(temperature, max_tokens)
+                    self._chat_models[key] = chat_model
+        return chat_model
+    
+    def _resolve_chat_model(self, kwargs: Dict[str, Any]) -> BaseChatModel:
+        """Pop per-call temperature/max_tokens overrides and pick the chat model."""
+        temperature = kwargs.pop("temperature", self.temperature)
+        max_tokens = kwargs.pop("max_tokens", self.max_tokens)
+        return self._get_chat_model(temperature, max_tokens)
+    
+    @property
+    def response_cache(self) -> LLMResponseCache:
+        """Response cache (the global one is opened on first use)."""
+        if self._cache is None:
+            self._cache = get_llm_response_cache()
+        return self._cache
+    
+    def _cache_key(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> Optional[str]:
+        """
+        Cache key for a call, or None if the calling agent has not opted in.
+        
+        Must run before _prepare_call(), which pops the parameters.
+        """
+        if not settings.llm_cache_enabled or kwargs.get("agent") not in settings.llm_cache_agents:
+            return None
+        return LLMResponseCache.make_key(
+            self.provider,
+            self.model,
+            messages,
+            kwargs.get("temperature", self.temperature),
+            kwargs.get("max_tokens", self.max_tokens)
+        )
+    
+    @staticmethod
+    def _cache_value(response: LLMResponse) -> Dict[str, Any]:
+        return {
+            "content": response.content,
+            "model": response.model,
+            "tokens_used": response.tokens_used,
+            "finish_reason": response.finish_reason,
+        }
+    
+    @staticmethod
+    def _from_cache(value: Dict[str, Any]) -> LLMResponse:
+        return LLMResponse(**value, metadata={"cached": True})
+    
+    def _prepare_call(
         self,
         messages: List[BaseMessage],
-        **kwargs
-    ):
+        kwargs: Dict[str, Any]
+    ) -> Tuple[BaseChatModel, Optional[str], int]:
         """
-        Stream responses from the LLM.
+        Resolve the chat model and scheduling inputs for one call.
         
         Args:
             messages: List of messages
-            **kwargs: Additional arguments
+            kwargs: Call arguments; agent/temperature/max_tokens are popped
             
-        Yields:
-            Response chunks
+        Returns:
+            Tuple of (chat model, agent name, estimated tokens)
         """
-        pass
-
-
-class OpenAIClient(LLMClient):
-    """OpenAI LLM client implementation."""
+        agent = kwargs.pop("agent", None)
+        max_tokens = kwargs.get("max_tokens", self.max_tokens)
+        chat_model = self._resolve_chat_model(kwargs)
+        prompt = "\n".join(str(message.content) for message in messages)
+        return chat_model, agent, count_tokens(prompt, self.model) + max_tokens
     
-    def __init__(
+    def _record_scheduled_success(self, response: Any, reserved_tokens: int):
+        """Report headers and real usage of a successful call to the scheduler."""
+        metadata = getattr(response, "response_metadata", None) or {}
+        used = self._tokens_used(response) if isinstance(response, AIMessage) else None
+        self.scheduler.record_success(self.provider, metadata.get("headers"), reserved_tokens, used)
+    
+    def _record_scheduled_failure(self, error: BaseException):
+        """Report a rate-limited call to the scheduler."""
+        if getattr(error, "status_code", None) == 429:
+            response = getattr(error, "response", None)
+            self.scheduler.record_rate_limited(self.provider, getattr(response, "headers", None))
+    
+    def _to_response(self, response: AIMessage) -> LLMResponse:
+        """Convert a LangChain message into an LLMResponse."""
+        metadata = getattr(response, "response_metadata", {}) or {}
+        return LLMResponse(
+            content=response.content,
+            model=self.model,
+            tokens_used=self._tokens_used(response),
+            finish_reason=metadata.get("finish_reason") or metadata.get("stop_reason"),
+            metadata=metadata
+        )
+    
+    def _guarded_call(
         self,
-        model: Optional[str] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 2000,
-        api_key: Optional[str] = None
-    ):
+        func: Callable[[], Any],
+        agent: Optional[str] = None,
+        tokens: int = 0
+    ) -> Any:
+        """Run one provider call through the circuit breaker and scheduler."""
+        self.breaker.before_call()
+        with self.scheduler.slot(self.provider, agent, tokens):
+            try:
+                result = func()
+            except Exception as e:
+                self.breaker.record_outcome(e)
+                self._record_scheduled_failure(e)
+                raise
+        self.breaker.record_success()
+        self._record_scheduled_success(result, tokens)
+        return result
+    
+    async def _aguarded_call(
+        self,
+        func: Callable[[], Any],
+        agent: Optional[str] = None,
+        tokens: int = 0
+    ) -> Any:
+        """Async variant of _guarded_call; func returns an awaitable."""
+        self.breaker.before_call()
+        try:
+            async with self.scheduler.aslot(self.provider, agent, tokens):
+                try:
+                    result = await func()
+                except Exception as e:
+                    self.breaker.record_outcome(e)
+                    self._record_scheduled_failure(e)
+                    raise
+        except asyncio.CancelledError:
+            # The run was cancelled; do not leave a half-open trial in flight
+            self.breaker.record_cancelled()
+            raise
+        self.breaker.record_success()
+        self._record_scheduled_success(result, tokens)
+        return result
+    
+    def invoke(
+        self,
+        messages: List[BaseMessage],
+        **kwargs
+    ) -> LLMResponse:
         """
-        Initialize OpenAI client.
+        Invoke the LLM with messages, retrying transient failures.
         
         Args:
-            model: Model identifier (default from settings)
-            temperature: Sampling temperature
-            max_tokens: Maximum tokens in response
-            api_key: OpenAI API key (default from settings)
+            messages: List of messages
+            **kwargs: Additional arguments (temperature/max_tokens override
+                defaults; agent names the caller for per-agent scheduling)
+            
+        Returns:
+            LLMResponse object
         """
-        model = model or settings.openai_model
-        super().__init__(model, temperature, max_tokens)
+        cache_key = self._cache_key(messages, kwargs)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return self._from_cache(cached)
         
-        self.api_key = api_key or settings.openai_api_key
+        chat_model, agent, tokens = self._prepare_call(messages, kwargs)
         
-        if not self.api_key:
-            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
-        
-        # Initialize LangChain client
-        self.client = ChatOpenAI(
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            api_key=self.api_key
-        )
-        
-        self.logger.info(f"OpenAI client initialized with model: {self.model}")
+        try:
+            for attempt in Retrying(**_retry_options()):
+                with attempt:
+                    response = self._guarded_call(
+                        lambda: chat_model.invoke(messages, **kwargs), agent, tokens
+                    )
+            result = self._to_response(response)
+            if cache_key:
+                self.response_cache.put(cache_key, self._cache_value(result))
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"{self.provider} invocation error: {str(e)}")
+            raise
     
-    def invoke(
+    async def ainvoke(
         self,
         messages: List[BaseMessage],
         **kwargs
     ) -> LLMResponse:
         """
-        Invoke OpenAI model.
+        Async variant of invoke(); backoff sleeps do not block the event loop.
         
         Args:
             messages: List of messages
-            **kwargs: Additional arguments
+            **kwargs: Additional arguments (temperature/max_tokens override
+                defaults; agent names the caller for per-agent scheduling)
             
         Returns:
             LLMResponse object
         """
+        cache_key = self._cache_key(messages, kwargs)
+        if cache_key:
+            cached = await self.response_cache.aget(cache_key)
+            if cached is not None:
+                return self._from_cache(cached)
+        
+        chat_model, agent, tokens = self._prepare_call(messages, kwargs)
+        
         try:
-            # Override temperature if provided
-            temp = kwargs.pop('temperature', self.temperature)
-            max_tok = kwargs.pop('max_tokens', self.max_tokens)
-            
-            # Create temporary client with custom params if needed
-            if temp != self.temperature or max_tok != self.max_tokens:
-                client = ChatOpenAI(
-                    model=self.model,
-                    temperature=temp,
-                    max_tokens=max_tok,
-                    api_key=self.api_key
-                )
-            else:
-                client = self.client
-            
-            # Invoke
-            response = client.invoke(messages, **kwargs)
-            
-            # Extract token usage if available
-            tokens_used = None
-            if hasattr(response, 'response_metadata'):
-                usage = response.response_metadata.get('token_usage', {})
-                tokens_used = usage.get('total_tokens')
-            
-            return LLMResponse(
-                content=response.content,
-                model=self.model,
-                tokens_used=tokens_used,
-                finish_reason=getattr(response, 'finish_reason', None),
-                metadata=getattr(response, 'response_metadata', {})
-            )
+            async for attempt in AsyncRetrying(**_retry_options()):
+                with attempt:
+                    response = await self._aguarded_call(
+                        lambda: chat_model.ainvoke(messages, **kwargs), agent, tokens
+                    )
+            result = self._to_response(response)
+            if cache_key:
+                await self.response_cache.aput(cache_key, self._cache_value(result))
+            return result
             
         except Exception as e:
-            self.logger.error(f"OpenAI invocation error: {str(e)}")
+            self.logger.error(f"{self.provider} invocation error: {str(e)}")
             raise
     
     def stream(
@@ -179,7 +1280,10 @@ class OpenAIClient(LLMClient):
         **kwargs
     ):
         """
-        Stream responses from OpenAI.
+        Stream responses from the LLM.
+        
+        Only opening the stream goes through the circuit breaker; a stream
+        that fails midway is not retried, since chunks were already yielded.
         
         Args:
             messages: List of messages
@@ -188,17 +1292,119 @@ class OpenAIClient(LLMClient):
         Yields:
             Response chunks
         """
+        chat_model, agent, tokens = self._prepare_call(messages, kwargs)
+        self.breaker.before_call()
+        
         try:
-            for chunk in self.client.stream(messages, **kwargs):
-                yield chunk.content
+            with self.scheduler.slot(self.provider, agent, tokens):
+                for chunk in chat_model.stream(messages, **kwargs):
+                    yield chunk.content
+            self.breaker.record_success()
+            self.scheduler.record_success(self.provider)
                 
         except Exception as e:
-            self.logger.error(f"OpenAI streaming error: {str(e)}")
+            self.breaker.record_outcome(e)
+            self._record_scheduled_failure(e)
+            self.logger.error(f"{self.provider} streaming error: {str(e)}")
             raise
 
 
-class AnthropicClient(LLMClient):
-    """Anthropic (Claude) LLM client implementation."""
+    async def _aopen_stream(
+        self,
+        chat_model: BaseChatModel,
+        messages: List[BaseMessage],
+        kwargs: Dict[str, Any],
+        agent: Optional[str],
+        tokens: int
+    ) -> Tuple[Any, AsyncIterator[Any], Optional[AIMessage]]:
+        """
+        Open a provider stream and wait for its first chunk.
+        
+        The scheduler slot is held on success and released on failure, so
+        a failed attempt does not keep its slot through the backoff.
+        
+        Returns:
+            Tuple of (entered scheduler slot, chunk iterator, first chunk)
+        """
+        self.breaker.before_call()
+        slot = self.scheduler.aslot(self.provider, agent, tokens)
+        try:
+            await slot.__aenter__()
+        except BaseException:
+            self.breaker.record_cancelled()
+            raise
+        
+        try:
+            chunks = chat_model.astream(messages, **kwargs).__aiter__()
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            return slot, chunks, None
+        except BaseException as e:
+            if isinstance(e, Exception):
+                self.breaker.record_outcome(e)
+                self._record_scheduled_failure(e)
+            else:
+                self.breaker.record_cancelled()
+            await slot.__aexit__(type(e), e, e.__traceback__)
+            raise
+        return slot, chunks, first
+    
+    async def astream(
+        self,
+        messages: List[BaseMessage],
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text from the LLM without blocking the event loop.
+        
+        Opening the stream is retried like invoke() until the first chunk
+        arrives; a stream that fails after that is not retried, since its
+        chunks were already yielded.
+        
+        Args:
+            messages: List of messages
+            **kwargs: Additional arguments (as for ainvoke())
+            
+        Yields:
+            Response text chunks
+        """
+        chat_model, agent, tokens = self._prepare_call(messages, kwargs)
+        
+        try:
+            async for attempt in AsyncRetrying(**_retry_options()):
+                with attempt:
+                    slot, chunks, first = await self._aopen_stream(chat_model, messages, kwargs, agent, tokens)
+            
+            try:
+                if first is not None:
+                    # .text flattens Anthropic's content blocks
+                    yield first.text
+                    async for chunk in chunks:
+                        yield chunk.text
+            except BaseException as e:
+                if isinstance(e, Exception):
+                    self.breaker.record_outcome(e)
+                    self._record_scheduled_failure(e)
+                else:
+                    # Cancelled or closed early
+                    self.breaker.record_cancelled()
+                await slot.__aexit__(type(e), e, e.__traceback__)
+                raise
+            await slot.__aexit__(None, None, None)
+            
+            self.breaker.record_success()
+            metadata = getattr(first, "response_metadata", None) or {}
+            self.scheduler.record_success(self.provider, metadata.get("headers"))
+            
+        except Exception as e:
+            self.logger.error(f"{self.provider} streaming error: {str(e)}")
+            raise
+
+
+class OpenAIClient(LLMClient):
+    """OpenAI LLM client implementation."""
+    
+    provider = "openai"
     
     def __init__(
         self,
@@ -208,106 +1414,85 @@ class AnthropicClient(LLMClient):
         api_key: Optional[str] = None
     ):
         """
-        Initialize Anthropic client.
+        Initialize OpenAI client.
         
         Args:
             model: Model identifier (default from settings)
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
-            api_key: Anthropic API key (default from settings)
+            api_key: OpenAI API key (default from settings)
         """
-        model = model or settings.anthropic_model
+        model = model or settings.openai_model
         super().__init__(model, temperature, max_tokens)
         
-        self.api_key = api_key or settings.anthropic_api_key
+        self.api_key = api_key or settings.openai_api_key
         
         if not self.api_key:
-            raise ValueError("Anthropic API key not found. Set ANTHROPIC_API_KEY environment variable.")
+            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
         
-        # Initialize LangChain client
-        self.client = ChatAnthropic(
+        self.logger.info(f"OpenAI client initialized with model: {self.model}")
+    
+    def _create_chat_model(self, temperature: float, max_tokens: int) -> BaseChatModel:
+        return ChatOpenAI(
             model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            api_key=self.api_key
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key,
+            timeout=settings.llm_request_timeout,
+            max_retries=0,
+            # Rate-limit headers feed the request scheduler
+            include_response_headers=True
         )
-        
-        self.logger.info(f"Anthropic client initialized with model: {self.model}")
     
-    def invoke(
-        self,
-        messages: List[BaseMessage],
-        **kwargs
-    ) -> LLMResponse:
-        """
-        Invoke Anthropic model.
-        
-        Args:
-            messages: List of messages
-            **kwargs: Additional arguments
-            
-        Returns:
-            LLMResponse object
-        """
-        try:
-            # Override temperature if provided
-            temp = kwargs.pop('temperature', self.temperature)
-            max_tok = kwargs.pop('max_tokens', self.max_tokens)
-            
-            # Create temporary client with custom params if needed
-            if temp != self.temperature or max_tok != self.max_tokens:
-                client = ChatAnthropic(
-                    model=self.model,
-                    temperature=temp,
-                    max_tokens=max_tok,
-                    api_key=self.api_key
-                )
-            else:
-                client = self.client
-            
-            # Invoke
-            response = client.invoke(messages, **kwargs)
-            
-            # Extract token usage if available
-            tokens_used = None
-            if hasattr(response, 'response_metadata'):
-                usage = response.response_metadata.get('usage', {})
-                tokens_used = usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
-            
-            return LLMResponse(
-                content=response.content,
-                model=self.model,
-                tokens_used=tokens_used,
-                finish_reason=None,
-                metadata=getattr(response, 'response_metadata', {})
-            )
-            
-        except Exception as e:
-            self.logger.error(f"Anthropic invocation error: {str(e)}")
-            raise
+    def _tokens_used(self, response: AIMessage) -> Optional[int]:
+        usage = getattr(response, "response_metadata", {}).get("token_usage", {})
+        return usage.get("total_tokens")
+
+
+class AnthropicClient(LLMClient):
+    """Anthropic (Claude) LLM client implementation."""
     
-    def stream(
+    provider = "anthropic"
+    
+    def __init__(
         self,
-        messages: List[BaseMessage],
-        **kwargs
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        api_key: Optional[str] = None
     ):
         """
-        Stream responses from Anthropic.
+        Initialize Anthropic client.
         
         Args:
-            messages: List of messages
-            **kwargs: Additional arguments
-            
-        Yields:
-            Response chunks
+            model: Model identifier (default from settings)
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            api_key: Anthropic API key (default from settings)
         """
-        try:
-            for chunk in self.client.stream(messages, **kwargs):
-                yield chunk.content
-                
-        except Exception as e:
-            self.logger.error(f"Anthropic streaming error: {str(e)}")
-            raise
+        model = model or settings.anthropic_model
+        super().__init__(model, temperature, max_tokens)
+        
+        self.api_key = api_key or settings.anthropic_api_key
+        
+        if not self.api_key:
+            raise ValueError("Anthropic API key not found. Set ANTHROPIC_API_KEY environment variable.")
+        
+        self.logger.info(f"Anthropic client initialized with model: {self.model}")
+    
+    def _create_chat_model(self, temperature: float, max_tokens: int) -> BaseChatModel:
+        return ChatAnthropic(
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=self.api_key,
+            timeout=settings.llm_request_timeout,
+            max_retries=0
+        )
+    
+    def _tokens_used(self, response: AIMessage) -> Optional[int]:
+        usage = getattr(response, "response_metadata", {}).get("usage", {})
+        return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
 
 
 # Client Factory
@@ -351,6 +1536,32 @@ def get_llm_client(
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
 
+# Shared client instances, one per provider (used by all agents)
+_shared_clients: Dict[str, LLMClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_llm_client(provider: Optional[Literal["openai", "anthropic"]] = None) -> LLMClient:
+    """
+    Get the process-wide client for a provider.
+    
+    Agents pass their own temperature/max_tokens per call, so one client
+    (and its connection pools and circuit breaker) serves all of them.
+    
+    Args:
+        provider: LLM provider (defaults to settings)
+        
+    Returns:
+        Shared LLMClient instance
+    """
+    provider = provider or settings.primary_llm_provider
+    
+    with _shared_clients_lock:
+        if provider not in _shared_clients:
+            _shared_clients[provider] = get_llm_client(provider)
+        return _shared_clients[provider]
+
+
 # Token Counting Utilities
 
 def count_tokens(text: str, model: str = "gpt-4") -> int:
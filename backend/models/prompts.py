@@ -2,9 +2,21 @@
 Prompt templates for all agents.
 
 Contains system prompts and user prompt generators for each agent.
+
+System prompts come in variants: "full" for the first pass and a
+"compact" one for revision passes, which already have the protocol
+structure and prior feedback in context. User prompts put their static
+instructions before any per-request content, so consecutive calls share
+the longest possible prefix for provider-side prompt caching.
 """
 
-from typing import Optional
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from utils.helpers import calculate_similarity, truncate_text
+from models.llm_client import count_tokens
 
 
 # ============================================================================
@@ -102,6 +114,18 @@ Emergency contacts: [Crisis line, therapist contact]
 
 Generate content that is clinically sound, compassionate, and practically useful."""
 
+# Revision passes: the draft being revised already shows the structure
+DRAFTER_SYSTEM_PROMPT_COMPACT = """You are an expert Clinical Psychologist and CBT (Cognitive Behavioral Therapy) specialist revising a CBT exercise.
+
+Keep the protocol's sections and markdown headers: Session Overview, Exposure Hierarchy / Exercise Steps, Cognitive Reframing Techniques, Homework Assignments, Safety Considerations.
+
+- Evidence-based CBT techniques; gradual exposure starting at manageable difficulty (SUDs 30-40)
+- Warm, validating, collaborative ("we") language without unexplained jargon
+- NEVER diagnose or suggest medication changes; always include crisis resources and encourage professional oversight
+- Specific, SMART homework, concrete examples and troubleshooting for common barriers
+
+Address the feedback you are given without weakening what already works."""
+
 def get_drafter_user_prompt(
     user_intent: str,
     current_draft: Optional[str] = None,
@@ -122,9 +146,7 @@ def get_drafter_user_prompt(
     """
     if iteration == 0:
         # First draft
-        return f"""Create a comprehensive CBT exercise for the following patient need:
-
-**Patient Intent:** {user_intent}
+        return f"""Create a comprehensive CBT exercise for the patient need given below.
 
 Please generate a complete, structured CBT protocol following the guidelines in your system prompt.
 
@@ -135,11 +157,17 @@ Include all required sections:
 - Homework Assignments
 - Safety Considerations
 
-Make it practical, empathetic, and evidence-based. Use clear headers and well-organized formatting."""
+Make it practical, empathetic, and evidence-based. Use clear headers and well-organized formatting.
+
+**Patient Intent:** {user_intent}"""
     
     else:
         # Revision
-        prompt = f"""Revise the following CBT exercise based on feedback:
+        prompt = f"""Revise the CBT exercise below based on the feedback that follows it.
+
+Please generate an improved version that addresses all the feedback while maintaining clinical quality and empathy.
+
+Ensure all required sections are present and properly structured.
 
 **Patient Intent:** {user_intent}
 
@@ -154,13 +182,60 @@ Make it practical, empathetic, and evidence-based. Use clear headers and well-or
 {feedback_context}
 """
         
-        prompt += """
+        return prompt
 
-Please generate an improved version that addresses all the feedback while maintaining clinical quality and empathy.
 
-Ensure all required sections are present and properly structured."""
+def get_drafter_patch_user_prompt(
+    user_intent: str,
+    sections: List[Tuple[str, str]],
+    other_titles: List[str],
+    feedback_context: Optional[str] = None
+) -> str:
+    """
+    Generate a revision prompt covering only the sections feedback points at.
+    
+    Sections are numbered so the rewritten sections in the response can be
+    patched back into the draft.
+    
+    Args:
+        user_intent: User's clinical need
+        sections: (title, content) pairs to rewrite
+        other_titles: Titles of the sections that stay as they are
+        feedback_context: Feedback from other agents
         
-        return prompt
+    Returns:
+        Formatted user prompt
+    """
+    blocks = "\n\n".join(
+        f"=== SECTION {number}: {title} ===\n{content.strip()}"
+        for number, (title, content) in enumerate(sections, start=1)
+    )
+    
+    prompt = f"""Revise only the numbered sections of a CBT exercise given below, based on the feedback that follows them.
+
+Return each revised section on its own, starting with a line `=== SECTION <number> ===`
+(same number as below) followed by the complete new text of that section, including its
+header. Do not return the unchanged sections or any text outside the section blocks.
+
+Keep the clinical quality, empathy and formatting consistent with the rest of the protocol.
+
+**Patient Intent:** {user_intent}
+
+**Unchanged Sections (do not rewrite):** {", ".join(other_titles) or "none"}
+
+**Sections to Revise:**
+
+{blocks}
+"""
+    
+    if feedback_context:
+        prompt += f"""
+
+**Feedback to Address:**
+{feedback_context}
+"""
+    
+    return prompt
 
 
 # ============================================================================
@@ -260,6 +335,39 @@ Confidence: 0.85
 
 You are a safety guardian, not a blocker. Help create the safest possible therapeutic content."""
 
+# Revision passes: same checks and output format, without the explanations
+SAFETY_GUARDIAN_SYSTEM_PROMPT_COMPACT = """You are a Clinical Safety Officer reviewing a revised mental health protocol for safety risks, liability concerns and inappropriate content.
+
+Check: self-harm and suicide risk (crisis resources present), medical advice boundaries (no diagnoses, no medication advice), exposure safety (graduated, physically safe, ways to reduce intensity), vulnerable populations, contraindications, liability (overpromising, replacing care, missing disclaimers), cultural and ethical issues.
+
+Ratings: SAFE (no significant concerns), NEEDS_REVISION (moderate concerns), UNSAFE (high-risk content).
+
+## Output Format:
+
+Overall Safety Rating: [SAFE / NEEDS_REVISION / UNSAFE]
+
+Specific Issues:
+
+[SEVERITY] Issue description
+Recommendation: Specific action needed
+
+Confidence: 0.85
+
+Be thorough but not overly cautious: HIGH severity issues must be addressed, LOW severity are nice-to-haves."""
+
+
+# Shared instructions of the safety user prompts
+SAFETY_FOCUS = """Focus on:
+1. Self-harm and suicide risk
+2. Medical advice boundaries
+3. Exposure safety
+4. Vulnerable population considerations
+5. Contraindications
+6. Liability concerns
+7. Cultural and ethical issues
+
+Be specific about any concerns and provide actionable recommendations."""
+
 
 def get_safety_user_prompt(user_intent: str, draft: str) -> str:
     """
@@ -272,25 +380,63 @@ def get_safety_user_prompt(user_intent: str, draft: str) -> str:
     Returns:
         Formatted user prompt
     """
-    return f"""Analyze the following CBT protocol for safety concerns:
+    return f"""Analyze the CBT protocol below for safety concerns.
+
+Provide a thorough safety review following your assessment framework.
+
+{SAFETY_FOCUS}
 
 **Original Intent:** {user_intent}
 
 **Protocol Content:**
-{draft}
+{draft}"""
 
-Provide a thorough safety review following your assessment framework.
 
-Focus on:
-1. Self-harm and suicide risk
-2. Medical advice boundaries
-3. Exposure safety
-4. Vulnerable population considerations
-5. Contraindications
-6. Liability concerns
-7. Cultural and ethical issues
+def get_safety_sections_user_prompt(
+    user_intent: str,
+    sections: List[Tuple[str, str]],
+    unchanged_titles: List[str]
+) -> str:
+    """
+    Generate a safety prompt covering only some sections of a draft.
+    
+    Sections are numbered so the per-section verdicts in the response can
+    be matched back to them.
+    
+    Args:
+        user_intent: Original user intent
+        sections: (title, content) pairs to review
+        unchanged_titles: Titles of sections already reviewed and unchanged
+        
+    Returns:
+        Formatted user prompt
+    """
+    context = ""
+    if unchanged_titles:
+        context = (
+            "\n**Already Reviewed (unchanged, do not re-review):** "
+            + ", ".join(unchanged_titles)
+            + "\nTake these into account (e.g. crisis resources or disclaimers they provide).\n"
+        )
+    
+    blocks = "\n\n".join(
+        f"=== SECTION {number}: {title} ===\n{content.strip()}"
+        for number, (title, content) in enumerate(sections, start=1)
+    )
+    
+    return f"""Analyze the numbered sections of a CBT protocol below for safety concerns.
 
-Be specific about any concerns and provide actionable recommendations."""
+Review each section separately. Start each section's review with a line
+`=== SECTION <number> ===` (same number as below), then give its Overall Safety
+Rating, any issues with their Severity (HIGH / MEDIUM / LOW), and recommendations.
+
+{SAFETY_FOCUS}
+
+**Original Intent:** {user_intent}
+{context}
+**Sections to Review:**
+
+{blocks}"""
 
 
 # ============================================================================
@@ -402,6 +548,36 @@ Confidence: 0.XX
 
 Be constructive and specific. Focus on actionable feedback that improves therapeutic value."""
 
+# Revision passes: same criteria, scale and output format, without the rubric details
+CLINICAL_CRITIC_SYSTEM_PROMPT_COMPACT = """You are a Senior Clinical Supervisor re-reviewing a revised CBT protocol for QUALITY, EFFECTIVENESS, and EMPATHY.
+
+Criteria (0-10 each): Clinical Accuracy, Empathy & Tone, Clarity & Accessibility, Therapeutic Alliance, Completeness, Engagement.
+Scale: 9-10 excellent, 7-8 meets professional standards, 5-6 adequate, 3-4 below standard, 0-2 unacceptable.
+
+## Output Format:
+
+Overall Quality Score: X.X/10
+
+Individual Scores:
+
+Criterion: X/10 - [Brief justification]
+
+Strengths:
+
+[Specific strength]
+
+Areas for Improvement:
+
+[Specific, actionable feedback]
+
+Empathy Score: 0.XX (0.0-1.0)
+
+Recommendation: [APPROVE / REQUEST_MINOR_REVISIONS / REQUEST_MAJOR_REVISIONS]
+
+Confidence: 0.XX
+
+APPROVE at 8.0 or above, REQUEST_MINOR_REVISIONS at 6.0-7.9, REQUEST_MAJOR_REVISIONS below 6.0."""
+
 
 def get_critic_user_prompt(user_intent: str, draft: str) -> str:
     """
@@ -414,12 +590,7 @@ def get_critic_user_prompt(user_intent: str, draft: str) -> str:
     Returns:
         Formatted user prompt
     """
-    return f"""Evaluate the following CBT protocol for clinical quality and therapeutic effectiveness:
-
-**Original Intent:** {user_intent}
-
-**Protocol Content:**
-{draft}
+    return f"""Evaluate the CBT protocol below for clinical quality and therapeutic effectiveness.
 
 Provide a comprehensive quality review following your evaluation criteria.
 
@@ -427,11 +598,65 @@ Rate each of the 6 criteria (0-10) and provide:
 1. Overall quality score
 2. Individual scores with brief justifications
 3. Specific strengths
-4. Specific areas for improvement
+4. Specific areas for improvement, each naming the section it applies to
 5. Empathy score (0.0-1.0)
 6. Overall recommendation (APPROVE / REQUEST_MINOR_REVISIONS / REQUEST_MAJOR_REVISIONS)
 
-Be specific and actionable in your feedback."""
+Be specific and actionable in your feedback.
+
+**Original Intent:** {user_intent}
+
+**Protocol Content:**
+{draft}"""
+
+
+def get_critic_revision_user_prompt(
+    user_intent: str,
+    previous_scores: Dict[str, float],
+    previous_overall: float,
+    previous_improvements: List[str],
+    changed_titles: List[str],
+    diff: str
+) -> str:
+    """
+    Generate a re-review prompt for a revised draft from the previous review and a diff.
+    
+    Args:
+        user_intent: Original user intent
+        previous_scores: Criterion scores from the previous review
+        previous_overall: Overall score from the previous review
+        previous_improvements: Improvement areas from the previous review
+        changed_titles: Titles of the sections the revision changed
+        diff: Unified diff from the previously reviewed draft to this one
+        
+    Returns:
+        Formatted user prompt
+    """
+    scores = "\n".join(f"- {criterion.title()}: {score:g}/10" for criterion, score in previous_scores.items())
+    improvements = "\n".join(f"- {improvement}" for improvement in previous_improvements) or "- none"
+    
+    return f"""Re-evaluate a revised CBT protocol you have already reviewed. Only the changes are shown below.
+
+Re-score only the criteria these changes affect, in the usual `Criterion: X/10 - [Brief justification]`
+format; criteria you do not list keep their previous score. Then provide:
+1. Updated overall quality score
+2. Empathy score (0.0-1.0), if Empathy & Tone was re-scored
+3. Specific areas for improvement that remain, including previous ones the changes did not resolve, each naming the section it applies to
+4. Overall recommendation (APPROVE / REQUEST_MINOR_REVISIONS / REQUEST_MAJOR_REVISIONS)
+
+**Original Intent:** {user_intent}
+
+**Previous Review:**
+Overall Quality Score: {previous_overall:g}/10
+{scores or "- no individual scores"}
+
+**Previous Areas for Improvement:**
+{improvements}
+
+**Changed Sections:** {", ".join(changed_titles)}
+
+**Changes Since the Previous Review (unified diff):**
+{diff}"""
 
 
 # ============================================================================
@@ -489,47 +714,256 @@ This is a rule-based supervisor - no LLM calls needed."""
 # Note: Supervisor doesn't use LLM, so no user prompt generator needed
 
 
+# ============================================================================
+# TRIAGE PROMPTS
+# ============================================================================
+
+TRIAGE_SYSTEM_PROMPT = """You are an intake triage classifier for a CBT protocol generation service.
+
+Classify the request into exactly one label:
+
+- CRISIS: the person describes their own active suicidal thoughts, intent or plans, or current self-harm
+- MEDICATION: the request asks for medication doses, starting, stopping, tapering or combining medication
+- PROCEED: anything else, including clinician requests for protocols ABOUT suicide risk, safety planning or medication adherence
+
+Reply with the label only."""
+
+def get_triage_user_prompt(user_intent: str) -> str:
+    """
+    Generate user prompt for the triage classifier.
+    
+    Args:
+        user_intent: User's clinical need
+        
+    Returns:
+        Formatted user prompt
+    """
+    return f"""Request: {user_intent}
+
+Label:"""
+
+
+# Fixed, clinically pre-approved responses for intents that must not get a
+# generated protocol. Keys are triage routes.
+TRIAGE_TEMPLATES = {
+    "crisis": """# You Deserve Support Right Now
+
+It sounds like you are going through something very painful, and you do not have to face it alone. A self-guided exercise is not the right support for what you are describing, so we will not generate one.
+
+## Please Reach Out Now
+- **If you are in immediate danger, call your local emergency number (911 in the US).**
+- **988 Suicide & Crisis Lifeline (US):** call or text 988, or chat at 988lifeline.org
+- **Crisis Text Line:** text HOME to 741741 (US), 85258 (UK), 686868 (Canada)
+- **Outside the US:** find a local helpline at findahelpline.com
+
+## While You Reach Out
+- If you can, move away from anything you could use to hurt yourself.
+- Stay with, or call, someone you trust and tell them how you are feeling.
+- If you have a therapist or doctor, contact them today and let them know.
+
+You matter, and help is available right now.""",
+
+    "medication": """# Medication Questions Need a Prescriber
+
+We cannot give advice about medication doses, or about starting, stopping, tapering or combining medication. These decisions depend on your health history and need to be made with the clinician who prescribes for you.
+
+## What You Can Do
+- Contact your prescriber, GP or psychiatrist, and describe what you are noticing.
+- A pharmacist can answer general questions about a medication you have been prescribed.
+- Do not stop or change a medication suddenly without medical advice; some medications cause withdrawal effects.
+
+## If You Feel Unsafe
+- Call your local emergency number (911 in the US), or call or text 988 (US) to reach the Suicide & Crisis Lifeline.
+
+If you would like a CBT exercise for the difficulties behind your question, for example anxiety or low mood, please ask for that and we will create one.""",
+}
+
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Feedback kinds in the order they are kept when the revision context has
+# to fit its token budget
+FEEDBACK_RANKS = {"human": 0, "high": 1, "medium": 2, "improvement": 3, "low": 4, "score": 5}
+
+# Critic improvements that only restate a score or recommendation
+SCORE_TAG = re.compile(r"^[A-Z][A-Z_]+:")
+
+FEEDBACK_HEADINGS = {
+    "safety": "**Safety Concerns:**",
+    "quality": "**Quality Improvements Needed:**",
+    "human": "**Human Reviewer Feedback:**",
+}
+
+
 def format_feedback_context(
     safety_flags: list,
     critic_feedback: list,
-    supervisor_decisions: list
+    human_feedback: Optional[str] = None,
+    token_budget: Optional[int] = None
 ) -> str:
     """
-    Format agent feedback into context string for drafter.
+    Format agent and reviewer feedback into the context string for a revision.
+    
+    Near-identical items (settings.feedback_dedup_similarity) are merged
+    into the highest-ranked one, shared recommendations are written once,
+    and items are added by rank (reviewer feedback, then safety by severity,
+    then critic improvements) until the token budget is spent.
     
     Args:
-        safety_flags: List of safety flag objects
-        critic_feedback: List of critic feedback objects
-        supervisor_decisions: List of supervisor decisions
+        safety_flags: Safety flag objects to include
+        critic_feedback: Critic feedback objects (improvements of the latest are used)
+        human_feedback: Reviewer feedback from a rejection
+        token_budget: Maximum tokens (default: settings.feedback_context_max_tokens)
         
     Returns:
-        Formatted context string
+        Formatted context string ("" if there is no feedback)
     """
-    context_parts = []
+    budget = settings.feedback_context_max_tokens if token_budget is None else token_budget
     
-    # Safety concerns
-    if safety_flags:
-        context_parts.append("**Safety Concerns:**")
-        for flag in safety_flags[-3:]:  # Last 3
-            severity = getattr(flag, 'severity', 'UNKNOWN')
-            issue = getattr(flag, 'issue', 'Unknown issue')
-            rec = getattr(flag, 'recommendation', 'Review and revise')
-            context_parts.append(f"- [{severity}] {issue}")
-            context_parts.append(f"  → Recommendation: {rec}")
-    
-    # Quality feedback
+    # (rank, group, text, recommendation)
+    items = []
+    if human_feedback and human_feedback.strip():
+        items.append((FEEDBACK_RANKS["human"], "human", human_feedback.strip(), None))
+    for flag in safety_flags:
+        severity = getattr(flag, 'severity', 'medium')
+        severity = str(getattr(severity, 'value', severity)).lower()
+        items.append((
+            FEEDBACK_RANKS.get(severity, FEEDBACK_RANKS["medium"]),
+            "safety",
+            f"[{severity.upper()}] {getattr(flag, 'issue', 'Unknown issue')}",
+            getattr(flag, 'recommendation', None)
+        ))
     if critic_feedback:
-        context_parts.append("\n**Quality Feedback:**")
-        latest = critic_feedback[-1]
-        improvements = getattr(latest, 'improvements', [])
-        for improvement in improvements[:5]:  # Top 5
-            context_parts.append(f"- {improvement}")
+        for improvement in getattr(critic_feedback[-1], 'improvements', []):
+            rank = FEEDBACK_RANKS["score" if SCORE_TAG.match(improvement) else "improvement"]
+            items.append((rank, "quality", improvement, None))
+    items.sort(key=lambda item: item[0])
+    
+    # Merge near-duplicates into the first (highest-ranked) occurrence
+    kept = []
+    for rank, group, text, recommendation in items:
+        for entry in kept:
+            if entry["group"] == group and calculate_similarity(entry["text"], text) >= settings.feedback_dedup_similarity:
+                entry["count"] += 1
+                break
+        else:
+            kept.append({"group": group, "text": text, "recommendation": recommendation, "count": 1})
+    
+    lines_by_group: Dict[str, List[str]] = {}
+    recommendations = set()
+    used = 0
+    omitted = 0
+    for entry in kept:
+        group = entry["group"]
+        if group == "human":
+            lines = [entry["text"]]
+        else:
+            repeats = f" (raised {entry['count']} times)" if entry["count"] > 1 else ""
+            lines = [f"- {entry['text']}{repeats}"]
+            if entry["recommendation"] and entry["recommendation"] not in recommendations:
+                lines.append(f"  Recommendation: {entry['recommendation']}")
+        if group not in lines_by_group:
+            lines = [FEEDBACK_HEADINGS[group]] + lines
+        
+        cost = count_tokens("\n".join(lines))
+        if used + cost > budget:
+            if used or group != "human":
+                omitted += 1
+                continue
+            # Reviewer feedback is never dropped, only shortened
+            lines = [FEEDBACK_HEADINGS[group], truncate_text(entry["text"], max(budget - 10, 0) * 3)]
+            cost = count_tokens("\n".join(lines))
+        
+        used += cost
+        lines_by_group.setdefault(group, []).extend(lines)
+        if entry["recommendation"]:
+            recommendations.add(entry["recommendation"])
+    
+    context_parts = [
+        "\n".join(lines_by_group[group])
+        for group in ("safety", "quality", "human") if group in lines_by_group
+    ]
+    if omitted:
+        context_parts.append(f"({omitted} lower-priority feedback items omitted)")
     
-    return "\n".join(context_parts) if context_parts else ""
+    return "\n\n".join(context_parts)
+
+
+# ============================================================================
+# PROMPT VARIANTS
+# ============================================================================
+
+PROMPT_VERSION = "2.0.0"
+
+# System prompt variants by agent: "full" for the first pass, "compact"
+# for revision passes
+SYSTEM_PROMPT_VARIANTS = {
+    "drafter": {"full": DRAFTER_SYSTEM_PROMPT, "compact": DRAFTER_SYSTEM_PROMPT_COMPACT},
+    "safety_guardian": {"full": SAFETY_GUARDIAN_SYSTEM_PROMPT, "compact": SAFETY_GUARDIAN_SYSTEM_PROMPT_COMPACT},
+    "clinical_critic": {"full": CLINICAL_CRITIC_SYSTEM_PROMPT, "compact": CLINICAL_CRITIC_SYSTEM_PROMPT_COMPACT},
+}
+
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """One system prompt variant with its precomputed token count."""
+    agent: str
+    name: str
+    text: str
+    tokens: int
+    
+    @property
+    def version(self) -> str:
+        """Identifier recorded with the calls that used this variant."""
+        return f"{self.agent}/{self.name}@{PROMPT_VERSION}"
+
+
+_prompt_variants: Optional[Dict[str, Dict[str, PromptVariant]]] = None
+
+
+def get_prompt_variants() -> Dict[str, Dict[str, PromptVariant]]:
+    """
+    Get every system prompt variant, counting their tokens on first use.
+    
+    Called at startup so no request pays for the counting.
+    
+    Returns:
+        Variants by agent, then by variant name
+    """
+    global _prompt_variants
+    if _prompt_variants is None:
+        _prompt_variants = {
+            agent: {
+                name: PromptVariant(agent=agent, name=name, text=text, tokens=count_tokens(text))
+                for name, text in variants.items()
+            }
+            for agent, variants in SYSTEM_PROMPT_VARIANTS.items()
+        }
+    return _prompt_variants
+
+
+def select_system_prompt(agent: str, iteration: int) -> PromptVariant:
+    """
+    Choose an agent's system prompt variant for the current iteration.
+    
+    With settings.prompt_variant "auto", revision passes get the compact
+    variant: the drafter from iteration 1 on, the reviewers from iteration
+    2 on (their first review is of the first draft).
+    
+    Args:
+        agent: "drafter", "safety_guardian" or "clinical_critic"
+        iteration: state.iteration_count when the prompt is built
+        
+    Returns:
+        Selected prompt variant
+    """
+    name = settings.prompt_variant
+    if name == "auto":
+        first_pass = iteration < (1 if agent == "drafter" else 2)
+        name = "full" if first_pass else "compact"
+    return get_prompt_variants()[agent][name]
 
 
 def get_prompt_version() -> str:
@@ -539,7 +973,7 @@ def get_prompt_version() -> str:
     Returns:
         Version string
     """
-    return "1.0.0"
+    return PROMPT_VERSION
 
 
 def get_all_prompts() -> dict:
@@ -552,19 +986,29 @@ def get_all_prompts() -> dict:
     return {
         "drafter": {
             "system": DRAFTER_SYSTEM_PROMPT,
-            "user_generator": get_drafter_user_prompt.__doc__
+            "system_compact": DRAFTER_SYSTEM_PROMPT_COMPACT,
+            "user_generator": get_drafter_user_prompt.__doc__,
+            "patch_generator": get_drafter_patch_user_prompt.__doc__
         },
         "safety_guardian": {
             "system": SAFETY_GUARDIAN_SYSTEM_PROMPT,
+            "system_compact": SAFETY_GUARDIAN_SYSTEM_PROMPT_COMPACT,
             "user_generator": get_safety_user_prompt.__doc__
         },
         "clinical_critic": {
             "system": CLINICAL_CRITIC_SYSTEM_PROMPT,
-            "user_generator": get_critic_user_prompt.__doc__
+            "system_compact": CLINICAL_CRITIC_SYSTEM_PROMPT_COMPACT,
+            "user_generator": get_critic_user_prompt.__doc__,
+            "revision_generator": get_critic_revision_user_prompt.__doc__
         },
         "supervisor": {
             "system": SUPERVISOR_SYSTEM_PROMPT,
             "user_generator": "No user prompt - rule-based"
         },
+        "triage": {
+            "system": TRIAGE_SYSTEM_PROMPT,
+            "user_generator": get_triage_user_prompt.__doc__,
+            "templates": TRIAGE_TEMPLATES
+        },
         "version": get_prompt_version()
     }
\ No newline at end of file
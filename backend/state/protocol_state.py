@@ -10,6 +10,9 @@ from typing import List, Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
 
+from utils.helpers import apply_section_patches
+from models.prompts import format_feedback_context
+
 
 class ApprovalStatus(str, Enum):
     """Possible approval states for the protocol."""
@@ -19,6 +22,7 @@ class ApprovalStatus(str, Enum):
     REJECTED = "rejected"
     EDITED = "edited"
     IN_PROGRESS = "in_progress"
+    CANCELLED = "cancelled"
 
 
 class SafetySeverity(str, Enum):
@@ -34,6 +38,7 @@ class AgentRole(str, Enum):
     SAFETY = "safety"
     CRITIC = "critic"
     SUPERVISOR = "supervisor"
+    TRIAGE = "triage"
 
 
 # Scratchpad Entry Models (for agent collaboration)
@@ -53,6 +58,11 @@ class SafetyFlag(ScratchpadEntry):
     issue: str
     recommendation: str
     confidence: float = Field(ge=0.0, le=1.0)
+    # Set for deterministic lexicon hits: risk category and character
+    # offsets of the matched text in the draft
+    category: Optional[str] = None
+    span_start: Optional[int] = None
+    span_end: Optional[int] = None
     
     model_config = {"use_enum_values": True}
 
@@ -68,6 +78,12 @@ class CriticFeedback(ScratchpadEntry):
     recommendation: str
     feedback: str
     confidence: float = Field(ge=0.0, le=1.0)
+    # "incremental" reviews scored only what changed since the previous
+    # review of draft_version - 1; carried_forward lists the criteria whose
+    # scores were kept from it
+    review_scope: Literal["full", "incremental"] = "full"
+    draft_version: Optional[int] = None
+    carried_forward: List[str] = Field(default_factory=list)
 
 
 class SupervisorDecision(ScratchpadEntry):
@@ -98,6 +114,9 @@ class DraftVersion(BaseModel):
     word_count: int
     changes_summary: Optional[str] = None
     iteration: int
+    # Indexes (in split_sections order) of the sections a patch revision
+    # rewrote; None for a full draft
+    patched_sections: Optional[List[int]] = None
 
 
 # Metadata and Scoring
@@ -110,6 +129,18 @@ class MetadataScores(BaseModel):
     clarity_score: float = Field(default=0.0, ge=0.0, le=10.0, description="Clarity and accessibility")
     completeness_score: float = Field(default=0.0, ge=0.0, le=10.0, description="Completeness of content")
     overall_quality_score: float = Field(default=0.0, ge=0.0, le=10.0, description="Overall quality rating")
+    critic_calls_avoided: int = Field(default=0, description="Critic reviews skipped because safety blocked the draft")
+    iterations_saved: int = Field(default=0, description="Iterations left unused by diminishing-returns stopping")
+    input_tokens: int = Field(default=0, description="LLM input tokens sent by the drafter and reviewers")
+    input_tokens_by_prompt: Dict[str, int] = Field(default_factory=dict, description="Input tokens per prompt variant version")
+    
+    def record_input_tokens(self, prompt_variant: Optional[str], tokens: Optional[int]):
+        """Add one agent call's input tokens to the totals."""
+        if not tokens:
+            return
+        self.input_tokens += tokens
+        if prompt_variant:
+            self.input_tokens_by_prompt[prompt_variant] = self.input_tokens_by_prompt.get(prompt_variant, 0) + tokens
     
     def update_from_critic(self, critic_feedback: CriticFeedback):
         """Update scores based on critic feedback."""
@@ -205,6 +236,18 @@ class ProtocolState(BaseModel):
     needs_revision: bool = Field(default=False)
     is_finalized: bool = Field(default=False)
     current_agent: Optional[str] = Field(default=None, description="Currently active agent")
+    next_action: Optional[str] = Field(
+        default=None,
+        description="Supervisor decision for the next step, read by the routing edge"
+    )
+    reviewed_by: List[str] = Field(
+        default_factory=list,
+        description="Agents whose results the latest review step applied"
+    )
+    full_critic_reviews: bool = Field(
+        default=False,
+        description="Score every Clinical Critic review of this thread from scratch"
+    )
     
     # ✅ NEW: Bypass halt for MCP requests
     bypass_halt: bool = Field(
@@ -219,22 +262,34 @@ class ProtocolState(BaseModel):
     
     # Helper Methods
     
-    def add_draft_version(self, content: str, agent: AgentRole, changes_summary: Optional[str] = None):
+    def add_draft_version(
+        self,
+        content: str,
+        agent: AgentRole,
+        changes_summary: Optional[str] = None,
+        patches: Optional[Dict[int, str]] = None
+    ):
         """
         Add a new version to the draft history.
         
         Args:
-            content: Draft content
+            content: Draft content (ignored when patches are given)
             agent: Agent that created this version
             changes_summary: Optional summary of changes
+            patches: Replacement text by section index, applied to the
+                current draft to produce the new version
         """
+        if patches:
+            content = apply_section_patches(self.current_draft or "", patches)
+        
         version = DraftVersion(
             version_number=len(self.draft_versions) + 1,
             content=content,
             created_by=agent,
             word_count=len(content.split()),
             changes_summary=changes_summary,
-            iteration=self.iteration_count
+            iteration=self.iteration_count,
+            patched_sections=sorted(patches) if patches else None
         )
         self.draft_versions.append(version)
         self.current_draft = content
@@ -245,7 +300,10 @@ class ProtocolState(BaseModel):
         severity: SafetySeverity,
         issue: str,
         recommendation: str,
-        confidence: float
+        confidence: float,
+        category: Optional[str] = None,
+        span_start: Optional[int] = None,
+        span_end: Optional[int] = None
     ):
         """
         Add a safety flag from Safety Guardian.
@@ -255,6 +313,9 @@ class ProtocolState(BaseModel):
             issue: Description of the issue
             recommendation: Suggested fix
             confidence: Agent's confidence
+            category: Lexicon risk category, if from the pre-screen
+            span_start: Start offset of the flagged text in the draft
+            span_end: End offset of the flagged text in the draft
         """
         flag = SafetyFlag(
             iteration=self.iteration_count,
@@ -262,7 +323,10 @@ class ProtocolState(BaseModel):
             severity=severity,
             issue=issue,
             recommendation=recommendation,
-            confidence=confidence
+            confidence=confidence,
+            category=category,
+            span_start=span_start,
+            span_end=span_end
         )
         self.safety_flags.append(flag)
         
@@ -282,7 +346,10 @@ class ProtocolState(BaseModel):
         improvements: List[str],
         recommendation: str,
         feedback: str,
-        confidence: float
+        confidence: float,
+        review_scope: str = "full",
+        draft_version: Optional[int] = None,
+        carried_forward: Optional[List[str]] = None
     ):
         """
         Add feedback from Clinical Critic.
@@ -296,6 +363,9 @@ class ProtocolState(BaseModel):
             recommendation: Overall recommendation
             feedback: Detailed feedback text
             confidence: Agent's confidence
+            review_scope: "full" or "incremental"
+            draft_version: Version number of the reviewed draft
+            carried_forward: Criteria whose scores came from the previous review
         """
         critic_feedback = CriticFeedback(
             iteration=self.iteration_count,
@@ -307,7 +377,10 @@ class ProtocolState(BaseModel):
             improvements=improvements,
             recommendation=recommendation,
             feedback=feedback,
-            confidence=confidence
+            confidence=confidence,
+            review_scope=review_scope,
+            draft_version=draft_version,
+            carried_forward=carried_forward or []
         )
         self.critic_feedbacks.append(critic_feedback)
         
@@ -375,6 +448,18 @@ class ProtocolState(BaseModel):
         self.scratchpad["drafter_notes"].append(drafter_note.model_dump())
         self.last_modified = datetime.now()
     
+    def refresh_metadata(self):
+        """
+        Recompute aggregated scores from the recorded safety flags and critic feedback.
+        
+        Used when the next action is decided after a review.
+        """
+        self.metadata.update_from_safety(self.safety_flags)
+        latest_feedback = self.get_latest_critic_feedback()
+        if latest_feedback:
+            self.metadata.update_from_critic(latest_feedback)
+        self.last_modified = datetime.now()
+    
     def halt_for_human_review(self):
         """Mark the state as halted for human review."""
         self.should_halt = True
@@ -415,6 +500,19 @@ class ProtocolState(BaseModel):
         self.should_halt = False
         self.last_modified = datetime.now()
     
+    def cancel(self, reason: str):
+        """
+        Mark the protocol as cancelled; the thread is not run or resumed again.
+        
+        Args:
+            reason: Why the run was cancelled (recorded as an error entry)
+        """
+        self.approval_status = ApprovalStatus.CANCELLED
+        self.should_halt = False
+        self.needs_revision = False
+        self.current_agent = None
+        self.add_error("cancelled", reason)
+    
     def increment_iteration(self):
         """Increment the iteration counter."""
         self.iteration_count += 1
@@ -471,32 +569,16 @@ class ProtocolState(BaseModel):
         Build a context string summarizing feedback for revision.
         
         Returns:
-            Context string with all relevant feedback
+            Context string with the most important feedback, deduplicated
+            and within settings.feedback_context_max_tokens
         """
-        context_parts = []
-        
-        # Add safety concerns
-        if self.safety_flags:
-            recent_safety = [f for f in self.safety_flags if f.iteration >= self.iteration_count - 1]
-            if recent_safety:
-                context_parts.append("**Safety Concerns:**")
-                for flag in recent_safety:
-                    context_parts.append(f"- [{flag.severity.upper()}] {flag.issue}")
-                    context_parts.append(f"  Recommendation: {flag.recommendation}")
+        recent_safety = [f for f in self.safety_flags if f.iteration >= self.iteration_count - 1]
         
-        # Add quality feedback
-        if self.critic_feedbacks:
-            latest_critic = self.get_latest_critic_feedback()
-            if latest_critic and latest_critic.improvements:
-                context_parts.append("\n**Quality Improvements Needed:**")
-                for improvement in latest_critic.improvements:
-                    context_parts.append(f"- {improvement}")
-        
-        # Add human feedback
-        if self.human_feedback:
-            context_parts.append(f"\n**Human Reviewer Feedback:**\n{self.human_feedback}")
-        
-        return "\n".join(context_parts) if context_parts else ""
+        return format_feedback_context(
+            safety_flags=recent_safety,
+            critic_feedback=self.critic_feedbacks[-1:],
+            human_feedback=self.human_feedback
+        )
     
     def to_summary_dict(self) -> Dict[str, Any]:
         """
@@ -34,6 +34,14 @@ class GenerationRequest(BaseModel):
         default=None,
         description="Optional user identifier for tracking"
     )
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse a finalized protocol for the same normalized intent if one is cached"
+    )
+    full_critic_reviews: bool = Field(
+        default=False,
+        description="Have the Clinical Critic score every revision from scratch instead of only what changed"
+    )
 
 
 class ResumeRequest(BaseModel):
@@ -69,6 +77,18 @@ class GenerationResponse(BaseModel):
     message: str = Field(..., description="Human-readable message")
     user_intent: str = Field(..., description="Original user intent")
     created_at: datetime = Field(..., description="Creation timestamp")
+    cached_from_thread_id: Optional[str] = Field(
+        default=None,
+        description="Thread whose finalized protocol was reused (cache hits only)"
+    )
+    queue_position: Optional[int] = Field(
+        default=None,
+        description="Position in the generation job queue (queued jobs only)"
+    )
+    estimated_wait_seconds: Optional[float] = Field(
+        default=None,
+        description="Estimated seconds until a worker starts the job (queued jobs only)"
+    )
 
 
 class StateResponse(BaseModel):
@@ -107,7 +127,9 @@ class ProtocolHistory(BaseModel):
 
 class StreamEvent(BaseModel):
     """Event streamed during protocol generation."""
-    event_type: Literal["start", "agent_start", "agent_end", "draft_update", "flag", "halt", "error", "complete"]
+    event_type: Literal[
+        "start", "agent_start", "agent_end", "draft_update", "draft_delta", "flag", "halt", "error", "complete"
+    ]
     timestamp: datetime = Field(default_factory=datetime.now)
     agent: Optional[str] = None
     iteration: int
@@ -176,13 +198,34 @@ class DetailedStateResponse(StateResponse):
 # Batch operation schemas
 
 class BatchGenerationRequest(BaseModel):
-    """Request to generate multiple protocols."""
-    requests: List[GenerationRequest] = Field(..., max_length=10)
+    """Request to generate multiple protocols (size limits are enforced by the server settings)."""
+    requests: List[GenerationRequest] = Field(..., min_length=1)
+    parallelism: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Protocols generated at once (capped by the server's batch_max_parallelism)"
+    )
+
+
+class BatchItemResult(BaseModel):
+    """One protocol of a batch, streamed as an NDJSON line when it finishes."""
+    type: Literal["result"] = "result"
+    index: int = Field(..., description="Position of the request in the batch")
+    thread_id: str
+    user_intent: str
+    status: Literal["completed", "failed"]
+    approval_status: Optional[str] = None
+    iteration_count: int = 0
+    draft: Optional[str] = Field(default=None, description="Final approved draft, else the current draft")
+    cached_from_thread_id: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = Field(default=0.0, description="Seconds from the start of the batch until this result was ready")
 
 
 class BatchGenerationResponse(BaseModel):
-    """Response from batch generation."""
-    results: List[GenerationResponse]
+    """Summary of a batch, streamed as the last NDJSON line."""
+    type: Literal["summary"] = "summary"
     total: int
     successful: int
     failed: int
+    elapsed_seconds: float = 0.0
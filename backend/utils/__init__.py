@@ -15,6 +15,10 @@ from .helpers import (
     truncate_text,
     calculate_word_count,
     extract_sections,
+    split_sections,
+    split_section_blocks,
+    apply_section_patches,
+    calculate_similarity,
     format_duration,
     validate_thread_id,
     parse_boolean,
@@ -37,6 +41,10 @@ __all__ = [
     "truncate_text",
     "calculate_word_count",
     "extract_sections",
+    "split_sections",
+    "split_section_blocks",
+    "apply_section_patches",
+    "calculate_similarity",
     "format_duration",
     "validate_thread_id",
     "parse_boolean",
@@ -4,12 +4,19 @@ Helper functions for common operations.
 
 import re
 import json
+import string
 import hashlib
+from functools import lru_cache
 from uuid import uuid4
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
 
+# Marks the start of one numbered section block in a sectioned LLM
+# response ("=== SECTION 2 ===" or "=== SECTION 2: Title ===")
+SECTION_MARKER = re.compile(r"^\W*=+\s*SECTION\s+(\d+)\b.*$", re.IGNORECASE | re.MULTILINE)
+
+
 def generate_thread_id() -> str:
     """
     Generate a unique thread ID.
@@ -119,6 +126,80 @@ def extract_sections(text: str) -> Dict[str, str]:
     return sections
 
 
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split markdown text into sections in document order.
+    
+    Unlike extract_sections, repeated headings are kept and each chunk is
+    the raw text including its heading line, so "".join of the chunks
+    reproduces the input exactly.
+    
+    Args:
+        text: Text with markdown headers
+        
+    Returns:
+        List of (title, chunk) pairs; text before the first header is
+        titled "Introduction"
+    """
+    sections = []
+    title = "Introduction"
+    chunk = []
+    
+    for line in text.splitlines(keepends=True):
+        if line.strip().startswith('#'):
+            if chunk:
+                sections.append((title, ''.join(chunk)))
+            title = line.strip('#').strip() or "Untitled"
+            chunk = []
+        chunk.append(line)
+    
+    if chunk:
+        sections.append((title, ''.join(chunk)))
+    
+    return sections
+
+
+def split_section_blocks(text: str) -> Dict[int, str]:
+    """
+    Split a sectioned LLM response into its numbered blocks.
+    
+    Args:
+        text: Response with "=== SECTION <n> ===" marker lines
+        
+    Returns:
+        Block text (marker line excluded, stripped) by section number;
+        empty if the response has no markers
+    """
+    matches = list(SECTION_MARKER.finditer(text))
+    blocks = {}
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        blocks[int(match.group(1))] = text[match.end():end].strip()
+    return blocks
+
+
+def apply_section_patches(text: str, patches: Dict[int, str]) -> str:
+    """
+    Replace whole sections of a markdown document.
+    
+    Args:
+        text: Document to patch
+        patches: Replacement text (heading line included) by position in
+            split_sections(text); positions out of range are ignored
+            
+    Returns:
+        Patched document; unpatched sections are kept byte for byte, as is
+        the blank-line spacing after each patched one
+    """
+    parts = []
+    for index, (_, chunk) in enumerate(split_sections(text)):
+        if index in patches:
+            body = chunk.rstrip("\n")
+            chunk = patches[index].strip("\n") + chunk[len(body):]
+        parts.append(chunk)
+    return "".join(parts)
+
+
 def format_duration(seconds: float) -> str:
     """
     Format duration in human-readable format.
@@ -242,11 +323,21 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 100) -> List[st
     return chunks
 
 
+# Maps ASCII punctuation to spaces, so "word." and "word" are one token
+PUNCTUATION_TO_SPACE = str.maketrans({char: " " for char in string.punctuation})
+
+
+@lru_cache(maxsize=256)
+def _token_set(text: str) -> frozenset:
+    """Lowercased word tokens of a text (cached: drafts are compared repeatedly)."""
+    return frozenset(text.lower().translate(PUNCTUATION_TO_SPACE).split())
+
+
 def calculate_similarity(text1: str, text2: str) -> float:
     """
     Calculate simple similarity between two texts.
     
-    Uses Jaccard similarity of word sets.
+    Uses Jaccard similarity of word-token sets (ASCII punctuation ignored).
     
     Args:
         text1: First text
@@ -257,19 +348,17 @@ def calculate_similarity(text1: str, text2: str) -> float:
     """
     if not text1 or not text2:
         return 0.0
+    if text1 == text2:
+        return 1.0
     
-    # Convert to word sets
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
-    
-    # Calculate Jaccard similarity
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
-    
-    if not union:
+    words1 = _token_set(text1)
+    words2 = _token_set(text2)
+    if not words1 or not words2:
         return 0.0
     
-    return len(intersection) / len(union)
+    # |A & B| / |A | B| without building the union
+    intersection = len(words1 & words2)
+    return intersection / (len(words1) + len(words2) - intersection)
 
 
 def extract_urls(text: str) -> List[str]: